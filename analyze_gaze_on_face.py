@@ -1,16 +1,28 @@
 """
 Eye tracking verilerini yüz landmark'larıyla eşleştirir.
 Her gaze noktasının hangi yüz bölgesine denk geldiğini belirler.
+
+Gaze verileri oturum deposundan (results/sessions, bkz. session_storage.py) video başına
+okunur; sadece istenen video/katılımcı bölümleri yüklenir. Depoda gaze bölümü yoksa
+eski paylaşımlı GAZE_DATA_FILE kullanılır (GAZE_DATA_FILE ortam değişkeni verilirse her zaman).
+
+Kullanım:
+    python analyze_gaze_on_face.py [--videos kisi1video1 ...] [--participants p01 ...]
 """
 
+import argparse
 import math
 import pandas as pd
 import os
 import csv
 from pathlib import Path
 
+import session_storage
+from landmark_io import find_landmark_file, load_landmarks
+
 # Dosya yolları
 GAZE_DATA_FILE = os.environ.get("GAZE_DATA_FILE", "gaze_data/gaze_data.csv")
+USE_LEGACY_GAZE_FILE = "GAZE_DATA_FILE" in os.environ
 LANDMARKS_DIR = "results/face_landmarks"
 OUTPUT_FILE = "results/gaze_on_face_regions.csv"
 
@@ -87,16 +99,36 @@ def find_closest_region(gaze_x, gaze_y, frame_data):
     
     return closest_region, min_distance
 
-def analyze_gaze_data():
-    """Gaze verilerini yüz landmark'larıyla eşleştirir"""
-    
-    # Gaze verilerini yükle
+def iter_video_gaze(video_ids=None, participant_ids=None):
+    """
+    (video_id, gaze DataFrame) çiftlerini üretir.
+    Oturum deposunda her video için sadece o videonun bölümleri okunur.
+    """
+    partitions = [] if USE_LEGACY_GAZE_FILE else session_storage.find_partitions("gaze", video_ids, participant_ids)
+    if partitions:
+        by_video = {}
+        for partition in partitions:
+            by_video.setdefault(partition["video_id"], []).append(partition["file"])
+        print(f"Gaze verileri oturum deposundan okunuyor: {session_storage.SESSIONS_DIR} "
+              f"({len(partitions)} bölüm, {len(by_video)} video)")
+        for video_id, files in by_video.items():
+            yield video_id, pd.concat([pd.read_csv(f) for f in files], ignore_index=True)
+        return
+
+    # Eski paylaşımlı dosya: tamamı okunup video başına filtrelenir
     if not os.path.exists(GAZE_DATA_FILE):
         print(f"Hata: {GAZE_DATA_FILE} bulunamadı!")
         return
-    
     gaze_df = pd.read_csv(GAZE_DATA_FILE)
-    print(f"Gaze verileri yüklendi: {len(gaze_df)} kayıt")
+    print(f"Gaze verileri yüklendi: {len(gaze_df)} kayıt ({GAZE_DATA_FILE})")
+    if participant_ids is not None:
+        gaze_df = gaze_df[gaze_df['participant_id'].astype(str).isin(set(map(str, participant_ids)))]
+    for video_id, video_gaze in gaze_df.groupby('video_id', sort=False):
+        if video_ids is None or str(video_id) in set(map(str, video_ids)):
+            yield video_id, video_gaze
+
+def analyze_gaze_data(video_ids=None, participant_ids=None):
+    """Gaze verilerini yüz landmark'larıyla eşleştirir"""
     
     # Landmark dosyalarını yükle
     landmarks_dir = Path(LANDMARKS_DIR)
@@ -109,16 +141,14 @@ def analyze_gaze_data():
     results = []
     
     # Her video için işle
-    for video_id in gaze_df['video_id'].unique():
-        video_gaze = gaze_df[gaze_df['video_id'] == video_id]
-        
-        # Landmark dosyasını yükle
-        landmark_file = landmarks_dir / f"{video_id}_landmarks.csv"
-        if not landmark_file.exists():
-            print(f"Uyarı: {landmark_file} bulunamadı, atlanıyor...")
+    for video_id, video_gaze in iter_video_gaze(video_ids, participant_ids):
+        # Landmark dosyasını yükle (csv, parquet veya arrow - bkz. landmark_io.py)
+        landmark_file = find_landmark_file(str(video_id), landmarks_dir)
+        if landmark_file is None:
+            print(f"Uyarı: {landmarks_dir / f'{video_id}_landmarks.*'} bulunamadı, atlanıyor...")
             continue
         
-        landmarks_df = pd.read_csv(landmark_file)
+        landmarks_df = load_landmarks(landmark_file)
         print(f"  İşleniyor: {video_id} ({len(video_gaze)} gaze, {len(landmarks_df)} kare)")
         
         # Her gaze noktası için
@@ -213,5 +243,9 @@ def analyze_gaze_data():
         print("Hiç sonuç bulunamadı!")
 
 if __name__ == "__main__":
-    analyze_gaze_data()
+    parser = argparse.ArgumentParser(description="Gaze verilerini yüz bölgeleriyle eşleştirir")
+    parser.add_argument("--videos", nargs="+", help="Sadece bu video_id'ler")
+    parser.add_argument("--participants", nargs="+", help="Sadece bu katılımcılar")
+    args = parser.parse_args()
+    analyze_gaze_data(args.videos, args.participants)
 
@@ -0,0 +1,248 @@
+"""
+TheEyeTribe için asyncio tabanlı istemci.
+EyeTracker ile aynı JSON protokolünü kullanır, ancak bağlantı başına thread açmaz;
+tek bir event loop üzerinden birden çok tracker aynı anda sürülebilir.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator, Dict, Optional
+
+from eye_tracker import GazeFrame, MessageDecoder
+
+
+class AsyncEyeTracker:
+    """
+    TheEyeTribe göz takip cihazı için asyncio istemcisi.
+
+    Kullanım:
+        async with AsyncEyeTracker() as tracker:
+            version = await tracker.send_request('tracker', 'get', ['version'])
+            await tracker.start_tracking()
+            async for frame in tracker.frames():
+                print(frame.avg_x, frame.avg_y)
+    """
+
+    def __init__(self, host='localhost', port=6555, frame_queue_size=1024, line_limit=1 << 20,
+                 json_backend='auto'):
+        """
+        Args:
+            host: TheEyeTribe sunucusunun IP adresi (genellikle localhost)
+            port: TheEyeTribe sunucusunun port numarası (varsayılan: 6555)
+            frame_queue_size: Okunmamış frame'ler için queue boyutu (doluysa en eski atılır)
+            line_limit: Tek bir JSON satırı için izin verilen en büyük boyut (byte)
+            json_backend: Mesaj decoder'ı ('auto', 'msgspec', 'orjson', 'json') - bkz. MessageDecoder
+        """
+        self.host = host
+        self.port = port
+        self.line_limit = line_limit
+        self.decoder = MessageDecoder(json_backend)
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = False
+        self.tracking = False
+        self.latest_frame: Optional[GazeFrame] = None
+        self.frames_dropped = 0
+        self._frame_queue: asyncio.Queue = asyncio.Queue(maxsize=frame_queue_size)
+        # Bekleyen request'ler: {(category, request): deque([future, ...])}
+        # Protokol yanıtlarda ID döndürmediği için aynı anahtar FIFO sırasıyla eşleşir
+        self._pending: Dict[tuple, deque] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise ConnectionError("TheEyeTribe sunucusuna bağlanılamadı: {}:{}".format(self.host, self.port))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def connect(self, timeout: float = 5.0) -> bool:
+        """
+        Sunucuya bağlanır ve okuma görevini başlatır.
+
+        Returns:
+            Bağlantı başarılı ise True
+        """
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, limit=self.line_limit),
+                timeout=timeout)
+        except (asyncio.TimeoutError, OSError):
+            return False
+
+        self.connected = True
+        self._reader_task = asyncio.ensure_future(self._reader_loop())
+        return True
+
+    async def close(self):
+        """Takibi durdurur ve bağlantıyı kapatır"""
+        if self.tracking and self.connected:
+            try:
+                await self.stop_tracking()
+            except ConnectionError:
+                pass
+
+        self.connected = False
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader_task = None
+
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+        self.reader = None
+        self._fail_pending(ConnectionError("Bağlantı kapatıldı"))
+
+    async def _reader_loop(self):
+        """Satır satır (\\n) okuyup mesajları frame queue'ya veya bekleyen future'lara yönlendirir"""
+        try:
+            while True:
+                try:
+                    line = await self.reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError as e:
+                    # Çok uzun satır - o kısmı atla
+                    await self.reader.readexactly(e.consumed)
+                    continue
+
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    frame = self.decoder.decode_push_frame(line)
+                    if frame is not None:
+                        self._put_frame(frame)
+                        continue
+                    message = self.decoder.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict):
+                    self._handle_message(message)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.connected = False
+            self._fail_pending(ConnectionError("Sunucu bağlantıyı kapattı"))
+
+    def _handle_message(self, message: dict):
+        category = message.get('category', '')
+        request_type = message.get('request')
+
+        # Push frame (request alanı yok) - sadece frame queue'ya gider. 'get frame' yanıtları
+        # queue'ya eklenmez (push örneklerini tekrarlar / sırasını bozar), bekleyen future'a döner.
+        if category == 'tracker' and request_type is None:
+            values = message.get('values')
+            frame = values.get('frame') if isinstance(values, dict) else None
+            if isinstance(frame, dict) and frame:
+                self._put_frame(GazeFrame.from_frame(frame))
+                return
+
+        waiters = self._pending.get((category, request_type))
+        while waiters:
+            future = waiters.popleft()
+            if not future.done():
+                future.set_result(message)
+                break
+        if waiters is not None and not waiters:
+            del self._pending[(category, request_type)]
+
+    def _put_frame(self, frame: GazeFrame):
+        self.latest_frame = frame
+        if self._frame_queue.full():
+            self._frame_queue.get_nowait()
+            self.frames_dropped += 1
+        self._frame_queue.put_nowait(frame)
+
+    def _fail_pending(self, error: Exception):
+        for waiters in self._pending.values():
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(error)
+        self._pending.clear()
+
+    async def send_request(self, category: str, request_type: str = None, values=None,
+                           timeout: float = 5.0) -> dict:
+        """
+        İsteği gönderir ve yanıtı bekler (EyeTracker._send_request ile aynı format).
+
+        Returns:
+            Sunucudan gelen JSON yanıtı
+        """
+        if not self.connected or not self.writer:
+            raise ConnectionError("TheEyeTribe sunucusuna bağlı değil!")
+
+        request = {"category": category}
+        if request_type is not None:
+            request["request"] = request_type
+        if values is not None:
+            request["values"] = values
+
+        key = (category, request_type)
+        future = asyncio.get_running_loop().create_future()
+        # Yanıt gönderimden önce gelebilir - future önce kaydedilir
+        self._pending.setdefault(key, deque()).append(future)
+
+        message = json.dumps(request, ensure_ascii=False, separators=(',', ':')) + '\r\n'
+        try:
+            self.writer.write(message.encode('utf-8'))
+            await self.writer.drain()
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError("Sunucu yanıt vermiyor (timeout: {}s)".format(timeout))
+        except OSError as e:
+            raise ConnectionError("İstek gönderilemedi: {}".format(e))
+        finally:
+            waiters = self._pending.get(key)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._pending[key]
+
+    async def get_version(self, timeout: float = 5.0):
+        """Sunucu protokol versiyonunu döndürür (yanıt başarısızsa None)"""
+        response = await self.send_request('tracker', 'get', ['version'], timeout=timeout)
+        if response.get('statuscode') == 200:
+            return response.get('values', {}).get('version')
+        return None
+
+    async def start_tracking(self):
+        """Push modunu etkinleştirir"""
+        response = await self.send_request('tracker', 'set', {'push': True, 'version': 1})
+        if response.get('statuscode') != 200:
+            raise ConnectionError("Takip başlatılamadı (statuscode={})".format(response.get('statuscode')))
+        self.tracking = True
+
+    async def stop_tracking(self):
+        """Push modunu kapatır"""
+        await self.send_request('tracker', 'set', {'push': False})
+        self.tracking = False
+
+    async def send_heartbeat(self, timeout: float = 1.0) -> bool:
+        """Sunucuya heartbeat gönderir"""
+        try:
+            response = await self.send_request('heartbeat', None, None, timeout=timeout)
+        except ConnectionError:
+            return False
+        return response.get('statuscode') == 200
+
+    async def frames(self) -> AsyncIterator[GazeFrame]:
+        """Gelen gaze frame'lerini sırayla üretir; bağlantı kapanınca biter"""
+        while self.connected or not self._frame_queue.empty():
+            if self._frame_queue.empty() and self._reader_task and self._reader_task.done():
+                break
+            try:
+                frame = await asyncio.wait_for(self._frame_queue.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            yield frame
@@ -0,0 +1,209 @@
+"""
+EyeTracker listener satır ayırma (framing) mikro-benchmark'ı.
+Eski bytes birleştirme yöntemi ile LineFramer'ı sentetik TheEyeTribe trafiği üzerinde karşılaştırır:
+  - 60hz:  her recv'de tek frame (gerçek zamanlı push)
+  - burst: tek recv'de yüzlerce frame (gecikmiş okuma sonrası birikme)
+  - large: büyük calibresult yanıtları (küçük parçalar halinde gelen uzun satırlar)
+Sonuç: mesaj/saniye (sadece framing, JSON parse hariç).
+--decode ile push frame başına decode maliyeti (µs/frame) yüklü JSON backend'leri için ölçülür.
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+
+from eye_tracker import GazeFrame, LineFramer, MessageDecoder, msgspec, orjson
+
+
+def make_frame(i):
+    """60Hz push frame'ine benzer tek satırlık mesaj üretir"""
+    t = 1700000000000 + i * 16
+    eye = {"avg": {"x": 640.5, "y": 360.2}, "raw": {"x": 641.0, "y": 359.8},
+           "psize": 21.3, "pcenter": {"x": 0.41, "y": 0.52}}
+    frame = {"timestamp": "2024-01-01 12:00:00.000", "time": t, "fix": i % 3 == 0, "state": 7,
+             "raw": {"x": 641.0, "y": 359.8}, "avg": {"x": 640.5, "y": 360.2},
+             "lefteye": eye, "righteye": eye}
+    message = {"category": "tracker", "statuscode": 200, "values": {"frame": frame}}
+    return (json.dumps(message, separators=(',', ':')) + '\r\n').encode('utf-8')
+
+
+def make_calibresult(points=400):
+    """Çok noktalı büyük bir calibresult yanıtı üretir"""
+    calibpoints = [{"state": 2, "cp": {"x": i, "y": i}, "mecp": {"x": i, "y": i},
+                    "acd": {"ad": 0.5, "adl": 0.5, "adr": 0.5},
+                    "mepix": {"mep": 3.0, "mepl": 3.0, "mepr": 3.0},
+                    "asdp": {"asd": 1.0, "asdl": 1.0, "asdr": 1.0}} for i in range(points)]
+    message = {"category": "tracker", "request": "get", "statuscode": 200,
+               "values": {"calibresult": {"result": True, "deg": 0.6, "degl": 0.6, "degr": 0.6,
+                                          "calibpoints": calibpoints}}}
+    return (json.dumps(message, separators=(',', ':')) + '\r\n').encode('utf-8')
+
+
+def build_chunks(scenario, count):
+    """Senaryoya göre recv() çağrılarında gelecek veri parçalarını üretir"""
+    if scenario == '60hz':
+        return [make_frame(i) for i in range(count)]
+    if scenario == 'burst':
+        burst = 500
+        chunks = []
+        for start in range(0, count, burst):
+            chunks.append(b''.join(make_frame(i) for i in range(start, min(count, start + burst))))
+        return chunks
+    if scenario == 'large':
+        payload = b''.join(make_calibresult() for _ in range(max(1, count // 1000)))
+        return [payload[i:i + 4096] for i in range(0, len(payload), 4096)]
+    raise ValueError(scenario)
+
+
+def legacy_framing(chunks):
+    """Eski _listener_loop framing mantığı (bytes += chunk, 'in' + find + slice)"""
+    buffer = b''
+    count = 0
+    decoder = json.JSONDecoder()
+    for chunk in chunks:
+        buffer += chunk
+        processed_message = False
+        while True:
+            delimiter = None
+            if b'\r\n' in buffer:
+                delimiter = b'\r\n'
+            elif b'\n' in buffer:
+                delimiter = b'\n'
+            else:
+                break
+            message_end = buffer.find(delimiter)
+            buffer = buffer[message_end + len(delimiter):]
+            count += 1
+            processed_message = True
+        if not processed_message and buffer:
+            buffer_str = buffer.decode('utf-8')
+            idx = 0
+            while idx < len(buffer_str):
+                try:
+                    _, parsed_len = decoder.raw_decode(buffer_str[idx:])
+                except json.JSONDecodeError:
+                    break
+                idx += parsed_len
+                count += 1
+            if idx > 0:
+                buffer = buffer_str[idx:].encode('utf-8')
+    return count
+
+
+def framer_framing(chunks):
+    """LineFramer ile framing (feed + messages)"""
+    framer = LineFramer()
+    decoder = json.JSONDecoder()
+    count = 0
+    for chunk in chunks:
+        framer.feed(chunk)
+        processed_message = False
+        for _ in framer.messages():
+            count += 1
+            processed_message = True
+        if not processed_message:
+            count += len(framer.take_unterminated(decoder))
+    return count
+
+
+def socket_framing(chunks):
+    """Gerçek socket çifti üzerinde recv_into + LineFramer (uçtan uca okuma yolu)"""
+    reader, writer = socket.socketpair()
+
+    def send_all():
+        for chunk in chunks:
+            writer.sendall(chunk)
+        writer.shutdown(socket.SHUT_WR)
+
+    sender = threading.Thread(target=send_all, daemon=True)
+    framer = LineFramer()
+    count = 0
+    start = time.perf_counter()
+    sender.start()
+    while framer.recv_into(reader):
+        for _ in framer.messages():
+            count += 1
+    elapsed = time.perf_counter() - start
+    sender.join()
+    reader.close()
+    writer.close()
+    return count, elapsed
+
+
+def legacy_decode(lines):
+    """Eski handle_message yolu: bytes.decode + json.loads + .get zincirleri"""
+    for line in lines:
+        message_json = json.loads(line.decode('utf-8'))
+        if message_json.get('category', '') == 'tracker' and message_json.get('request', None) is None:
+            frame = message_json.get('values', {}).get('frame', {})
+            if frame:
+                GazeFrame.from_frame(frame)
+    return len(lines)
+
+
+def decoder_decode(backend):
+    """MessageDecoder.decode_push_frame hızlı yolu"""
+    decoder = MessageDecoder(backend)
+
+    def decode(lines):
+        for line in lines:
+            decoder.decode_push_frame(line)
+        return len(lines)
+    return decode
+
+
+def run_decode_benchmark(count, repeat):
+    lines = [make_frame(i).rstrip() for i in range(count)]
+    backends = [('legacy', legacy_decode), ('json', decoder_decode('json'))]
+    if orjson is not None:
+        backends.append(('orjson', decoder_decode('orjson')))
+    if msgspec is not None:
+        backends.append(('msgspec', decoder_decode('msgspec')))
+
+    print()
+    print("{:<10} {:>10} {:>12} {:>12}".format("decoder", "frame", "süre (ms)", "µs/frame"))
+    print("-" * 48)
+    for name, func in backends:
+        frames, elapsed = run(func, lines, repeat)
+        print("{:<10} {:>10} {:>12.1f} {:>12.2f}".format(name, frames, elapsed * 1000, elapsed * 1e6 / frames))
+
+
+def run(func, chunks, repeat):
+    """En iyi süreyi (saniye) ve mesaj sayısını döndürür"""
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func(chunks)
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EyeTracker listener framing benchmark'ı")
+    parser.add_argument("--messages", type=int, default=60000, help="Senaryo başına mesaj sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="Tekrar sayısı (en iyi sonuç raporlanır)")
+    parser.add_argument("--scenarios", nargs="+", default=['60hz', 'burst', 'large'])
+    parser.add_argument("--decode", action="store_true", help="Push frame decode benchmark'ını da çalıştır")
+    args = parser.parse_args()
+
+    print("{:<8} {:<10} {:>10} {:>12} {:>14}".format("senaryo", "yöntem", "mesaj", "süre (ms)", "mesaj/saniye"))
+    print("-" * 58)
+    for scenario in args.scenarios:
+        chunks = build_chunks(scenario, args.messages)
+        for name, func in (("legacy", legacy_framing), ("framer", framer_framing)):
+            count, elapsed = run(func, chunks, args.repeat)
+            print("{:<8} {:<10} {:>10} {:>12.1f} {:>14,.0f}".format(
+                scenario, name, count, elapsed * 1000, count / elapsed if elapsed else 0))
+        count, elapsed = socket_framing(chunks)
+        print("{:<8} {:<10} {:>10} {:>12.1f} {:>14,.0f}".format(
+            scenario, "socket", count, elapsed * 1000, count / elapsed if elapsed else 0))
+
+    if args.decode:
+        run_decode_benchmark(args.messages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+FaceLandmarker IMAGE modunun VIDEO veya ROI çalışma moduyla karşılaştırması.
+IMAGE modunda her karede yüz tespiti tam karede yeniden çalışır; VIDEO modunda (detect_for_video) yüz
+önceki kareden takip edilir ve tespit sadece takip kaybolunca yapılır; ROI modunda (RoiDetector)
+landmarker önceki karenin yüz bölgesinden kırpılan görüntüde çalışır, yüz kaybolursa tam kareye döner.
+
+Her video bir kez çözülüp belleğe alınır (kod çözme süresi ölçüme girmez), sonra iki modda işlenir:
+  - kare/s:        sadece landmark çıkarımı
+  - tespit:        yüz bulunan kare oranı
+  - fark (px):     iki modda da yüz bulunan karelerde landmark başına ortalama / p95 piksel farkı
+  - IoU:           face_outline bölgesi (extract_face_landmarks ile aynı padding) kutularının ortalama IoU'su
+
+Kullanım:
+    python benchmark_running_mode.py                          # videos/kisi*video*.mp4
+    python benchmark_running_mode.py --videos kisi1video1 --max-frames 120
+    python benchmark_running_mode.py --mode roi               # IMAGE / ROI
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import imageio.v2 as imageio
+import mediapipe as mp
+import numpy as np
+
+from extract_face_landmarks import (FPS, LANDMARKER_MODEL_PATH, VIDEO_DIR, RoiDetector, _read_video_meta,
+                                    collect_video_files, create_landmarker)
+from face_regions import FACE_REGIONS, RegionSet, landmarks_to_array
+
+OUTLINE_REGION = RegionSet({"face_outline": FACE_REGIONS["face_outline"]})
+
+
+def load_frames(video_path, max_frames=None):
+    """Videoyu RGB kare listesi olarak çözer; (kareler, fps) döndürür"""
+    frames = []
+    with imageio.get_reader(str(video_path), "ffmpeg") as reader:
+        fps = _read_video_meta(reader, FPS)[0]
+        for frame in reader:
+            if max_frames is not None and len(frames) >= max_frames:
+                break
+            if frame.ndim == 2:
+                frame = np.stack([frame] * 3, axis=-1)
+            frames.append(np.ascontiguousarray(frame))
+    return frames, fps
+
+
+def run_mode(frames, fps, model_path, running_mode):
+    """
+    Kareleri verilen modda işler.
+
+    Returns:
+        (süre saniye, kare başına (N, 3) normalize landmark dizisi veya None)
+    """
+    faces = []
+    with create_landmarker(model_path, running_mode) as landmarker:
+        if running_mode == "roi":
+            # Kırpma ve mp.Image dönüşümü her karede tekrarlandığından ölçüme dahil
+            detector = RoiDetector(landmarker)
+            start = time.perf_counter()
+            faces = [detector.detect(frame) for frame in frames]
+            return time.perf_counter() - start, faces
+        images = [mp.Image(image_format=mp.ImageFormat.SRGB, data=frame) for frame in frames]
+        start = time.perf_counter()
+        for index, image in enumerate(images, start=1):
+            if running_mode == "video":
+                result = landmarker.detect_for_video(image, int(round(index * 1000.0 / fps)))
+            else:
+                result = landmarker.detect(image)
+            faces.append(result.face_landmarks[0] if result.face_landmarks else None)
+        elapsed = time.perf_counter() - start
+    faces = [landmarks_to_array(face, with_z=True) if face is not None else None for face in faces]
+    return elapsed, faces
+
+
+def _to_pixels(face, width, height):
+    return face[:, :2] * (width, height)
+
+
+def _iou(a, b):
+    ix = max(0, min(a["max_x"], b["max_x"]) - max(a["min_x"], b["min_x"]))
+    iy = max(0, min(a["max_y"], b["max_y"]) - max(a["min_y"], b["min_y"]))
+    inter = ix * iy
+    union = a["width"] * a["height"] + b["width"] * b["height"] - inter
+    return inter / union if union > 0 else 1.0
+
+
+def compare(image_faces, other_faces, width, height):
+    """İki modun kare kare uyumu: (ortalama px, p95 px, ortalama IoU, ortak kare)"""
+    errors = []
+    ious = []
+    for image_face, other_face in zip(image_faces, other_faces):
+        if image_face is None or other_face is None:
+            continue
+        diff = np.linalg.norm(_to_pixels(image_face, width, height) - _to_pixels(other_face, width, height), axis=1)
+        errors.append(diff)
+        a = OUTLINE_REGION.bounds(image_face, width, height)[0]
+        b = OUTLINE_REGION.bounds(other_face, width, height)[0]
+        if a["valid"] and b["valid"]:
+            ious.append(_iou(a, b))
+    if not errors:
+        return None, None, None, 0
+    all_errors = np.concatenate(errors)
+    return float(all_errors.mean()), float(np.percentile(all_errors, 95)), float(np.mean(ious)), len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FaceLandmarker IMAGE / VIDEO (veya ROI) modu benchmark'ı")
+    parser.add_argument("--mode", choices=["video", "roi"], default="video", help="IMAGE ile karşılaştırılacak mod")
+    parser.add_argument("--video-dir", default=VIDEO_DIR)
+    parser.add_argument("--videos", nargs="+", help="Sadece bu video_id'ler")
+    parser.add_argument("--model-path", default=str(LANDMARKER_MODEL_PATH))
+    parser.add_argument("--max-frames", type=int, help="Video başına en fazla kare")
+    parser.add_argument("--limit", type=int, help="En fazla N video")
+    args = parser.parse_args()
+
+    video_files = collect_video_files(Path(args.video_dir), recursive=False, video_ids=args.videos)
+    if args.limit:
+        video_files = video_files[:args.limit]
+    if not video_files:
+        print("Video bulunamadı: {}".format(args.video_dir))
+        return
+
+    print("{:<12} {:>6} {:>10} {:>10} {:>8} {:>8} {:>10} {:>9} {:>7}".format(
+        "video", "kare", "image k/s", "{} k/s".format(args.mode), "hız", "tespit", "fark (px)", "p95 (px)", "IoU"))
+    print("-" * 88)
+    totals = {"frames": 0, "image": 0.0, "other": 0.0, "errors": [], "ious": []}
+    for video_path in video_files:
+        frames, fps = load_frames(video_path, args.max_frames)
+        if not frames:
+            continue
+        height, width = frames[0].shape[:2]
+        image_time, image_faces = run_mode(frames, fps, args.model_path, "image")
+        other_time, other_faces = run_mode(frames, fps, args.model_path, args.mode)
+        mean_px, p95_px, iou, common = compare(image_faces, other_faces, width, height)
+
+        detected = "{}/{}".format(sum(f is not None for f in image_faces), sum(f is not None for f in other_faces))
+        print("{:<12} {:>6} {:>10.1f} {:>10.1f} {:>7.2f}x {:>8} {:>10} {:>9} {:>7}".format(
+            video_path.stem, len(frames), len(frames) / image_time, len(frames) / other_time,
+            image_time / other_time, detected,
+            "-" if mean_px is None else "{:.2f}".format(mean_px),
+            "-" if p95_px is None else "{:.2f}".format(p95_px),
+            "-" if iou is None else "{:.3f}".format(iou)))
+        totals["frames"] += len(frames)
+        totals["image"] += image_time
+        totals["other"] += other_time
+        if mean_px is not None:
+            totals["errors"].append((mean_px, common))
+            totals["ious"].append((iou, common))
+
+    if totals["frames"] and totals["other"] > 0:
+        weight = sum(c for _, c in totals["errors"]) or 1
+        print("-" * 88)
+        print("{:<12} {:>6} {:>10.1f} {:>10.1f} {:>7.2f}x {:>8} {:>10.2f} {:>9} {:>7.3f}".format(
+            "toplam", totals["frames"], totals["frames"] / totals["image"], totals["frames"] / totals["other"],
+            totals["image"] / totals["other"], "",
+            sum(e * c for e, c in totals["errors"]) / weight, "",
+            sum(i * c for i, c in totals["ious"]) / weight))
+
+
+if __name__ == "__main__":
+    main()
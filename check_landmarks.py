@@ -6,6 +6,8 @@ import pandas as pd
 import os
 from pathlib import Path
 
+from landmark_io import list_landmark_files, load_landmarks
+
 LANDMARKS_DIR = "results/face_landmarks"
 VIDEO_WIDTH = 1280
 VIDEO_HEIGHT = 720
@@ -16,7 +18,7 @@ def check_landmarks_file(file_path):
     print(f"Kontrol ediliyor: {os.path.basename(file_path)}")
     print(f"{'='*60}")
     
-    df = pd.read_csv(file_path)
+    df = load_landmarks(file_path)
     
     # Temel bilgiler
     print(f"\n📊 Temel Bilgiler:")
@@ -201,7 +203,8 @@ def main():
         print(f"Hata: {LANDMARKS_DIR} dizini bulunamadı!")
         return
     
-    landmark_files = sorted(landmarks_dir.glob("*_landmarks.csv"))
+    # Aynı video için birden fazla format varsa en son yazılan seçilir
+    landmark_files = list(list_landmark_files(landmarks_dir).values())
     
     if not landmark_files:
         print(f"Hiç landmark dosyası bulunamadı!")
@@ -2,6 +2,7 @@
 """
 TheEyeTribe sunucu durumu kontrol scripti
 Sunucunun çalışıp çalışmadığını ve loglarını kontrol eder
+Donanım yoksa yerel simülatör kullanılabilir: python eyetribe_simulator.py --rate 60
 """
 
 import socket
@@ -33,6 +34,51 @@ def check_port(host='localhost', port=6555):
         print(f"✗ Port kontrolü başarısız: {e}")
         return False
 
+def parse_endpoints(args, default_port=6555):
+    """'host' veya 'host:port' argümanlarını (host, port) listesine çevirir"""
+    endpoints = []
+    for arg in args:
+        host, _, port = arg.partition(':')
+        endpoints.append((host or 'localhost', int(port) if port else default_port))
+    return endpoints or [('localhost', default_port)]
+
+def check_trackers_async(endpoints, timeout=3.0):
+    """Birden çok sunucuyu tek bir event loop'ta eşzamanlı olarak sorgular (versiyon + heartbeat)"""
+    import asyncio
+    import time
+    from async_eye_tracker import AsyncEyeTracker
+
+    print()
+    print("=" * 60)
+    print("PROTOKOL KONTROLÜ ({} sunucu, eşzamanlı)".format(len(endpoints)))
+    print("=" * 60)
+
+    async def probe(host, port):
+        tracker = AsyncEyeTracker(host, port)
+        start = time.perf_counter()
+        if not await tracker.connect(timeout=timeout):
+            return host, port, False, "bağlantı kurulamadı", None
+        try:
+            version = await tracker.get_version(timeout=timeout)
+            heartbeat_ok = await tracker.send_heartbeat(timeout=timeout)
+            elapsed = time.perf_counter() - start
+            detail = "versiyon={}, heartbeat={}".format(version, "OK" if heartbeat_ok else "yanıt yok")
+            return host, port, version is not None, detail, elapsed
+        except ConnectionError as e:
+            return host, port, False, str(e), None
+        finally:
+            await tracker.close()
+
+    async def run_all():
+        return await asyncio.gather(*(probe(host, port) for host, port in endpoints))
+
+    results = asyncio.run(run_all())
+    for host, port, ok, detail, elapsed in results:
+        mark = "✓" if ok else "✗"
+        elapsed_str = " ({:.3f}s)".format(elapsed) if elapsed is not None else ""
+        print(f"  {mark} {host}:{port} - {detail}{elapsed_str}")
+    return all(ok for _, _, ok, _, _ in results)
+
 def check_server_process():
     """Windows'ta TheEyeTribe sunucu process'ini kontrol eder"""
     print()
@@ -178,8 +224,14 @@ def check_console_output():
 if __name__ == "__main__":
     print("\nTheEyeTribe Sunucu Durumu Kontrol Aracı\n")
     
+    # Kullanım: python check_server_status.py [host[:port] ...]
+    endpoints = parse_endpoints(sys.argv[1:])
+    
     # Port kontrolü
-    port_ok = check_port()
+    port_ok = check_port(*endpoints[0])
+    
+    # Protokol kontrolü (tüm sunucular eşzamanlı)
+    protocol_ok = check_trackers_async(endpoints) if port_ok else False
     
     # Process kontrolü
     process_ok = check_server_process()
@@ -200,6 +252,11 @@ if __name__ == "__main__":
     else:
         print("✗ Port kapalı - Sunucu çalışmıyor olabilir")
     
+    if protocol_ok:
+        print("✓ Protokol yanıtı alındı - Sunucu istekleri yanıtlıyor")
+    else:
+        print("✗ Protokol yanıtı alınamadı - Sunucu istekleri yanıtlamıyor olabilir")
+    
     if process_ok:
         print("✓ Process bulundu - Sunucu çalışıyor")
     else:
@@ -1,13 +1,20 @@
 """
 Video karelerindeki yüz landmark'larını tespit edip kaydeder.
 Her kare için yüz bölgelerinin (gözler, burun, ağız, vb.) piksel koordinatlarını çıkarır.
+MediaPipe'ın ham 478 landmark'ı landmark_cache.py önbelleğine de yazılır; video, model ve
+parametreler aynıysa bölge tabloları MediaPipe çalıştırılmadan önbellekten türetilir.
 """
 
 import argparse
+import contextlib
 import math
+import multiprocessing
 import os
-import csv
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from queue import Empty, Full, Queue
 from typing import Iterable, List, Optional
 
 # Mediapipe GPU kullanımı macOS sandbox'larında sorun çıkarabildiği için devre dışı bırak
@@ -19,136 +26,28 @@ import numpy as np
 from mediapipe.tasks import python as mp_tasks
 from mediapipe.tasks.python import vision as mp_vision
 
+from face_regions import (FACE_REGIONS, MIN_REGION_PADDING, REGION_NAMES, REGION_PADDING_RATIO,
+                          compute_region_bounds, landmarks_to_array)
+from landmark_cache import (CACHE_DIR, NUM_LANDMARKS, RawLandmarkWriter, file_sha256, open_entry, params_hash,
+                            quantize_landmarks)
+from landmark_io import LandmarkWriter, available_formats, landmark_path, read_checkpoint, write_landmarks
+
 # Video dizini
 VIDEO_DIR = "videos"
 OUTPUT_DIR = "results/face_landmarks"
 FPS = 30  # Yedek FPS
 LANDMARKER_MODEL_PATH = Path("models/face_landmarker.task")
 SUPPORTED_VIDEO_EXTS = [".mp4", ".mov", ".m4v", ".avi", ".mkv"]
-
-# Yüz bölgeleri bounding box'larını biraz genişletmek için padding oranı
-REGION_PADDING_RATIO = 0.12  # Her bir kenara %12 padding ekle
-MIN_REGION_PADDING = 6       # Piksel cinsinden minimum padding
-
-# Yüz bölgeleri tanımlamaları (MediaPipe Face Mesh landmark indeksleri - 468 landmark)
-# MediaPipe Face Mesh: https://github.com/google/mediapipe/blob/master/mediapipe/modules/face_geometry/data/canonical_face_model_uv_visualization.png
-FACE_REGIONS = {
-    # Sol göz (left eye) - göz çevresi landmark'ları
-    "left_eye": [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246],
-    # Sağ göz (right eye) - göz çevresi landmark'ları
-    "right_eye": [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398],
-    # Burun (nose) - burun ve çevresi
-    "nose": [1, 2, 5, 4, 6, 19, 20, 94, 125, 141, 235, 236, 3, 51, 48, 115, 131, 134, 102, 49, 220, 305, 281, 363, 360],
-    # Ağız (mouth) - ağız ve dudaklar
-    "mouth": [61, 146, 91, 181, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318],
-    # Sol yanak (left cheek)
-    "left_cheek": [116, 117, 118, 119, 120, 121, 126, 142, 36, 205, 206, 207, 213, 192, 147],
-    # Sağ yanak (right cheek)
-    "right_cheek": [345, 346, 347, 348, 349, 350, 451, 452, 453, 464, 435, 416, 434, 432],
-    # Alın (forehead)
-    "forehead": [10, 151, 9, 107, 55, 65, 52, 53, 46, 124, 35, 31, 228, 229, 230, 231, 232, 233, 244, 245],
-    # Çene (chin)
-    "chin": [18, 200, 199, 175, 169, 170, 140, 136, 150, 176, 148, 152, 377, 400, 378, 379, 365, 397, 288, 361, 323],
-    # Sol kulak (katılımcının solu - ekranın sağ tarafı)
-    "left_ear": [234, 93, 132, 58, 172, 136, 150, 176, 377, 379, 397, 400, 356],
-    # Sağ kulak (katılımcının sağı - ekranın sol tarafı)
-    "right_ear": [454, 323, 361, 288, 397, 365, 379, 378, 400, 352, 330, 332, 284, 251, 389],
-    # Tüm yüz ovali - genel referans için
-    "face_outline": [10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288, 397, 365, 379, 378, 400,
-                     377, 152, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109]
+# image: her kare bağımsız (yüz tespiti her karede), video: detect_for_video ile kareler arası takip
+RUNNING_MODES = ["image", "video", "roi"]
+# FaceLandmarker ayarları (önbellek anahtarına da girer)
+LANDMARKER_OPTIONS = {
+    "num_faces": 1,
+    "min_face_detection_confidence": 0.5,
+    "min_face_presence_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
 }
 
-def _get_landmark_list(landmarks):
-    """FaceMesh veya FaceLandmarker çıktısını tek tip listeye dönüştürür."""
-    if landmarks is None:
-        return []
-    if hasattr(landmarks, "landmark"):
-        return landmarks.landmark
-    return landmarks
-
-def _apply_padding(min_val, max_val, length, max_limit):
-    """Belirli bir eksende padding uygular ve sınırlar dahilinde kalır"""
-    padding = max(MIN_REGION_PADDING, int(length * REGION_PADDING_RATIO))
-    padded_min = max(0, min_val - padding)
-    padded_max = min(max_limit, max_val + padding)
-    return padded_min, padded_max
-
-def get_region_bounds(landmarks, region_indices, img_width, img_height):
-    """Belirli bir yüz bölgesinin bounding box'ını hesaplar"""
-    if not region_indices:
-        return None
-    
-    landmark_list = _get_landmark_list(landmarks)
-    if not landmark_list:
-        return None
-    
-    x_coords = []
-    y_coords = []
-    
-    for idx in region_indices:
-        if idx < len(landmark_list):
-            landmark = landmark_list[idx]
-            x = int(landmark.x * img_width)
-            y = int(landmark.y * img_height)
-            x_coords.append(x)
-            y_coords.append(y)
-    
-    if not x_coords or not y_coords:
-        return None
-    
-    min_x = min(x_coords)
-    max_x = max(x_coords)
-    min_y = min(y_coords)
-    max_y = max(y_coords)
-    width = max_x - min_x
-    height = max_y - min_y
-
-    # Padding uygula ve sınırları koru
-    padded_min_x, padded_max_x = _apply_padding(min_x, max_x, width, img_width - 1)
-    padded_min_y, padded_max_y = _apply_padding(min_y, max_y, height, img_height - 1)
-
-    padded_width = padded_max_x - padded_min_x
-    padded_height = padded_max_y - padded_min_y
-
-    return {
-        "min_x": padded_min_x,
-        "max_x": padded_max_x,
-        "min_y": padded_min_y,
-        "max_y": padded_max_y,
-        "center_x": (padded_min_x + padded_max_x) / 2,
-        "center_y": (padded_min_y + padded_max_y) / 2,
-        "width": padded_width,
-        "height": padded_height
-    }
-
-def get_region_center(landmarks, region_indices, img_width, img_height):
-    """Belirli bir yüz bölgesinin merkez noktasını hesaplar"""
-    if not region_indices:
-        return None
-    
-    landmark_list = _get_landmark_list(landmarks)
-    if not landmark_list:
-        return None
-    
-    x_sum = 0
-    y_sum = 0
-    count = 0
-    
-    for idx in region_indices:
-        if idx < len(landmark_list):
-            landmark = landmark_list[idx]
-            x_sum += landmark.x * img_width
-            y_sum += landmark.y * img_height
-            count += 1
-    
-    if count == 0:
-        return None
-    
-    return {
-        "center_x": x_sum / count,
-        "center_y": y_sum / count
-    }
-
 def collect_video_files(video_dir: Path, recursive: bool = True, video_ids: Optional[Iterable[str]] = None) -> List[Path]:
     """Verilen dizindeki video dosyalarını toplar"""
     if not video_dir.exists():
@@ -171,152 +70,771 @@ def collect_video_files(video_dir: Path, recursive: bool = True, video_ids: Opti
     files.sort()
     return files
 
-def process_video(video_path, output_file, landmarker, default_fps=FPS):
-    """Videoyu kare kare işleyip yüz landmark'larını çıkarır"""
-    video_name = os.path.basename(video_path)
-    video_id = os.path.splitext(video_name)[0]
+def _read_video_meta(reader, default_fps=FPS):
+    """Reader meta verisinden (fps, width, height, total_frames, duration) döndürür"""
+    try:
+        meta = reader.get_meta_data()
+    except Exception:
+        meta = {}
+    
+    fps = meta.get("fps") or default_fps
+    fps = fps if fps and fps > 0 else default_fps
+    
+    size = meta.get("size")
+    if size and isinstance(size, (tuple, list)) and len(size) == 2:
+        width, height = int(size[0]), int(size[1])
+    else:
+        width = height = None
     
-    print(f"İşleniyor: {video_name}")
+    total_frames = None
+    possible_frames = meta.get("nframes")
+    if isinstance(possible_frames, (int, float)) and not math.isinf(possible_frames):
+        total_frames = int(possible_frames)
     
+    duration = meta.get("duration")
+    if not isinstance(duration, (int, float)) or math.isinf(duration) or duration <= 0:
+        duration = total_frames / fps if total_frames else None
+    return fps, width, height, total_frames, duration
+
+def _empty_regions(frame_info):
+    for region_name in FACE_REGIONS.keys():
+        frame_info[f"{region_name}_min_x"] = None
+        frame_info[f"{region_name}_max_x"] = None
+        frame_info[f"{region_name}_min_y"] = None
+        frame_info[f"{region_name}_max_y"] = None
+        frame_info[f"{region_name}_center_x"] = None
+        frame_info[f"{region_name}_center_y"] = None
+        frame_info[f"{region_name}_width"] = None
+        frame_info[f"{region_name}_height"] = None
+
+def _fill_regions(frame_info, bounds):
+    """Bir karenin REGION_BOUNDS_DTYPE satırlarını tablo sütunlarına yazar"""
+    for region_name, (min_x, max_x, min_y, max_y, center_x, center_y, width, height, valid) in zip(
+            REGION_NAMES, bounds.tolist()):
+        if valid:
+            frame_info[f"{region_name}_min_x"] = min_x
+            frame_info[f"{region_name}_max_x"] = max_x
+            frame_info[f"{region_name}_min_y"] = min_y
+            frame_info[f"{region_name}_max_y"] = max_y
+            frame_info[f"{region_name}_center_x"] = round(center_x, 2)
+            frame_info[f"{region_name}_center_y"] = round(center_y, 2)
+            frame_info[f"{region_name}_width"] = width
+            frame_info[f"{region_name}_height"] = height
+        else:
+            frame_info[f"{region_name}_min_x"] = None
+            frame_info[f"{region_name}_max_x"] = None
+            frame_info[f"{region_name}_min_y"] = None
+            frame_info[f"{region_name}_max_y"] = None
+            frame_info[f"{region_name}_center_x"] = None
+            frame_info[f"{region_name}_center_y"] = None
+            frame_info[f"{region_name}_width"] = None
+            frame_info[f"{region_name}_height"] = None
+
+# --running-mode roi: önceki karenin face_outline kutusu her kenardan kutu boyutunun bu oranı kadar genişletilip kırpılır
+ROI_MARGIN = 0.5
+ROI_MAX_AREA_RATIO = 0.6  # Kırpıntı karenin bu oranından büyükse tam kare kullanılır
+_FACE_OUTLINE_INDICES = FACE_REGIONS["face_outline"]
+
+class RoiDetector:
+    """
+    IMAGE modunda bölgeye odaklı tespit: bir önceki karede bulunan yüzün face_outline kutusu
+    (ROI_MARGIN kadar genişletilmiş) kırpılır ve landmarker sadece bu kırpıntıda çalışır;
+    landmark'lar tam kare koordinatlarına geri çevrilir. Kırpıntıda yüz bulunamazsa aynı kare
+    tam görüntüde yeniden denenir (yüz kaybında tam kare tespite düşülür).
+
+    detect() tam kare normalize (N, 3) dizi veya None döndürür; stats kare sayılarını tutar
+    ("roi": kırpıntıda bulunan, "full": tam karede işlenen, "fallback": kırpıntıda kaybedilip
+    tam karede yeniden denenen).
+    """
+
+    def __init__(self, landmarker, margin=ROI_MARGIN):
+        self.landmarker = landmarker
+        self.margin = margin
+        self.roi = None  # (x0, y0, x1, y1) piksel
+        self.stats = {"roi": 0, "full": 0, "fallback": 0}
+
+    def _detect(self, image):
+        detection = self.landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=image))
+        return landmarks_to_array(detection.face_landmarks[0], with_z=True) if detection.face_landmarks else None
+
+    def _next_roi(self, coords, frame_width, frame_height):
+        outline = coords[_FACE_OUTLINE_INDICES, :2] * (frame_width, frame_height)
+        (min_x, min_y), (max_x, max_y) = outline.min(axis=0), outline.max(axis=0)
+        pad_x, pad_y = (max_x - min_x) * self.margin, (max_y - min_y) * self.margin
+        x0, y0 = max(0, int(min_x - pad_x)), max(0, int(min_y - pad_y))
+        x1, y1 = min(frame_width, int(max_x + pad_x) + 1), min(frame_height, int(max_y + pad_y) + 1)
+        if x1 - x0 < 16 or y1 - y0 < 16 or (x1 - x0) * (y1 - y0) > ROI_MAX_AREA_RATIO * frame_width * frame_height:
+            return None
+        return x0, y0, x1, y1
+
+    def detect(self, frame):
+        frame_height, frame_width = frame.shape[:2]
+        coords = None
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            coords = self._detect(np.ascontiguousarray(frame[y0:y1, x0:x1]))
+            if coords is not None:
+                # Kırpıntıya göre normalize -> tam kareye göre normalize (z, x ile aynı ölçekte)
+                crop_width, crop_height = x1 - x0, y1 - y0
+                coords[:, 0] = (coords[:, 0] * crop_width + x0) / frame_width
+                coords[:, 1] = (coords[:, 1] * crop_height + y0) / frame_height
+                coords[:, 2] *= crop_width / frame_width
+                self.stats["roi"] += 1
+            else:
+                self.stats["fallback"] += 1
+        if coords is None:
+            coords = self._detect(frame)
+            self.stats["full"] += 1
+        self.roi = self._next_roi(coords, frame_width, frame_height) if coords is not None else None
+        return coords
+
+# Boru hattı kuyrukları: çözülen kareler ve serileştirilecek sonuçlar (sınırlı, bellek sabit kalır)
+DECODE_QUEUE_SIZE = 8
+WRITE_QUEUE_SIZE = 32
+WRITE_BATCH_SIZE = 256  # Yazıcının tek seferde dosyaya eklediği kare satırı
+DERIVE_BATCH_SIZE = 4096  # Önbellekten türetmede tek vektörel geçişteki kare
+STAGE_LABELS = [("decode", "çözme"), ("inference", "çıkarım"), ("write", "yazma")]
+
+_END = object()
+
+def _put(queue, item, stop):
+    """Kuyruk doluysa bekler; boru hattı durdurulduysa öğeyi bırakır"""
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+def _get(queue, stop):
+    """Kuyruktan alır; boru hattı durdurulduysa ve kuyruk boşsa _END döner"""
+    while True:
+        try:
+            return queue.get(timeout=0.1)
+        except Empty:
+            if stop.is_set():
+                return _END
+
+def _decode_stage(reader, frames, stop, max_frames, times, errors):
+    """Çözücü thread: ffmpeg'den kareleri okuyup (offset, kare) olarak kuyruğa koyar"""
     try:
-        reader = imageio.get_reader(video_path, "ffmpeg")
+        iterator = iter(reader)
+        offset = 0
+        while not stop.is_set() and (max_frames is None or offset < max_frames):
+            start = time.perf_counter()
+            try:
+                frame = next(iterator)
+            except StopIteration:
+                break
+            if frame is not None:
+                if frame.ndim == 2:
+                    # Gri tonlamalı kareleri RGB'ye genişlet
+                    frame = np.stack([frame] * 3, axis=-1)
+                frame = np.ascontiguousarray(frame)
+            times["decode"] += time.perf_counter() - start
+            if frame is not None:
+                _put(frames, (offset, frame), stop)
+            offset += 1
     except Exception as exc:
-        print(f"Hata: {video_path} açılamadı! ({exc})")
-        return
+        errors.append(exc)  # Çözülen kareler işlenir, hata boru hattı bitince yükseltilir
+    finally:
+        _put(frames, _END, stop)
+
+def _frame_row(video_id, frame_number, fps, width, height):
+    return {
+        "video_id": video_id,
+        "frame_number": frame_number,
+        "frame_time": round(frame_number / fps, 3),  # Saniye cinsinden zaman
+        "video_width": width,
+        "video_height": height
+    }
+
+_NO_FACE_RAW = np.full((NUM_LANDMARKS, 3), np.nan)
+
+def _write_stage(results, write_rows, write_raw, video_id, fps, width, height, total_frames, verbose,
+                 batch_size, times, counts, stop, errors):
+    """
+    Yazıcı thread: landmark'lardan bölge sütunlarını hesaplar, satırları toplu halde yazar.
+    write_raw verilirse her batch'in ham (N, 3) landmark'ları satırlardan önce ona verilir.
+    """
+    batch = []
+    raw_batch = []
     
-    with reader:
-        try:
-            meta = reader.get_meta_data()
-        except Exception:
-            meta = {}
-        
-        fps = meta.get("fps") or default_fps
-        fps = fps if fps and fps > 0 else default_fps
-        
-        size = meta.get("size")
-        if size and isinstance(size, (tuple, list)) and len(size) == 2:
-            width, height = int(size[0]), int(size[1])
-        else:
-            width = height = None
-        
-        total_frames = None
-        possible_frames = meta.get("nframes")
-        if isinstance(possible_frames, (int, float)) and not math.isinf(possible_frames):
-            total_frames = int(possible_frames)
-        
-        total_frames_display = total_frames if total_frames is not None else "?"
-        width_display = width if width is not None else "?"
-        height_display = height if height is not None else "?"
-        print(f"  FPS: {fps}, Toplam kare: {total_frames_display}, Boyut: {width_display}x{height_display}")
-        
-        frame_data = []
-        frame_number = 0
-        
-        for frame_number, frame in enumerate(reader, start=1):
-            if frame is None:
-                continue
-            
-            if frame.ndim == 2:
-                # Gri tonlamalı kareleri RGB'ye genişlet
-                frame = np.stack([frame] * 3, axis=-1)
-            
-            frame_height, frame_width = frame.shape[:2]
+    def flush():
+        if write_raw is not None:
+            write_raw([row["frame_number"] for row in batch], quantize_landmarks(np.stack(raw_batch)))
+            raw_batch.clear()
+        write_rows(batch)
+    
+    try:
+        while True:
+            item = _get(results, stop)
+            if item is _END:
+                break
+            start = time.perf_counter()
+            frame_number, frame_width, frame_height, face_landmarks = item
             if width is None or height is None:
                 width, height = frame_width, frame_height
             
-            frame_time = frame_number / fps  # Saniye cinsinden zaman
-            
-            rgb_frame = np.ascontiguousarray(frame)
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
-            
-            # Yüz landmark'larını tespit et
-            results = landmarker.detect(mp_image)
-            face_landmarks = results.face_landmarks[0] if results.face_landmarks else None
-            
-            frame_info = {
-                "video_id": video_id,
-                "frame_number": frame_number,
-                "frame_time": round(frame_time, 3),
-                "video_width": width,
-                "video_height": height
-            }
-            
-            if face_landmarks:
-                # Her yüz bölgesi için koordinatları hesapla
-                for region_name, region_indices in FACE_REGIONS.items():
-                    bounds = get_region_bounds(face_landmarks, region_indices, width, height)
-                    if bounds:
-                        frame_info[f"{region_name}_min_x"] = int(bounds["min_x"])
-                        frame_info[f"{region_name}_max_x"] = int(bounds["max_x"])
-                        frame_info[f"{region_name}_min_y"] = int(bounds["min_y"])
-                        frame_info[f"{region_name}_max_y"] = int(bounds["max_y"])
-                        frame_info[f"{region_name}_center_x"] = round(bounds["center_x"], 2)
-                        frame_info[f"{region_name}_center_y"] = round(bounds["center_y"], 2)
-                        frame_info[f"{region_name}_width"] = int(bounds["width"])
-                        frame_info[f"{region_name}_height"] = int(bounds["height"])
-                    else:
-                        frame_info[f"{region_name}_min_x"] = None
-                        frame_info[f"{region_name}_max_x"] = None
-                        frame_info[f"{region_name}_min_y"] = None
-                        frame_info[f"{region_name}_max_y"] = None
-                        frame_info[f"{region_name}_center_x"] = None
-                        frame_info[f"{region_name}_center_y"] = None
-                        frame_info[f"{region_name}_width"] = None
-                        frame_info[f"{region_name}_height"] = None
+            frame_info = _frame_row(video_id, frame_number, fps, width, height)
+            if face_landmarks is not None:
+                # Tüm yüz bölgelerinin koordinatları tek vektörel geçişte (ROI modu hazır dizi verir).
+                # Tablo tam hassasiyetle hesaplanır; float16'ya sadece önbelleğe yazılan kopya yuvarlanır.
+                coords = face_landmarks
+                if not isinstance(coords, np.ndarray):
+                    coords = landmarks_to_array(coords, with_z=write_raw is not None)
+                bounds = compute_region_bounds(coords[:, :2], width, height)
+                _fill_regions(frame_info, bounds)
             else:
                 # Yüz bulunamadı
-                for region_name in FACE_REGIONS.keys():
-                    frame_info[f"{region_name}_min_x"] = None
-                    frame_info[f"{region_name}_max_x"] = None
-                    frame_info[f"{region_name}_min_y"] = None
-                    frame_info[f"{region_name}_max_y"] = None
-                    frame_info[f"{region_name}_center_x"] = None
-                    frame_info[f"{region_name}_center_y"] = None
-                    frame_info[f"{region_name}_width"] = None
-                    frame_info[f"{region_name}_height"] = None
-            
-            frame_data.append(frame_info)
+                coords = _NO_FACE_RAW
+                _empty_regions(frame_info)
+            batch.append(frame_info)
+            if write_raw is not None:
+                raw_batch.append(coords)
+            if len(batch) >= batch_size:
+                flush()
+                batch = []
+            times["write"] += time.perf_counter() - start
+            counts["frames"] += 1
             
             # İlerleme göster
-            if frame_number % 30 == 0:
+            if verbose and frame_number % 30 == 0:
                 if total_frames is not None:
                     print(f"  İşlenen kare: {frame_number}/{total_frames}")
                 else:
                     print(f"  İşlenen kare: {frame_number}")
+        if batch:
+            start = time.perf_counter()
+            flush()
+            times["write"] += time.perf_counter() - start
+    except Exception as exc:
+        errors.append(exc)
+        stop.set()
+
+def _detect_frames(reader, landmarker, video_id, fps, width, height, write_rows, start_frame=0,
+                   max_frames=None, total_frames=None, verbose=True, running_mode="image", write_raw=None):
+    """
+    Reader'daki kareleri üç aşamalı boru hattında işler:
+        çözücü thread (ffmpeg) -> çıkarım (bu thread, MediaPipe) -> yazıcı thread (bölgeler + dosya)
+    Aşamalar sınırlı kuyruklarla bağlıdır; kod çözme ve yazma çıkarımla örtüşür. Landmarker
+    sadece çağıran thread'de kullanılır. Satırlar frame_number sırasıyla write_rows'a
+    WRITE_BATCH_SIZE'lık listeler halinde verilir; write_raw verilirse aynı karelerin ham
+    landmark'ları (write_raw(frame_numbers, (B, 478, 3) dizi)) her batch'ten önce yazılır.
+    start_frame: reader'ın ilk karesinin videodaki index'i (parça işlemede seek edilen kare)
+    max_frames: en fazla işlenecek kare (None: video sonuna kadar)
+    running_mode: "video" ise landmarker VIDEO modunda oluşturulmuş olmalı; kareler
+        detect_for_video'ya kesin artan milisaniye zaman damgalarıyla verilir. "roi" ise IMAGE
+        modlu landmarker bir önceki karenin yüz bölgesinde çalıştırılır (bkz. RoiDetector)
+
+    Returns:
+        (işlenen kare sayısı, {"decode", "inference", "write", "wall"} saniye)
+    """
+    video_mode = running_mode == "video"
+    roi_detector = RoiDetector(landmarker) if running_mode == "roi" else None
+    last_timestamp_ms = -1
+    times = {"decode": 0.0, "inference": 0.0, "write": 0.0}
+    counts = {"frames": 0}
+    errors = []
+    stop = threading.Event()
+    frames = Queue(maxsize=DECODE_QUEUE_SIZE)
+    results = Queue(maxsize=WRITE_QUEUE_SIZE)
     
-    # CSV'ye kaydet
-    if frame_data:
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    wall_start = time.perf_counter()
+    decoder = threading.Thread(target=_decode_stage, name="LandmarkDecoder", daemon=True,
+                               args=(reader, frames, stop, max_frames, times, errors))
+    writer = threading.Thread(target=_write_stage, name="LandmarkWriter", daemon=True,
+                              args=(results, write_rows, write_raw, video_id, fps, width, height, total_frames, verbose,
+                                    WRITE_BATCH_SIZE, times, counts, stop, errors))
+    decoder.start()
+    writer.start()
+    try:
+        while not stop.is_set():
+            item = _get(frames, stop)
+            if item is _END:
+                break
+            offset, frame = item
+            frame_number = start_frame + offset + 1
+            
+            start = time.perf_counter()
+            if roi_detector is not None:
+                face_landmarks = roi_detector.detect(frame)
+            else:
+                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+                # Yüz landmark'larını tespit et (VIDEO modunda önceki kareden takip edilir)
+                if video_mode:
+                    timestamp_ms = max(int(round(frame_number * 1000.0 / fps)), last_timestamp_ms + 1)
+                    last_timestamp_ms = timestamp_ms
+                    detection = landmarker.detect_for_video(mp_image, timestamp_ms)
+                else:
+                    detection = landmarker.detect(mp_image)
+                face_landmarks = detection.face_landmarks[0] if detection.face_landmarks else None
+            times["inference"] += time.perf_counter() - start
+            
+            _put(results, (frame_number, frame.shape[1], frame.shape[0], face_landmarks), stop)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        _put(results, _END, stop)
+        writer.join()
+        stop.set()  # Çözücü erken bittiysek (max_frames, hata) beklemesin
+        decoder.join()
+    
+    if errors:
+        raise errors[0]
+    times["wall"] = time.perf_counter() - wall_start
+    if verbose and roi_detector is not None:
+        stats = roi_detector.stats
+        print(f"  ROI: {stats['roi']} kare kırpıntıda, {stats['full']} kare tam karede "
+              f"({stats['fallback']} kez kırpıntıda kaybedildi)")
+    return counts["frames"], times
+
+def format_stage_times(stages, frames):
+    """Aşama sürelerini 'çözme 1.2s (4.0 ms/kare), ...' biçiminde verir"""
+    parts = []
+    for key, label in STAGE_LABELS:
+        per_frame = stages[key] * 1000 / frames if frames else 0.0
+        parts.append(f"{label} {stages[key]:.1f}s ({per_frame:.1f} ms/kare)")
+    return ", ".join(parts) + f"; toplam {stages['wall']:.1f}s"
+
+def _checkpoint_params(video_path, fps, running_mode):
+    """Kontrol noktasına yazılan bilgiler; devam ederken birebir aynı olmalı (video değiştiyse baştan)"""
+    stat = os.stat(video_path)
+    return {"video_size": stat.st_size, "video_mtime_ns": stat.st_mtime_ns, "fps": fps,
+            "running_mode": running_mode}
+
+def _open_reader(video_path, start_frame=0, fps=None):
+    """
+    Video reader'ı açar. start_frame > 0 ise ffmpeg'e giriş seçeneği olarak -ss verilir
+    (girişte seek: anahtar kareye atlar, sonra hedef zamana kadar kod çözer), böylece
+    video baştan okunmadan doğru kareden başlanır.
+    """
+    input_params = ["-ss", "{:.6f}".format(start_frame / fps)] if start_frame > 0 else None
+    return imageio.get_reader(video_path, "ffmpeg", input_params=input_params)
+
+def process_video(video_path, output_file, landmarker, default_fps=FPS, verbose=True, running_mode="image",
+                  resume=False, cache_entry=None):
+    """
+    Videoyu kare kare işleyip yüz landmark'larını çıkarır; satırlar işlendikçe dosyaya yazılır
+    ve her yazımdan sonra kontrol noktası güncellenir.
+    running_mode="video" ise landmarker bu video için yeni oluşturulmuş VIDEO modlu olmalıdır.
+    resume=True ise yarım kalmış çıkarımın son kontrol noktasından devam edilir (tamamlanan
+    karelere seek edilerek atlanır; VIDEO modunda takip o kareden yeniden başlar).
+    cache_entry (landmark_cache.CacheEntry) verilirse ham landmark'lar da önbelleğe yazılır.
+
+    Returns:
+        {"frames": bu çalışmada işlenen kare, "saved": dosya yazıldı mı, "resumed": devralınan kare,
+         "stages": aşama süreleri}; video açılamazsa None
+    """
+    video_name = os.path.basename(video_path)
+    video_id = os.path.splitext(video_name)[0]
+    
+    if verbose:
+        print(f"İşleniyor: {video_name}")
+    
+    try:
+        reader = _open_reader(video_path)
+    except Exception as exc:
+        print(f"Hata: {video_path} açılamadı! ({exc})")
+        return
+    
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(reader)
+        fps, width, height, total_frames, _ = _read_video_meta(reader, default_fps)
         
-        # CSV başlıkları
-        fieldnames = ["video_id", "frame_number", "frame_time", "video_width", "video_height"]
-        for region_name in FACE_REGIONS.keys():
-            fieldnames.extend([
-                f"{region_name}_min_x", f"{region_name}_max_x",
-                f"{region_name}_min_y", f"{region_name}_max_y",
-                f"{region_name}_center_x", f"{region_name}_center_y",
-                f"{region_name}_width", f"{region_name}_height"
-            ])
+        total_frames_display = total_frames if total_frames is not None else "?"
+        width_display = width if width is not None else "?"
+        height_display = height if height is not None else "?"
+        if verbose:
+            print(f"  FPS: {fps}, Toplam kare: {total_frames_display}, Boyut: {width_display}x{height_display}")
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(frame_data)
+        # Format dosya uzantısından: .csv, .parquet veya .arrow - bkz. landmark_io.py
+        writer = stack.enter_context(LandmarkWriter(
+            output_file, region_names=REGION_NAMES, resume=resume,
+            checkpoint=_checkpoint_params(video_path, fps, running_mode)))
+        start_frame = writer.last_frame
+        raw_writer = None
+        if cache_entry is not None and width is not None and height is not None:
+            raw_writer = stack.enter_context(cache_entry.raw_writer(writer.resumed_rows))
+        if start_frame:
+            if verbose:
+                print(f"  Devam ediliyor: {start_frame}. kareden sonrası ({writer.resumed_rows} kare zaten yazılmış)")
+            reader.close()
+            reader = stack.enter_context(_open_reader(video_path, start_frame, fps))
         
-        print(f"  ✓ Kaydedildi: {output_file} ({len(frame_data)} kare)")
-    else:
+        frames, stages = _detect_frames(reader, landmarker, video_id, fps, width, height, writer.write_rows,
+                                        start_frame=start_frame, total_frames=total_frames, verbose=verbose,
+                                        running_mode=running_mode,
+                                        write_raw=raw_writer.write if raw_writer is not None else None)
+    
+    if raw_writer is not None and raw_writer.valid and writer.rows_written:
+        cache_entry.finalize(fps=fps, width=width, height=height)
+        cache_entry.record_output(output_file, region_params_hash())
+    
+    if verbose:
+        if writer.rows_written:
+            print(f"  ✓ Kaydedildi: {output_file} ({writer.rows_written} kare)")
+        else:
+            print(f"  ⚠ Hiç veri bulunamadı!")
+        print(f"  Aşamalar: {format_stage_times(stages, frames)}")
+    
+    return {"frames": frames, "saved": writer.rows_written > 0, "resumed": writer.resumed_rows, "stages": stages}
+
+def region_params_hash():
+    """Landmark tablosunu ham landmark'lardan türeten bölge tanımlarının özeti"""
+    return params_hash({"regions": FACE_REGIONS, "padding_ratio": REGION_PADDING_RATIO,
+                        "min_padding": MIN_REGION_PADDING})
+
+def extraction_params(running_mode="image"):
+    """Önbellek anahtarına giren çıkarım parametreleri (bölge tanımları hariç)"""
+    params = {"running_mode": running_mode, **LANDMARKER_OPTIONS}
+    if running_mode == "roi":
+        params.update(roi_margin=ROI_MARGIN, roi_max_area_ratio=ROI_MAX_AREA_RATIO)
+    return params
+
+def derive_from_cache(cache_entry, video_id, output_file, verbose=True):
+    """
+    Önbellekteki ham landmark'lardan landmark tablosunu MediaPipe çalıştırmadan yeniden
+    hesaplar (bölgeler DERIVE_BATCH_SIZE karelik gruplar halinde vektörel hesaplanır).
+
+    Returns:
+        Yazılan kare sayısı
+    """
+    manifest = cache_entry.manifest()
+    fps, width, height = manifest["fps"], manifest["width"], manifest["height"]
+    frame_numbers, coords = cache_entry.read_raw()
+    with LandmarkWriter(output_file, region_names=REGION_NAMES) as writer:
+        for start in range(0, len(frame_numbers), DERIVE_BATCH_SIZE):
+            end = start + DERIVE_BATCH_SIZE
+            bounds = compute_region_bounds(coords[start:end, :, :2], width, height)
+            rows = []
+            for frame_number, frame_bounds in zip(frame_numbers[start:end].tolist(), bounds):
+                frame_info = _frame_row(video_id, frame_number, fps, width, height)
+                _fill_regions(frame_info, frame_bounds)  # Yüz olmayan karelerde (NaN) tüm bölgeler boş
+                rows.append(frame_info)
+            writer.write_rows(rows)
+    cache_entry.record_output(output_file, region_params_hash())
+    if verbose:
+        print(f"  ✓ Önbellekten türetildi: {output_file} ({writer.rows_written} kare)")
+    return writer.rows_written
+
+def _save_frames(frame_data, output_file, verbose=True):
+    # Kaydet (format dosya uzantısından: .csv, .parquet veya .arrow - bkz. landmark_io.py)
+    if frame_data:
+        write_landmarks(frame_data, output_file, region_names=REGION_NAMES)
+        if verbose:
+            print(f"  ✓ Kaydedildi: {output_file} ({len(frame_data)} kare)")
+    elif verbose:
         print(f"  ⚠ Hiç veri bulunamadı!")
+    
+    return {"frames": len(frame_data), "saved": bool(frame_data)}
+
+def plan_chunks(video_path, chunk_seconds, default_fps=FPS):
+    """
+    Videoyu chunk_seconds uzunluğunda zaman aralıklarına böler.
+
+    Returns:
+        (fps, [(start_frame, frame_count), ...]) - son parçanın frame_count'u None (video sonuna
+        kadar okunur, böylece meta verideki süre tahmini yanlış olsa da kare kaçmaz).
+        Video tek parçadan kısaysa veya süresi bilinmiyorsa None.
+    """
+    with imageio.get_reader(video_path, "ffmpeg") as reader:
+        fps, _, _, total_frames, duration = _read_video_meta(reader, default_fps)
+    if not duration or chunk_seconds <= 0:
+        return None
+    estimated_frames = total_frames or int(round(duration * fps))
+    chunk_frames = max(1, int(round(chunk_seconds * fps)))
+    if estimated_frames <= chunk_frames:
+        return None
+    starts = list(range(0, estimated_frames, chunk_frames))
+    chunks = [(start, chunk_frames) for start in starts[:-1]]
+    chunks.append((starts[-1], None))
+    return fps, chunks
+
+def process_video_chunk(video_path, landmarker, start_frame, frame_count, fps, default_fps=FPS,
+                        running_mode="image", raw_base=None):
+    """
+    Videonun [start_frame, start_frame + frame_count) aralığını işler; parça _open_reader ile
+    baştan okunmadan doğru kareden başlar. raw_base verilirse parçanın ham landmark'ları
+    oraya yazılır (bkz. CacheEntry.part_base / assemble_parts).
+
+    Returns:
+        (kare satırları (frame_number/frame_time videonun tamamına göre), aşama süreleri)
+    """
+    video_id = os.path.splitext(os.path.basename(video_path))[0]
+    with _open_reader(video_path, start_frame, fps) as reader:
+        _, width, height, _, _ = _read_video_meta(reader, default_fps)
+        rows = []
+        with contextlib.ExitStack() as stack:
+            raw_writer = stack.enter_context(RawLandmarkWriter(raw_base)) if raw_base else None
+            _, stages = _detect_frames(reader, landmarker, video_id, fps, width, height, rows.extend,
+                                       start_frame=start_frame, max_frames=frame_count, verbose=False,
+                                       running_mode=running_mode,
+                                       write_raw=raw_writer.write if raw_writer is not None else None)
+    return rows, stages
+
+def stitch_chunks(chunk_rows):
+    """
+    Parça sonuçlarını frame_number sırasıyla birleştirir; çakışan kareler tekilleştirilir.
+
+    Returns:
+        (rows, eksik kare sayısı)
+    """
+    rows_by_frame = {}
+    for rows in chunk_rows:
+        for row in rows:
+            rows_by_frame.setdefault(row["frame_number"], row)
+    frame_numbers = sorted(rows_by_frame)
+    missing = (frame_numbers[-1] - frame_numbers[0] + 1 - len(frame_numbers)) if frame_numbers else 0
+    return [rows_by_frame[n] for n in frame_numbers], missing
+
+def create_landmarker(model_path, running_mode="image"):
+    """CPU üzerinde tek yüz için FaceLandmarker oluşturur (running_mode: "image", "video" veya "roi")"""
+    base_options = mp_tasks.BaseOptions(
+        model_asset_path=str(model_path),
+        delegate=mp_tasks.BaseOptions.Delegate.CPU
+    )
+    mode = mp_vision.RunningMode.VIDEO if running_mode == "video" else mp_vision.RunningMode.IMAGE
+    landmarker_options = mp_vision.FaceLandmarkerOptions(
+        base_options=base_options,
+        running_mode=mode,
+        output_facial_transformation_matrixes=False,
+        **LANDMARKER_OPTIONS
+    )
+    return mp_vision.FaceLandmarker.create_from_options(landmarker_options)
+
+def landmarker_session(model_path, running_mode, shared=None):
+    """
+    Bir video (veya parça) için kullanılacak landmarker'ı context manager olarak verir.
+    IMAGE / ROI modunda paylaşılan landmarker kullanılır; VIDEO modunda takip durumu ve zaman
+    damgaları videoya özel olduğundan her video için yeni bir landmarker açılıp kapatılır.
+    """
+    if running_mode == "video":
+        return create_landmarker(model_path, running_mode)
+    return contextlib.nullcontext(shared)
+
+# --workers modunda her işçi sürecin kendi landmarker'ı (süreçler arasında paylaşılmaz)
+_worker_landmarker = None
+_worker_model_path = None
+_worker_running_mode = "image"
+
+def _init_worker(model_path, running_mode="image"):
+    global _worker_landmarker, _worker_model_path, _worker_running_mode
+    _worker_model_path = model_path
+    _worker_running_mode = running_mode
+    if running_mode != "video":
+        _worker_landmarker = create_landmarker(model_path)
+
+def _run_job(landmarker, video_path, output_file, default_fps, verbose, model_path=None, running_mode="image",
+             resume=False, cache_entry=None):
+    """Tek bir videoyu işler; hata diğer videoları etkilemesin diye sonuç sözlüğüne yazılır"""
+    result = {"video_id": Path(video_path).stem, "worker": os.getpid(), "frames": 0, "error": None}
+    start = time.perf_counter()
+    try:
+        with landmarker_session(model_path, running_mode, landmarker) as video_landmarker:
+            stats = process_video(video_path, output_file, video_landmarker, default_fps=default_fps,
+                                  verbose=verbose, running_mode=running_mode, resume=resume,
+                                  cache_entry=cache_entry)
+        if stats is None:
+            result["error"] = "video açılamadı"
+        else:
+            result["frames"] = stats["frames"]
+            result["stages"] = stats["stages"]
+            result["resumed"] = stats["resumed"]
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def _worker_job(video_path, output_file, default_fps, resume=False, cache_entry=None):
+    return _run_job(_worker_landmarker, video_path, output_file, default_fps, verbose=False,
+                    model_path=_worker_model_path, running_mode=_worker_running_mode, resume=resume,
+                    cache_entry=cache_entry)
+
+def _derive_job(video_path, output_file, cache_entry, verbose=True):
+    """Önbellekte kaydı olan videonun tablosunu ham landmark'lardan türetir (_run_job ile aynı sonuç sözlüğü)"""
+    result = {"video_id": Path(video_path).stem, "worker": os.getpid(), "frames": 0, "error": None,
+              "cached": True}
+    start = time.perf_counter()
+    try:
+        result["frames"] = derive_from_cache(cache_entry, result["video_id"], output_file, verbose=verbose)
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def _worker_chunk_job(video_path, start_frame, frame_count, fps, default_fps, raw_base=None):
+    """İşçi süreçte videonun bir parçasını işler; kare satırları ana sürece döner"""
+    result = {"video_id": Path(video_path).stem, "worker": os.getpid(), "frames": 0, "error": None, "rows": None}
+    start = time.perf_counter()
+    try:
+        with landmarker_session(_worker_model_path, _worker_running_mode, _worker_landmarker) as landmarker:
+            rows, stages = process_video_chunk(video_path, landmarker, start_frame, frame_count, fps, default_fps,
+                                               running_mode=_worker_running_mode, raw_base=raw_base)
+        result["rows"] = rows
+        result["frames"] = len(rows)
+        result["stages"] = stages
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def _future_result(future, video_path):
+    try:
+        return future.result()
+    except Exception as exc:
+        # İşçi süreç çöktü (ör. model yüklenemedi, bellek)
+        return {"video_id": Path(video_path).stem, "worker": None, "frames": 0,
+                "elapsed": 0.0, "error": f"işçi süreç hatası: {type(exc).__name__}: {exc}"}
+
+def _collect_chunks(video_path, output_file, futures, fps=None, chunks=(), cache_entry=None):
+    """
+    Parça sonuçlarını sırayla bekler, birleştirip tek tablo olarak kaydeder.
+    cache_entry verilirse parçaların ham landmark dosyaları da önbellek kaydında birleştirilir.
+    Bir parça hata verdiyse veya birleştirilen tabloda kare eksikse tablo kaydedilmez (iş hatası)
+    ve parçaların ham dosyaları silinir.
+    """
+    parts = [_future_result(future, video_path) for future in futures]
+    result = {"video_id": Path(video_path).stem, "worker": None, "frames": 0, "error": None,
+              "elapsed": sum(part["elapsed"] for part in parts), "parts": parts}
+    errors = [f"parça {i}: {part['error']}" for i, part in enumerate(parts, start=1) if part["error"]]
+    rows = missing = None
+    if not errors:
+        rows, missing = stitch_chunks([part["rows"] for part in parts])
+        if missing:
+            errors.append(f"birleştirilen tabloda {missing} kare eksik, tablo kaydedilmedi")
+    if errors:
+        result["error"] = "; ".join(errors)
+        if cache_entry is not None:
+            cache_entry.discard_parts([start_frame for start_frame, _ in chunks])
+    else:
+        result["frames"] = _save_frames(rows, str(output_file), verbose=False)["frames"]
+        if cache_entry is not None and rows:
+            if cache_entry.assemble_parts([start_frame for start_frame, _ in chunks]) == len(rows):
+                cache_entry.finalize(fps=fps, width=rows[0]["video_width"], height=rows[0]["video_height"])
+                cache_entry.record_output(output_file, region_params_hash())
+        result["stages"] = {key: sum(part["stages"][key] for part in parts)
+                            for key in ("decode", "inference", "write", "wall")}
+    for part in parts:
+        part["rows"] = None  # Satırlar yazıldı, belleği bırak
+    return result
+
+def _report(index, total, result):
+    if result["error"]:
+        print(f"[{index}/{total}] ✗ {result['video_id']}: {result['error']}")
+    else:
+        fps = result["frames"] / result["elapsed"] if result["elapsed"] > 0 else 0.0
+        if result.get("parts"):
+            where = f"{len(result['parts'])} parça"
+        elif result.get("cached"):
+            where = "önbellekten"
+        else:
+            where = f"işçi {result['worker']}"
+        if result.get("resumed"):
+            where += f", {result['resumed']} kare devralındı"
+        print(f"[{index}/{total}] ✓ {result['video_id']}: {result['frames']} kare, "
+              f"{result['elapsed']:.1f}s ({fps:.1f} kare/s, {where})")
+        if result.get("stages") and result["worker"] != os.getpid():  # Seri modda process_video yazdırdı
+            print(f"    Aşamalar: {format_stage_times(result['stages'], result['frames'])}")
+
+def run_parallel(jobs, model_path, workers, default_fps=FPS, chunk_seconds=None, running_mode="image",
+                 resume=False):
+    """
+    Videoları işçi süreç havuzunda işler (her işçi bütün bir videoyu işler).
+    chunk_seconds verilirse bundan uzun videolar zaman aralıklarına bölünür, parçalar
+    farklı işçilerde işlenir ve sonuçlar tek tabloda birleştirilir. jobs: (video, çıktı dosyası,
+    önbellek kaydı veya None) listesi. resume=True ise kontrol
+    noktası olan videolar parçalanmadan, kaldıkları yerden devam ettirilir.
+    İlerleme video sırasıyla raporlanır; bir videodaki hata diğerlerini durdurmaz.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")  # mediapipe fork sonrası güvenli değil
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(str(model_path), running_mode)) as pool:
+        submitted = []
+        for video_path, output_file, cache_entry in jobs:
+            plan = None
+            if resume and read_checkpoint(output_file):
+                pass  # Parçalanmaz, _worker_job kontrol noktasından devam eder
+            elif chunk_seconds:
+                try:
+                    plan = plan_chunks(str(video_path), chunk_seconds, default_fps)
+                except Exception:
+                    plan = None  # Açılamayan video bütün olarak gönderilir, hata orada raporlanır
+            if plan:
+                fps, chunks = plan
+                futures = [pool.submit(_worker_chunk_job, str(video_path), start_frame, frame_count, fps, default_fps,
+                                       cache_entry.part_base(start_frame) if cache_entry is not None else None)
+                           for start_frame, frame_count in chunks]
+                submitted.append((video_path, output_file, cache_entry, (fps, chunks, futures)))
+            else:
+                submitted.append((video_path, output_file, cache_entry,
+                                  pool.submit(_worker_job, str(video_path), str(output_file), default_fps, resume,
+                                              cache_entry)))
+        for index, (video_path, output_file, cache_entry, future) in enumerate(submitted, start=1):
+            if isinstance(future, tuple):
+                fps, chunks, futures = future
+                result = _collect_chunks(video_path, output_file, futures, fps, chunks, cache_entry)
+            else:
+                result = _future_result(future, video_path)
+            _report(index, len(jobs), result)
+            results.append(result)
+    return results
+
+def print_summary(results, wall_time):
+    """Toplam ve işçi başına verim (kare/s) özetini yazdırır"""
+    frames = sum(r["frames"] for r in results)
+    failed = [r for r in results if r["error"]]
+    print(f"\n{'='*60}")
+    print(f"İşlenen video: {len(results) - len(failed)}/{len(results)}, toplam kare: {frames}, "
+          f"süre: {wall_time:.1f}s ({frames / wall_time if wall_time > 0 else 0:.1f} kare/s)")
+    per_worker = {}
+    for r in results:
+        for job in r.get("parts") or [r]:
+            if job["worker"] is None:
+                continue
+            stats = per_worker.setdefault(job["worker"], {"jobs": 0, "frames": 0, "busy": 0.0})
+            stats["jobs"] += 1
+            stats["frames"] += job["frames"]
+            stats["busy"] += job["elapsed"]
+    for worker, stats in sorted(per_worker.items()):
+        rate = stats["frames"] / stats["busy"] if stats["busy"] > 0 else 0.0
+        print(f"  İşçi {worker}: {stats['jobs']} iş, {stats['frames']} kare, "
+              f"{stats['busy']:.1f}s meşgul, {rate:.1f} kare/s")
+    if failed:
+        print("  Başarısız videolar:")
+        for r in failed:
+            print(f"    - {r['video_id']}: {r['error']}")
+    print(f"{'='*60}")
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Video karelerinden yüz landmark verisi çıkarır.")
     parser.add_argument("--video-dir", default=VIDEO_DIR, help="Video dosyalarının bulunduğu dizin")
-    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Çıktı CSV dosyaları için dizin")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Çıktı landmark dosyaları için dizin")
     parser.add_argument("--model-path", default=str(LANDMARKER_MODEL_PATH), help="MediaPipe face landmarker .task dosyası")
     parser.add_argument("--videos", nargs="+", help="Yalnızca belirtilen video ID'lerini işle (dosya adı uzantısız)")
     parser.add_argument("--recursive", action="store_true", help="Video dizinini alt dizinlerle birlikte tara")
-    parser.add_argument("--overwrite", action="store_true", help="Mevcut CSV dosyalarını yeniden oluştur")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Mevcut landmark dosyalarını yeniden oluştur (önbellekte kaydı olanlar ondan türetilir)")
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv",
+                        help="Çıktı formatı (parquet/arrow: int16 koordinatlar, pyarrow gerekir)")
     parser.add_argument("--limit", type=int, help="En fazla N video işle")
     parser.add_argument("--default-fps", type=float, default=FPS, help="Meta veride FPS yoksa kullanılacak varsayılan FPS")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Paralel işçi süreç sayısı (her işçi kendi landmarker'ı ile bütün videoları işler)")
+    parser.add_argument("--running-mode", choices=RUNNING_MODES, default="image",
+                        help="image: her karede yüz tespiti, video: detect_for_video ile kareler arası takip, "
+                             "roi: önceki karenin yüz bölgesi kırpılarak tespit (kayıpta tam kare)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Yarım kalmış çıkarımlara kontrol noktasından devam et (tamamlanan kareler atlanır)")
+    parser.add_argument("--chunk-seconds", type=float,
+                        help="--workers ile: bundan uzun videoları bu uzunlukta parçalara bölüp paralel işle")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="Ham landmark önbelleği (anahtar: video içeriği + model + parametreler)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Önbelleği kullanma: mevcut dosyalar sadece adına göre atlanır, MediaPipe her zaman çalışır")
     return parser.parse_args()
 
 def main():
@@ -326,6 +844,10 @@ def main():
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    if args.format not in available_formats():
+        print(f"{args.format} formatı için pyarrow gerekli (pip install pyarrow).")
+        return
+    
     video_files = collect_video_files(video_dir, recursive=args.recursive, video_ids=args.videos)
     if args.limit:
         video_files = video_files[:args.limit]
@@ -340,33 +862,80 @@ def main():
         print(f"Model dosyası bulunamadı: {model_path}. Lütfen modeli indirip tekrar deneyin.")
         return
     
-    base_options = mp_tasks.BaseOptions(
-        model_asset_path=str(model_path),
-        delegate=mp_tasks.BaseOptions.Delegate.CPU
-    )
-    landmarker_options = mp_vision.FaceLandmarkerOptions(
-        base_options=base_options,
-        num_faces=1,
-        min_face_detection_confidence=0.5,
-        min_face_presence_confidence=0.5,
-        min_tracking_confidence=0.5,
-        output_facial_transformation_matrixes=False
-    )
-    
     print(f"Toplam {len(video_files)} video bulundu.\n")
     
-    with mp_vision.FaceLandmarker.create_from_options(landmarker_options) as landmarker:
-        for video_path in video_files:
-            video_id = video_path.stem
-            output_file = output_dir / f"{video_id}_landmarks.csv"
-            
+    start = time.perf_counter()
+    if not args.no_cache:
+        model_sha256 = file_sha256(model_path, args.cache_dir)
+        params = extraction_params(args.running_mode)
+        derive_hash = region_params_hash()
+    
+    jobs = []
+    cached = []
+    uncached = 0
+    for video_path in video_files:
+        video_id = video_path.stem
+        output_file = landmark_path(output_dir, video_id, args.format)
+        
+        cache_entry = None
+        if args.no_cache:
             if output_file.exists() and not args.overwrite:
                 print(f"Atlanıyor (zaten var): {video_id}")
                 continue
-            
-            process_video(str(video_path), str(output_file), landmarker, default_fps=args.default_fps)
-            print()
+        else:
+            cache_entry = open_entry(video_path, model_sha256, params, args.cache_dir, video_id)
+            if not args.overwrite and cache_entry.output_is_current(output_file, derive_hash):
+                print(f"Atlanıyor (güncel): {video_id}")
+                continue
+            if cache_entry.is_complete():
+                # Video ve model aynı, sadece bölge tanımları değişti / tablo yok: MediaPipe gerekmez
+                cached.append((video_path, output_file, cache_entry))
+                continue
+            if output_file.exists() and not args.overwrite:
+                # Önbellekten önce (veya önbelleksiz) çıkarılmış tablo: adına göre atlanır, yeniden çıkarılmaz
+                print(f"Atlanıyor (zaten var, önbellek kaydı yok): {video_id}")
+                uncached += 1
+                continue
+        if not args.resume and read_checkpoint(output_file):
+            print(f"Not: {video_id} için yarım kalmış çıkarım var, baştan başlanıyor (devam için --resume)")
+        jobs.append((video_path, output_file, cache_entry))
+    
+    if uncached:
+        print(f"Not: {uncached} tablonun önbellek kaydı yok (önbellekten önce çıkarılmış veya video / model / "
+              f"parametreler değişmiş). Önbelleğe almak için bu videoları --overwrite ile yeniden çıkarın "
+              f"(ör. --videos <id> --overwrite).\n")
+    
+    results = []
+    if cached:
+        print(f"{len(cached)} video önbellekteki ham landmark'lardan türetiliyor...")
+        for index, (video_path, output_file, cache_entry) in enumerate(cached, start=1):
+            result = _derive_job(video_path, str(output_file), cache_entry, verbose=False)
+            _report(index, len(cached), result)
+            results.append(result)
+        print()
+    
+
+    # Parçalı modda tek video bile birden fazla işçiye dağılabilir
+    workers = max(1, args.workers if args.chunk_seconds else min(args.workers, len(jobs)))
+    if workers > 1 and jobs:
+        print(f"{len(jobs)} video {workers} işçi süreçle işleniyor...\n")
+        results += run_parallel(jobs, model_path, workers, default_fps=args.default_fps,
+                                chunk_seconds=args.chunk_seconds, running_mode=args.running_mode,
+                                resume=args.resume)
+    elif jobs:
+        # VIDEO modunda landmarker her video için _run_job içinde açılır
+        shared = create_landmarker(model_path) if args.running_mode != "video" else contextlib.nullcontext()
+        with shared as landmarker:
+            for index, (video_path, output_file, cache_entry) in enumerate(jobs, start=1):
+                result = _run_job(landmarker, str(video_path), str(output_file), args.default_fps, verbose=True,
+                                  model_path=model_path, running_mode=args.running_mode, resume=args.resume,
+                                  cache_entry=cache_entry)
+                _report(index, len(jobs), result)
+                results.append(result)
+                print()
     
+    if results:
+        print_summary(results, time.perf_counter() - start)
     print("Tüm videolar işlendi!")
 
 if __name__ == "__main__":
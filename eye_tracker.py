@@ -8,8 +8,704 @@ import socket
 import json
 import time as time_module
 import threading
-from typing import Optional, Tuple
-from queue import Queue
+from array import array
+from collections import deque
+from typing import List, Optional, Tuple
+from queue import Queue, Empty, Full
+
+from tracker_log import TrackerLogger, DEBUG, INFO
+
+# Opsiyonel hızlı JSON kütüphaneleri (yoksa stdlib json kullanılır)
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# TheEyeTribe frame 'state' bit maskeleri (API: tracker frame state)
+STATE_TRACKING_GAZE = 0x1
+STATE_TRACKING_EYES = 0x2
+STATE_TRACKING_PRESENCE = 0x4
+STATE_TRACKING_FAIL = 0x8
+STATE_TRACKING_LOST = 0x10
+# İstemci tarafı işaret biti (cihaz bu biti kullanmaz): bağlantı kopmasından sonra akışa eklenen boşluk işareti
+STATE_GAP = 0x100
+
+
+class GazeFrame:
+    """
+    Tek bir TheEyeTribe push frame'inin sıkıştırılmış kaydı.
+
+    Listener thread'de bir kez decode edilir; sonrasında alanlara doğrudan erişilir.
+    Koordinatlar ekran pikseli, timestamp saniye (cihaz saati, frame.time / 1000).
+    host_time aynı örneğin host monotonik saatindeki (time.perf_counter) karşılığıdır;
+    ClockSync tahmininden listener thread'de doldurulur (tahmin yoksa 0.0).
+    """
+
+    __slots__ = (
+        'timestamp', 'state', 'fix',
+        'raw_x', 'raw_y', 'avg_x', 'avg_y',
+        'left_psize', 'left_pcenter_x', 'left_pcenter_y',
+        'right_psize', 'right_pcenter_x', 'right_pcenter_y',
+        'host_time',
+    )
+
+    def __init__(self, timestamp, state, fix, raw_x, raw_y, avg_x, avg_y,
+                 left_psize, left_pcenter_x, left_pcenter_y,
+                 right_psize, right_pcenter_x, right_pcenter_y, host_time=0.0):
+        self.timestamp = timestamp
+        self.state = state
+        self.fix = bool(fix)
+        self.raw_x = raw_x
+        self.raw_y = raw_y
+        self.avg_x = avg_x
+        self.avg_y = avg_y
+        self.left_psize = left_psize
+        self.left_pcenter_x = left_pcenter_x
+        self.left_pcenter_y = left_pcenter_y
+        self.right_psize = right_psize
+        self.right_pcenter_x = right_pcenter_x
+        self.right_pcenter_y = right_pcenter_y
+        self.host_time = host_time
+
+    @classmethod
+    def from_frame(cls, frame: dict) -> 'GazeFrame':
+        """Sunucudan gelen 'frame' nesnesini decode eder"""
+        try:
+            # Hızlı yol: tam frame'de tüm alanlar mevcut
+            raw = frame['raw']
+            avg = frame['avg']
+            left = frame['lefteye']
+            right = frame['righteye']
+            left_pcenter = left['pcenter']
+            right_pcenter = right['pcenter']
+            return cls(
+                frame['time'] / 1000.0, frame['state'], frame['fix'],
+                raw['x'], raw['y'], avg['x'], avg['y'],
+                left['psize'], left_pcenter['x'], left_pcenter['y'],
+                right['psize'], right_pcenter['x'], right_pcenter['y'],
+            )
+        except (KeyError, TypeError):
+            pass
+
+        # Yavaş yol: eksik alanlar varsayılan değerlerle doldurulur
+        raw = frame.get('raw') or {}
+        avg = frame.get('avg') or {}
+        left = frame.get('lefteye') or {}
+        right = frame.get('righteye') or {}
+        left_pcenter = left.get('pcenter') or {}
+        right_pcenter = right.get('pcenter') or {}
+        time_ms = frame.get('time', int(time_module.time() * 1000))
+        return cls(
+            time_ms / 1000.0, frame.get('state', 0), frame.get('fix', False),
+            raw.get('x', 0), raw.get('y', 0), avg.get('x', 0), avg.get('y', 0),
+            left.get('psize', 0), left_pcenter.get('x', 0), left_pcenter.get('y', 0),
+            right.get('psize', 0), right_pcenter.get('x', 0), right_pcenter.get('y', 0),
+        )
+
+    def as_tuple(self) -> tuple:
+        """Alanları __slots__ sırasıyla döndürür"""
+        return (
+            self.timestamp, self.state, self.fix,
+            self.raw_x, self.raw_y, self.avg_x, self.avg_y,
+            self.left_psize, self.left_pcenter_x, self.left_pcenter_y,
+            self.right_psize, self.right_pcenter_x, self.right_pcenter_y,
+            self.host_time,
+        )
+
+    @classmethod
+    def gap_marker(cls, timestamp: float, host_time: float = 0.0) -> 'GazeFrame':
+        """Bağlantı kopması sonrası akışa eklenen işaret frame'i (koordinatlar anlamsızdır)"""
+        return cls(timestamp, STATE_GAP, False, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, host_time)
+
+    @property
+    def is_valid(self) -> bool:
+        """Cihaz bakışı takip edebildiyse ve hata bildirmediyse True"""
+        state = self.state
+        return bool(state & STATE_TRACKING_GAZE) and not (state & (STATE_TRACKING_FAIL | STATE_TRACKING_LOST | STATE_GAP))
+
+    @property
+    def is_gap(self) -> bool:
+        """Gerçek örnek değil, bağlantı boşluğu işareti ise True (bkz. EyeTracker.find_gap)"""
+        return bool(self.state & STATE_GAP)
+
+    def __repr__(self):
+        return "GazeFrame(timestamp={:.3f}, avg=({:.1f}, {:.1f}), fix={}, state={})".format(
+            self.timestamp, self.avg_x, self.avg_y, self.fix, self.state)
+
+
+if msgspec is not None:
+    # Push frame şeması: sadece GazeFrame'in kullandığı alanlar decode edilir, diğerleri atlanır
+    class _PointSchema(msgspec.Struct, frozen=True):
+        x: float = 0.0
+        y: float = 0.0
+
+    class _EyeSchema(msgspec.Struct, frozen=True):
+        psize: float = 0.0
+        pcenter: _PointSchema = _PointSchema()
+
+    class _FrameSchema(msgspec.Struct):
+        time: Optional[float] = None
+        state: int = 0
+        fix: bool = False
+        raw: _PointSchema = _PointSchema()
+        avg: _PointSchema = _PointSchema()
+        lefteye: _EyeSchema = _EyeSchema()
+        righteye: _EyeSchema = _EyeSchema()
+
+    class _PushValuesSchema(msgspec.Struct):
+        frame: Optional[_FrameSchema] = None
+
+    class _PushMessageSchema(msgspec.Struct):
+        category: str = ''
+        request: Optional[str] = None
+        values: Optional[_PushValuesSchema] = None
+
+
+class MessageDecoder:
+    """
+    TheEyeTribe mesajları için JSON decoder.
+
+    Backend önceliği (backend='auto'): msgspec > orjson > stdlib json.
+    decode_push_frame() tracker push frame'lerini doğrudan GazeFrame'e çevirir;
+    msgspec varsa sadece frame alanlarını içeren şema ile, ara dict oluşturmadan.
+    """
+
+    BACKENDS = ('msgspec', 'orjson', 'json')
+
+    def __init__(self, backend: str = 'auto'):
+        """
+        Args:
+            backend: 'auto', 'msgspec', 'orjson' veya 'json'
+        """
+        if backend == 'auto':
+            backend = 'msgspec' if msgspec is not None else ('orjson' if orjson is not None else 'json')
+        if backend == 'msgspec' and msgspec is None or backend == 'orjson' and orjson is None:
+            raise ValueError("JSON backend yüklü değil: {}".format(backend))
+        if backend not in self.BACKENDS:
+            raise ValueError("Bilinmeyen JSON backend: {}".format(backend))
+        self.backend = backend
+
+        if backend == 'msgspec':
+            self.loads = msgspec.json.Decoder().decode
+            self._push_decoder = msgspec.json.Decoder(_PushMessageSchema).decode
+        elif backend == 'orjson':
+            self.loads = orjson.loads
+            self._push_decoder = None
+        else:
+            self.loads = json.loads
+            self._push_decoder = None
+
+    def decode_push_frame(self, data: bytes) -> Optional[GazeFrame]:
+        """
+        Mesaj bir tracker push frame'i ise (request alanı yok) GazeFrame döndürür, değilse None.
+        None dönerse mesaj loads() ile genel yoldan işlenmelidir.
+        """
+        if b'"frame"' not in data:
+            return None
+
+        if self._push_decoder is None:
+            message = self.loads(data)
+            # Geçerli ama dict olmayan JSON (ör. liste) genel yola bırakılır (msgspec şemasındaki gibi)
+            if not isinstance(message, dict):
+                return None
+            if message.get('category') != 'tracker' or message.get('request') is not None:
+                return None
+            values = message.get('values')
+            frame = values.get('frame') if isinstance(values, dict) else None
+            if isinstance(frame, dict) and frame:
+                return GazeFrame.from_frame(frame)
+            return None
+
+        try:
+            message = self._push_decoder(data)
+        except msgspec.ValidationError:
+            return None
+        if message.category != 'tracker' or message.request is not None:
+            return None
+        frame = message.values.frame if message.values is not None else None
+        if frame is None:
+            return None
+        time_ms = frame.time if frame.time is not None else time_module.time() * 1000
+        raw, avg, left, right = frame.raw, frame.avg, frame.lefteye, frame.righteye
+        return GazeFrame(
+            time_ms / 1000.0, frame.state, frame.fix,
+            raw.x, raw.y, avg.x, avg.y,
+            left.psize, left.pcenter.x, left.pcenter.y,
+            right.psize, right.pcenter.x, right.pcenter.y,
+        )
+
+
+# GazeFrame alanlarının halka tampondaki array tipleri (__slots__ sırasıyla)
+_GAZE_FRAME_TYPECODES = ('d', 'l', 'b', 'd', 'd', 'd', 'd', 'd', 'd', 'd', 'd', 'd', 'd', 'd')
+
+
+class GazeRingBuffer:
+    """
+    Push edilen her gaze frame'ini saklayan sabit kapasiteli halka tampon.
+
+    GazeFrame alanları sütun sütun, baştan ayrılmış array'lerde tutulur;
+    çalışma sırasında bellek ayrımı yapılmaz. Tek yazar (listener thread)
+    varsayılır: yazar önce slotu doldurur, en son sayaç (seq) ilerletilir.
+    Okuyucular kilit almadan kopyalar; kopya sırasında üzerine yazılmış slotlar atılır.
+
+    seq: Şimdiye kadar push edilmiş toplam örnek sayısı (monoton artan).
+    """
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError("capacity pozitif olmalı")
+        self.capacity = capacity
+        self._columns = tuple(array(typecode, [0]) * capacity for typecode in _GAZE_FRAME_TYPECODES)
+        self._seq = 0
+
+    @property
+    def seq(self) -> int:
+        """Bir sonraki yazılacak örneğin sıra numarası"""
+        return self._seq
+
+    def push(self, frame: GazeFrame):
+        """Yeni frame'i ekler (sadece listener thread'den çağrılmalı)"""
+        seq = self._seq
+        i = seq % self.capacity
+        for column, value in zip(self._columns, frame.as_tuple()):
+            column[i] = value
+        # Sayaç en son güncellenir - okuyucular yarım yazılmış slotu görmez
+        self._seq = seq + 1
+
+    def _slice(self, start: int, end: int) -> List[GazeFrame]:
+        """[start, end) sıra aralığını GazeFrame listesi olarak kopyalar"""
+        cap = self.capacity
+        i0 = start % cap
+        count = end - start
+        if i0 + count <= cap:
+            columns = [column[i0:i0 + count] for column in self._columns]
+        else:
+            wrap = i0 + count - cap
+            columns = [column[i0:] + column[:wrap] for column in self._columns]
+        return [GazeFrame(*values) for values in zip(*columns)]
+
+    def drain_since(self, seq: int) -> Tuple[List[GazeFrame], int]:
+        """
+        seq'ten sonra push edilmiş tüm frame'leri döndürür.
+
+        Returns:
+            (frames, next_seq) - frames: GazeFrame listesi (eskiden yeniye),
+            next_seq: bir sonraki çağrıda kullanılacak sıra numarası.
+            Okuyucu capacity - 1'den fazla geride kaldıysa en eski frame'ler kaybolur (en eski
+            slot yazılıyor olabileceğinden atlanır); kaybolan frame sayısı
+            (next_seq - seq) - len(frames) ile bulunur.
+        """
+        end = self._seq
+        start = max(seq, end - self.capacity)
+        if start >= end:
+            return [], end
+
+        frames = self._slice(start, end)
+
+        # Kopya sırasında yazar halkayı dolaştıysa, üzerine yazılmış baştaki frame'leri at.
+        # Yazar o anda seq'i (S) ilerletmeden S % capacity slotunu (sıra S - capacity) dolduruyor
+        # olabilir; güvenli ilk sıra S - capacity + 1'dir
+        overwritten = self._seq + 1 - self.capacity - start
+        if overwritten > 0:
+            frames = frames[overwritten:]
+        return frames, end
+
+
+class LineFramer:
+    """
+    Socket akışını satırlara (\\n veya \\r\\n) ayıran, yeniden kullanılabilir tampon.
+
+    Veri recv_into ile doğrudan bytearray'e okunur; tampon büyüdükçe kopyalanmaz,
+    işlenmiş baş kısım sadece tampon dolduğunda öne kaydırılır. Arama ofseti
+    (scan) saklandığı için her byte yalnızca bir kez taranır.
+    """
+
+    def __init__(self, initial_size: int = 65536, max_size: int = 1 << 22, max_unterminated: int = 8192):
+        """
+        Args:
+            initial_size: Başlangıç tampon boyutu (byte)
+            max_size: Tek bir satır için izin verilen en büyük boyut; aşılırsa tampon atılır
+            max_unterminated: Satır sonu olmadan JSON olarak denenecek en büyük bekleyen veri (byte)
+        """
+        self.max_size = max_size
+        self.max_unterminated = max_unterminated
+        self._buf = bytearray(initial_size)
+        self._view = memoryview(self._buf)
+        self._start = 0  # İşlenmemiş verinin başı
+        self._end = 0    # Geçerli verinin sonu
+        self._scan = 0   # Satır sonu aramasının devam edeceği ofset
+        self.discarded_bytes = 0  # max_size aşıldığı için atılan byte sayısı
+
+    def reset(self):
+        """Tampondaki tüm veriyi atar"""
+        self._start = self._end = self._scan = 0
+
+    @property
+    def pending_bytes(self) -> int:
+        """Henüz tam satır oluşturmamış byte sayısı"""
+        return self._end - self._start
+
+    def _make_room(self):
+        """Tampon sonunda yer açar: önce işlenmiş kısmı öne kaydırır, gerekirse büyütür"""
+        pending = self._end - self._start
+        if self._start > 0:
+            self._buf[:pending] = self._buf[self._start:self._end]
+            self._scan -= self._start
+            self._start = 0
+            self._end = pending
+            if self._end < len(self._buf):
+                return
+
+        if len(self._buf) >= self.max_size:
+            # Satır sonu olmadan max_size aşıldı - bozuk akış, tamponu at
+            self.discarded_bytes += pending
+            self.reset()
+            return
+
+        new_buf = bytearray(min(len(self._buf) * 2, self.max_size))
+        new_buf[:pending] = self._buf[:pending]
+        self._view.release()
+        self._buf = new_buf
+        self._view = memoryview(new_buf)
+
+    def recv_into(self, sock) -> int:
+        """
+        Socket'ten doğrudan tampona okur.
+
+        Returns:
+            Okunan byte sayısı (0 = bağlantı kapandı)
+        """
+        if self._end == len(self._buf):
+            self._make_room()
+        n = sock.recv_into(self._view[self._end:])
+        self._end += n
+        return n
+
+    def feed(self, data: bytes):
+        """Socket dışından gelen veriyi tampona ekler (test ve benchmark için)"""
+        offset = 0
+        while offset < len(data):
+            if self._end == len(self._buf):
+                self._make_room()
+            n = min(len(data) - offset, len(self._buf) - self._end)
+            self._buf[self._end:self._end + n] = data[offset:offset + n]
+            self._end += n
+            offset += n
+
+    def messages(self):
+        """Tampondaki tüm tam satırları (satır sonu olmadan) sırayla üretir"""
+        buf = self._buf
+        while True:
+            newline = buf.find(b'\n', self._scan, self._end)
+            if newline < 0:
+                self._scan = self._end
+                break
+            line_end = newline
+            if line_end > self._start and buf[line_end - 1] == 0x0D:  # \r
+                line_end -= 1
+            line = bytes(self._view[self._start:line_end])
+            self._start = self._scan = newline + 1
+            yield line
+
+        if self._start == self._end:
+            # Tüm veri işlendi - bir sonraki okuma tamponun başından başlasın
+            self._start = self._end = self._scan = 0
+
+    def take_unterminated(self, decoder: json.JSONDecoder):
+        """
+        Satır sonu ile bitmeyen tam JSON nesnelerini (protokol dışı) ayıklar.
+        Sadece bekleyen veri '}' ile bitiyorsa ve max_unterminated byte'tan kısaysa denenir;
+        böylece parça parça gelen büyük mesajlar her parçada yeniden decode edilmez.
+        """
+        pending = self._end - self._start
+        if pending == 0 or pending > self.max_unterminated or self._buf[self._end - 1] != 0x7D:  # }
+            return []
+        try:
+            text = bytes(self._view[self._start:self._end]).decode('utf-8')
+        except UnicodeDecodeError:
+            return []
+
+        messages = []
+        idx = 0
+        while idx < len(text):
+            try:
+                _, parsed_end = decoder.raw_decode(text, idx)
+            except json.JSONDecodeError:
+                break
+            messages.append(text[idx:parsed_end].encode('utf-8'))
+            idx = parsed_end
+            while idx < len(text) and text[idx] in '\r\n \t':
+                idx += 1
+        if messages:
+            self._start += len(text[:idx].encode('utf-8'))
+            self._scan = max(self._scan, self._start)
+            if self._start == self._end:
+                self.reset()
+        return messages
+
+
+class LatencyHistogram:
+    """
+    Sabit kovalı gecikme histogramı (milisaniye).
+    Kayıt O(kova sayısı), bellek sabit; yüzdelikler kova üst sınırı olarak döner.
+    """
+
+    BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # Son kova: BUCKETS_MS[-1]'den büyük
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        """Bir gecikme ölçümünü (saniye) ekler"""
+        value_ms = seconds * 1000.0
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+        for i, bound in enumerate(self.BUCKETS_MS):
+            if value_ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p. yüzdeliğin (0-100) düştüğü kovanın üst sınırını döndürür (ms)"""
+        if self.count == 0:
+            return None
+        target = self.count * p / 100.0
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target and bucket_count:
+                return self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        """Özet istatistikleri döndürür"""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+class GazeGap:
+    """
+    Bağlantı kopması nedeniyle kaçırılan örnek aralığı.
+
+    start_time/end_time cihaz saatindedir (saniye): kopmadan önceki son frame ve yeniden
+    bağlandıktan sonraki ilk frame. host_* alanları time.perf_counter() değerleridir.
+    """
+
+    __slots__ = ('start_time', 'end_time', 'host_start', 'host_end', 'samples_lost', 'attempts', 'reason')
+
+    def __init__(self, start_time: Optional[float], host_start: float, reason: str):
+        self.start_time = start_time
+        self.end_time = None
+        self.host_start = host_start
+        self.host_end = None
+        self.samples_lost = None
+        self.attempts = 0
+        self.reason = reason
+
+    @property
+    def is_open(self) -> bool:
+        return self.end_time is None
+
+    @property
+    def duration(self) -> float:
+        """Boşluğun host saatine göre süresi (saniye); açıksa şu ana kadarki süre"""
+        end = self.host_end if self.host_end is not None else time_module.perf_counter()
+        return end - self.host_start
+
+    def close(self, end_time: float, host_end: float, frame_interval: Optional[float]):
+        """İlk yeni frame ile boşluğu kapatır ve kaçırılan örnek sayısını tahmin eder"""
+        self.end_time = end_time
+        self.host_end = host_end
+        span = host_end - self.host_start
+        if self.start_time is not None:
+            device_span = end_time - self.start_time
+            # Sunucu yeniden başladıysa cihaz saati sıfırlanmış olabilir - host süresine düş
+            if 0 < device_span <= span * 2 + 1.0:
+                span = device_span
+        if frame_interval:
+            self.samples_lost = max(0, int(round(span / frame_interval)) - 1)
+
+    def as_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return "GazeGap(start={}, end={}, duration={:.3f}s, samples_lost={}, reason={})".format(
+            self.start_time, self.end_time, self.duration, self.samples_lost, self.reason)
+
+
+class ClockSync:
+    """
+    Cihaz saati (frame.time) ile host monotonik saati (time.perf_counter) arasındaki eşleme.
+
+    Her frame için (varış zamanı - cihaz zamanı) = gerçek offset + ağ/işleme gecikmesi >= gerçek offset.
+    Bu yüzden window saniyelik pencerelerdeki en küçük değer (min filtre) offset'in üst sınırıdır;
+    pencere minimumlarına doğrusal regresyon uygulanarak kayma (drift) tahmin edilir.
+    Heartbeat turlarının en kısa RTT'sinin yarısı tek yön gecikme olarak düşülür.
+    PsychoPy'nin core.getTime() değeri de perf_counter tabanlıdır; host_time doğrudan karşılaştırılabilir.
+    """
+
+    def __init__(self, window: float = 1.0, history: int = 120, reset_threshold: float = 1.0):
+        """
+        Args:
+            window: Min filtre penceresi (saniye, cihaz saati)
+            history: Regresyonda kullanılan en fazla pencere sayısı
+            reset_threshold: Tahminden bu kadar (saniye) sapan örnekte eşleme sıfırlanır
+                             (ör. sunucu yeniden başladı ve cihaz saati değişti)
+        """
+        self.window = window
+        self.reset_threshold = reset_threshold
+        self._points = deque(maxlen=history)  # (cihaz zamanı, pencere minimum offset'i)
+        self.min_rtt = None
+        self.resets = 0
+        self._reset_estimate()
+
+    def _reset_estimate(self):
+        self._points.clear()
+        self._window_start = None
+        self._window_min = None
+        self._window_device = None
+        self._ref_device = None
+        self._intercept = None  # _ref_device anındaki offset (saniye)
+        self.drift = 0.0  # saniye/saniye (host saati cihaz saatine göre ne kadar hızlı)
+
+    @property
+    def is_synchronized(self) -> bool:
+        return self._intercept is not None
+
+    def offset_at(self, device_time: float) -> Optional[float]:
+        """device_time anındaki tahmini (host - cihaz) offset'i (tek yön gecikme düşülmüş)"""
+        intercept = self._intercept
+        if intercept is None:
+            return None
+        offset = intercept + self.drift * (device_time - self._ref_device)
+        if self.min_rtt is not None:
+            offset -= self.min_rtt / 2.0
+        return offset
+
+    def to_host(self, device_time: float) -> Optional[float]:
+        """Cihaz zamanını (saniye) host perf_counter zamanına çevirir; tahmin yoksa None"""
+        offset = self.offset_at(device_time)
+        return None if offset is None else device_time + offset
+
+    def observe_frame(self, device_time: float, arrival: float):
+        """Frame varışını kaydeder (listener thread, frame başına)"""
+        offset = arrival - device_time
+        if self._intercept is not None:
+            predicted = self._intercept + self.drift * (device_time - self._ref_device)
+            if abs(offset - predicted) > self.reset_threshold:
+                self.resets += 1
+                self._reset_estimate()
+
+        if self._window_start is None:
+            self._window_start = device_time
+            self._window_min = offset
+            self._window_device = device_time
+        elif device_time - self._window_start >= self.window:
+            self._points.append((self._window_device, self._window_min))
+            self._fit()
+            self._window_start = device_time
+            self._window_min = offset
+            self._window_device = device_time
+        elif offset < self._window_min:
+            self._window_min = offset
+            self._window_device = device_time
+
+        if not self._points:
+            # İlk pencere dolana kadar o ana kadarki minimum kullanılır
+            self._ref_device = self._window_device
+            self._intercept = self._window_min
+
+    def observe_rtt(self, rtt: float):
+        """Heartbeat (veya başka bir istek) tur süresini kaydeder"""
+        if rtt >= 0 and (self.min_rtt is None or rtt < self.min_rtt):
+            self.min_rtt = rtt
+
+    def _fit(self):
+        """Pencere minimumlarına en küçük kareler doğrusu uydurur"""
+        points = self._points
+        n = len(points)
+        ref = points[-1][0]
+        if n < 3:
+            self._ref_device = ref
+            self._intercept = min(offset for _, offset in points)
+            self.drift = 0.0
+            return
+        mean_t = sum(t - ref for t, _ in points) / n
+        mean_o = sum(o for _, o in points) / n
+        var = sum((t - ref - mean_t) ** 2 for t, _ in points)
+        drift = sum((t - ref - mean_t) * (o - mean_o) for t, o in points) / var if var > 0 else 0.0
+        self._ref_device = ref
+        self.drift = drift
+        # Doğru, minimumların altından geçecek şekilde kaydırılır (min filtre mantığı korunur)
+        self._intercept = min(o - drift * (t - ref) for t, o in points)
+
+    def status(self) -> dict:
+        """Tahminin özet durumu"""
+        return {
+            'synchronized': self.is_synchronized,
+            'offset_s': self._intercept,
+            'drift_ppm': self.drift * 1e6,
+            'min_rtt_ms': self.min_rtt * 1000 if self.min_rtt is not None else None,
+            'windows': len(self._points),
+            'resets': self.resets,
+        }
+
+
+class SamplePipeline:
+    """
+    Örnek tüketicisi olarak kullanılabilen dönüşüm zinciri.
+    Her aşama bir önceki aşamanın çıktısını alır; None döndüren aşama zinciri o örnek için durdurur.
+
+    Kullanım:
+        tracker.add_sample_consumer(SamplePipeline(drop_invalid, to_video_coords, writer.write))
+    """
+
+    def __init__(self, *stages):
+        if not stages:
+            raise ValueError("En az bir aşama gerekli")
+        self.stages = stages
+
+    def __call__(self, value):
+        for stage in self.stages:
+            value = stage(value)
+            if value is None:
+                return None
+        return value
+
+
+_HEARTBEAT_BYTES = b'{"category":"heartbeat"}\r\n'
+
+
+class PendingRequest:
+    """Yanıt bekleyen tek bir istek (sıra numarası, gönderim zamanı ve sonuç)"""
+
+    __slots__ = ('seq', 'key', 'event', 'response', 'sent_at')
+
+    def __init__(self, seq: int, key: tuple):
+        self.seq = seq
+        self.key = key
+        self.event = threading.Event()
+        self.response = None
+        self.sent_at = None
+
 
 class EyeTracker:
     """
@@ -24,63 +720,126 @@ class EyeTracker:
         tracker.disconnect()
     """
     
-    def __init__(self, host='localhost', port=6555):
+    def __init__(self, host='localhost', port=6555, gaze_buffer_capacity=4096, diagnostic_queue_size=256,
+                 json_backend='auto', log_level=INFO, log_rate_limit=20.0,
+                 auto_reconnect=True, reconnect_initial_delay=0.5, reconnect_max_delay=10.0,
+                 reconnect_max_attempts=None, heartbeat_interval=1.0):
         """
         Args:
             host: TheEyeTribe sunucusunun IP adresi (genellikle localhost)
             port: TheEyeTribe sunucusunun port numarası (varsayılan: 6555)
+            gaze_buffer_capacity: Push frame halka tamponunun kapasitesi (60Hz'de ~68 saniye)
+            diagnostic_queue_size: Frame/yanıt olmayan mesajlar için sınırlı queue boyutu
+            json_backend: Mesaj decoder'ı ('auto', 'msgspec', 'orjson', 'json') - bkz. MessageDecoder
+            log_level: En düşük log seviyesi (DEBUG, INFO, ... veya 'debug', 'info', ...)
+            log_rate_limit: Mesaj tipi başına saniyedeki en fazla log satırı (None: sınırsız)
+            auto_reconnect: Bağlantı koparsa listener thread yeniden bağlanmayı dener
+            reconnect_initial_delay: İlk yeniden deneme beklemesi (saniye, her denemede iki katına çıkar)
+            reconnect_max_delay: Denemeler arası en uzun bekleme (saniye)
+            reconnect_max_attempts: Vazgeçmeden önceki en fazla deneme (None: disconnect() çağrılana kadar)
+            heartbeat_interval: Arka plan heartbeat periyodu (saniye, None: zamanlayıcı kapalı)
         """
+        self.logger = TrackerLogger('EyeTracker', level=log_level, rate_limit=log_rate_limit)
         self.host = host
         self.port = port
         self.socket = None
         self.connected = False
         self.tracking = False
         self.latest_gaze = None
+        self.latest_frame = None  # Son decode edilmiş GazeFrame
         self.lock = threading.Lock()
+        self.gaze_buffer = GazeRingBuffer(gaze_buffer_capacity)  # Push edilen tüm frame'ler
         self.request_id = 0
         # C# örneğine benzer şekilde: ayrı thread için
         self.listener_thread = None
         self.listener_running = False
-        self.response_queue = Queue()  # Gelen mesajlar için queue (thread-safe)
-        self.pending_requests = {}  # Bekleyen request'ler: {(category, request): (event, response_dict)}
-        self.pending_lock = threading.Lock()  # pending_requests için lock
-        self.buffer = b''  # Listener thread için buffer
+        # Mesaj yönlendirme: push frame -> gaze_buffer, yanıt -> pending_requests,
+        # diğerleri (bildirimler, geç kalmış yanıtlar) -> sınırlı diagnostic_queue
+        self.diagnostic_queue = Queue(maxsize=diagnostic_queue_size)
+        self.message_counters = {
+            'frames': 0,              # Gaze tamponuna yazılan frame'ler
+            'replies': 0,             # Bekleyen bir request ile eşleşen yanıtlar
+            'diagnostics': 0,         # diagnostic_queue'ya konan mesajlar
+            'diagnostics_dropped': 0, # Queue dolu olduğu için atılan en eski mesajlar
+            'parse_errors': 0,        # Parse edilemeyen mesajlar
+            'consumer_errors': 0,     # Örnek tüketicilerinde oluşan hatalar
+        }
+        # Bekleyen request'ler: {(category, request): deque([PendingRequest, ...])}
+        # Protokol yanıtlarda ID döndürmediği için aynı anahtardaki istekler FIFO sırasıyla eşleşir;
+        # farklı anahtarlardaki istekler birbirini beklemez
+        self.pending_requests = {}
+        self.pending_lock = threading.Lock()  # pending_requests, request_id ve request_latency için lock
+        self.send_lock = threading.Lock()  # Eşzamanlı sendall çağrılarının byte'larını karıştırmamak için
+        self.request_latency = {}  # {(category, request): LatencyHistogram}
+        self.framer = LineFramer()  # Listener thread için satır tamponu
+        self.decoder = MessageDecoder(json_backend)  # Push frame hızlı yolu + genel JSON decode
+        # Yeniden bağlanma ve boşluk (gap) takibi
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_initial_delay = reconnect_initial_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.reconnect_max_attempts = reconnect_max_attempts
+        self.reconnect_count = 0
+        self.gaps: List[GazeGap] = []  # Kapanmış ve (en fazla bir) açık boşluk
+        self._open_gap: Optional[GazeGap] = None
+        self.latest_frame_arrival = None  # Son frame'in perf_counter() varış zamanı
+        self.frame_interval = None  # Frame'ler arası sürenin kayan ortalaması (saniye, cihaz saati)
+        self.clock_sync = ClockSync()  # Cihaz saati -> host perf_counter eşlemesi
+        self._sample_consumers = ()  # add_sample_consumer ile kaydedilen fonksiyonlar
+        # Bağlantı sağlığı: heartbeat zamanlayıcısı ve push frame istatistikleri (bkz. health())
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_thread = None
+        self._heartbeat_stop = threading.Event()
+        self._reset_health()
         
     def _get_request_id(self):
-        """Her istek için benzersiz ID oluşturur"""
+        """Her istek için benzersiz ID oluşturur (pending_lock altında çağrılmalı)"""
         self.request_id += 1
         return self.request_id
-    
-    def _log(self, message: str):
-        """Log mesajı yazdırır (zaman damgası ile)"""
-        try:
-            timestamp = time_module.strftime("%H:%M:%S.%f")[:-3]  # milisaniye hassasiyeti
-        except Exception:
-            timestamp = time_module.strftime("%H:%M:%S")
-        
-        # Güvenli yazdırma - message içindeki özel karakterleri escape et
-        try:
-            # Önce % karakterlerini escape et
-            safe_message = str(message).replace('%', '%%')
-            print("[%s] [EyeTracker] %s" % (timestamp, safe_message))
-        except Exception as e:
-            # Eğer hata olursa, en basit şekilde yazdır
+
+    def _register_request(self, category: str, request_type: Optional[str]) -> PendingRequest:
+        """Yeni isteği in-flight tablosuna ekler (gönderimden önce çağrılmalı)"""
+        key = (category, request_type)
+        with self.pending_lock:
+            pending = PendingRequest(self._get_request_id(), key)
+            self.pending_requests.setdefault(key, deque()).append(pending)
+        return pending
+
+    def _discard_request(self, pending: PendingRequest):
+        """Yanıt gelmeden biten (timeout, gönderim hatası) isteği tablodan çıkarır"""
+        with self.pending_lock:
+            waiters = self.pending_requests.get(pending.key)
+            if waiters is None:
+                return
             try:
-                print("[{}] [EyeTracker] {}".format(timestamp, str(message)))
-            except Exception:
-                # Son çare: direkt print
-                print("[EyeTracker]", message)
+                waiters.remove(pending)
+            except ValueError:
+                pass
+            if not waiters:
+                del self.pending_requests[pending.key]
+
+    def request_latency_stats(self) -> dict:
+        """İstek tipi başına gecikme histogramı özetlerini döndürür: {"category/request": {...}}"""
+        with self.pending_lock:
+            return {
+                "{}/{}".format(cat, req if req is not None else "-"): histogram.snapshot()
+                for (cat, req), histogram in self.request_latency.items()
+            }
+    
+    def _log(self, message: str, *args, level: int = INFO):
+        """Log mesajını arka plan yazıcısına iletir (args verilirse format yazıcı thread'de uygulanır)"""
+        self.logger.log(level, message, *args)
     
     def _listener_loop(self):
         """
         C# örneğindeki ListenerLoop gibi: ayrı thread'de sürekli socket'ten okuyup mesajları parse eder
-        Gelen mesajları queue'ya koyar ve bekleyen request'lere yanıt verir
+        Push frame'leri gaze tamponuna, yanıtları bekleyen request'lere, diğer mesajları diagnostic queue'ya yönlendirir
         """
         self._log("Listener loop başlatıldı")
-        buffer = b''
         recv_count = 0
         message_count = 0
         decoder = json.JSONDecoder()
+        message_decoder = self.decoder
+        log = self.logger
 
         def handle_message(message_bytes: bytes):
             nonlocal message_count
@@ -92,179 +851,449 @@ class EyeTracker:
                 return
 
             message_count += 1
-            if message_count <= 5 or message_count % 50 == 0:
-                self._log("Listener: Mesaj işleniyor ({} mesaj, {} byte)".format(
-                    message_count, len(message_bytes)))
+            if log.level <= DEBUG:
+                log.debug("Listener: Mesaj işleniyor ({} mesaj, {} byte)", message_count, len(message_bytes))
 
             try:
-                message_str = message_bytes.decode('utf-8')
-                message_json = json.loads(message_str)
-            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                preview = message_bytes[:120]
-                self._log("Listener: Mesaj parse edilemedi: {} - Mesaj: {}".format(e, preview))
+                # Hızlı yol: push frame ise doğrudan GazeFrame'e decode et
+                gaze_frame = message_decoder.decode_push_frame(message_bytes)
+                if gaze_frame is not None:
+                    self._on_gaze_frame(gaze_frame)
+                    return
+                message_json = message_decoder.loads(message_bytes)
+            except ValueError as e:
+                # json.JSONDecodeError, orjson/msgspec hataları ve UnicodeDecodeError ValueError'dur
+                self.message_counters['parse_errors'] += 1
+                log.warning("Listener: Mesaj parse edilemedi: {} - Mesaj: {}", e, message_bytes[:120])
+                return
+            if not isinstance(message_json, dict):
+                self.message_counters['parse_errors'] += 1
                 return
 
             msg_category = message_json.get('category', '')
             msg_request = message_json.get('request', None)
 
-            if message_count <= 10:
-                self._log("Listener: Mesaj parse edildi: category={}, request={}".format(
-                    msg_category, msg_request if msg_request is not None else "(yok)"))
+            if log.level <= DEBUG:
+                log.debug("Listener: Mesaj parse edildi: category={}, request={}",
+                          msg_category, msg_request if msg_request is not None else "(yok)")
 
-            # Mesajı queue'ya koy
-            self.response_queue.put(message_json)
-
-            # Frame data ise latest_gaze'i güncelle
+            # Hızlı yolda decode edilemeyen push frame (request alanı yok) - sadece gaze yoluna gider.
+            # 'get frame' yanıtları tampona eklenmez (push örneklerini tekrarlar / sırasını bozar),
+            # bekleyen request üzerinden get_gaze_data'ya döner.
             if msg_category == 'tracker' and msg_request is None:
-                values = message_json.get('values', {})
-                frame = values.get('frame', {})
-                if frame:
-                    avg = frame.get('avg', {})
-                    x = avg.get('x', 0)
-                    y = avg.get('y', 0)
-                    time_ms = frame.get('time', int(time_module.time() * 1000))
-                    timestamp = time_ms / 1000.0
-
-                    with self.lock:
-                        self.latest_gaze = (x, y, timestamp)
+                values = message_json.get('values')
+                frame = values.get('frame') if isinstance(values, dict) else None
+                if isinstance(frame, dict) and frame:
+                    self._on_gaze_frame(GazeFrame.from_frame(frame))
+                    return
 
-            # Bekleyen request'lere yanıt ver
-            self._check_pending_requests(message_json)
+            # Bekleyen request'lere yanıt ver, eşleşmeyenleri diagnostic queue'ya koy
+            if self._check_pending_requests(message_json):
+                self.message_counters['replies'] += 1
+            else:
+                self._put_diagnostic(message_json)
         
-        while self.listener_running and self.connected and self.socket:
-            try:
-                # Socket'ten oku (C# örneğindeki reader.ReadLine() gibi)
-                # Python'da readline() yok, bu yüzden recv() kullanıyoruz
-                self.socket.settimeout(1.0)  # 1 saniye timeout (non-blocking için)
-                chunk = self.socket.recv(8192)
-                
-                if not chunk:
-                    self._log("Listener: Boş chunk alındı (bağlantı kesildi)")
-                    break
-                
-                recv_count += 1
-                if recv_count <= 5 or recv_count % 50 == 0:
-                    self._log("Listener: Veri alındı ({} byte, {} çağrı)".format(len(chunk), recv_count))
-                
-                buffer += chunk
-                
-                # Buffer çok büyürse uyarı ver
-                if len(buffer) > 100000:
-                    self._log("Listener: UYARI: Buffer çok büyük ({} byte)".format(len(buffer)))
-                    # Son 10KB'ı tut
-                    trim_delimiter = None
-                    if b'\r\n' in buffer:
-                        trim_delimiter = b'\r\n'
-                    elif b'\n' in buffer:
-                        trim_delimiter = b'\n'
-                    if trim_delimiter:
-                        last_newline = buffer.rfind(trim_delimiter)
-                        if last_newline > 0:
-                            buffer = buffer[last_newline + len(trim_delimiter):]
-                
-                processed_message = False
-
-                # Buffer'daki tüm tam mesajları işle (satır sonu ile biten)
-                while True:
-                    delimiter = None
-                    if b'\r\n' in buffer:
-                        delimiter = b'\r\n'
-                    elif b'\n' in buffer:
-                        delimiter = b'\n'
-                    else:
+        framer = self.framer
+        framer.reset()
+        while True:
+            reason = None
+            while self.listener_running and self.connected and self.socket:
+                try:
+                    # Socket'ten doğrudan framer tamponuna oku (C# örneğindeki reader.ReadLine() gibi)
+                    received = framer.recv_into(self.socket)
+                    
+                    if not received:
+                        log.warning("Listener: Boş chunk alındı (bağlantı kesildi)")
+                        reason = "sunucu bağlantıyı kapattı"
                         break
-
-                    message_end = buffer.find(delimiter)
-                    message_bytes = buffer[:message_end]
-                    buffer = buffer[message_end + len(delimiter):]
-                    handle_message(message_bytes)
-                    processed_message = True
-
-                # Eğer satır sonu bulunamadıysa, JSONDecoder ile tam nesne arayın
-                if not processed_message and buffer:
-                    try:
-                        buffer_str = buffer.decode('utf-8')
-                    except UnicodeDecodeError as e:
-                        self._log("Listener: Buffer decode edilemedi ({}). Buffer temizleniyor.".format(e))
-                        buffer = b''
-                        continue
-
-                    idx = 0
-                    str_len = len(buffer_str)
-                    while idx < str_len:
-                        try:
-                            _, parsed_len = decoder.raw_decode(buffer_str[idx:])
-                        except json.JSONDecodeError:
-                            break
-
-                        message_text = buffer_str[idx: idx + parsed_len]
-                        handle_message(message_text.encode('utf-8'))
-                        idx += parsed_len
-
-                        while idx < str_len and buffer_str[idx] in '\r\n \t':
-                            idx += 1
-
+                    
+                    recv_count += 1
+                    if log.level <= DEBUG:
+                        log.debug("Listener: Veri alındı ({} byte, {} çağrı)", received, recv_count)
+                    
+                    # Tampondaki tüm tam mesajları işle (satır sonu ile biten)
+                    processed_message = False
+                    for message_bytes in framer.messages():
+                        handle_message(message_bytes)
                         processed_message = True
 
-                    if idx > 0:
-                        buffer = buffer_str[idx:].encode('utf-8')
-                
-            except socket.timeout:
-                # Timeout normal (non-blocking için)
-                if recv_count == 0:
-                    self._log("Listener: İlk timeout (henüz veri yok)")
-                continue
-            except (socket.error, OSError, ConnectionResetError) as e:
-                self._log("Listener: Socket hatası: {}".format(e))
+                    # Eğer satır sonu bulunamadıysa, JSONDecoder ile tam nesne arayın
+                    if not processed_message:
+                        for message_bytes in framer.take_unterminated(decoder):
+                            handle_message(message_bytes)
+                    
+                except socket.timeout:
+                    # Timeout normal (non-blocking için)
+                    if recv_count == 0:
+                        log.debug("Listener: İlk timeout (henüz veri yok)")
+                    continue
+                except (socket.error, OSError, ConnectionResetError) as e:
+                    log.error("Listener: Socket hatası: {}", e)
+                    reason = "socket hatası: {}".format(e)
+                    break
+                except Exception as e:
+                    import traceback
+                    log.error("Listener: Beklenmeyen hata: {}: {}\n{}", type(e).__name__, e, traceback.format_exc())
+                    reason = "beklenmeyen hata: {}".format(type(e).__name__)
+                    break
+
+            # disconnect() çağrıldıysa normal çıkış; aksi halde bağlantı koptu
+            if not self.listener_running or reason is None:
                 break
-            except Exception as e:
-                self._log("Listener: Beklenmeyen hata: {}: {}".format(type(e).__name__, e))
-                import traceback
-                self._log("Listener: Traceback: {}".format(traceback.format_exc()))
+            self._on_connection_lost(reason)
+            if not self.auto_reconnect or not self._reconnect():
                 break
         
-        self._log("Listener loop sonlandı (toplam {} mesaj, {} recv çağrısı)".format(message_count, recv_count))
+        self._log("Listener loop sonlandı (toplam {} mesaj, {} recv çağrısı)", message_count, recv_count)
     
-    def _check_pending_requests(self, message_json: dict):
-        """Gelen mesajın bekleyen bir request'e yanıt olup olmadığını kontrol eder"""
-        msg_category = message_json.get('category', '')
-        msg_request = message_json.get('request', None)
+    def _on_gaze_frame(self, gaze_frame: GazeFrame):
+        """Decode edilmiş frame'i tampona ve latest_* alanlarına yazar (listener thread)"""
+        arrival = time_module.perf_counter()
+        previous = self.latest_frame
+        clock_sync = self.clock_sync
+        clock_sync.observe_frame(gaze_frame.timestamp, arrival)
+        gaze_frame.host_time = clock_sync.to_host(gaze_frame.timestamp)
+        if self._open_gap is not None:
+            self._close_gap(gaze_frame, arrival)
+        elif previous is not None:
+            delta = gaze_frame.timestamp - previous.timestamp
+            interval = self.frame_interval
+            if interval is not None and delta > 1.5 * interval:
+                # Cihaz zamanındaki atlama: arada gelmeyen frame'ler
+                self._health_dropped += int(round(delta / interval)) - 1
+            if 0 < delta < 0.5:
+                self.frame_interval = delta if interval is None else interval + 0.05 * (delta - interval)
+            # Varış zamanı titreşimi (RFC 3550): ardışık frame'lerin transit süresi farkının ortalaması
+            last_arrival = self.latest_frame_arrival
+            if last_arrival is not None:
+                transit_delta = abs((arrival - last_arrival) - delta)
+                self._health_jitter += (transit_delta - self._health_jitter) / 16.0
+        self._health_frames += 1
+        self.gaze_buffer.push(gaze_frame)
+        self.message_counters['frames'] += 1
+        with self.lock:
+            self.latest_frame = gaze_frame
+            self.latest_frame_arrival = arrival
+            self.latest_gaze = (gaze_frame.avg_x, gaze_frame.avg_y, gaze_frame.timestamp)
+        if self._sample_consumers:
+            self._notify_consumers(gaze_frame)
+
+    def _notify_consumers(self, gaze_frame: GazeFrame):
+        """Kayıtlı örnek tüketicilerini listener thread'de çağırır; hata veren tüketici diğerlerini etkilemez"""
+        for consumer in self._sample_consumers:
+            try:
+                consumer(gaze_frame)
+            except Exception as e:
+                self.message_counters['consumer_errors'] += 1
+                self.logger.warning("Örnek tüketicisi hata verdi ({}): {}: {}",
+                                    getattr(consumer, '__name__', type(consumer).__name__), type(e).__name__, e)
+
+    def add_sample_consumer(self, consumer):
+        """
+        Her yeni örnek (ve boşluk işareti) için listener thread'de çağrılacak fonksiyonu kaydeder.
+        Tüketici hızlı olmalıdır: uzun süren işler listener'ı ve dolayısıyla tüm örnekleri geciktirir.
+
+        Returns:
+            consumer (remove_sample_consumer ile kaldırmak için)
+        """
+        with self.lock:
+            # Kopyala-değiştir: listener kilit almadan tuple'ı dolaşır
+            self._sample_consumers = self._sample_consumers + (consumer,)
+        return consumer
+
+    def remove_sample_consumer(self, consumer):
+        """Kayıtlı tüketiciyi kaldırır (yoksa bir şey yapmaz)"""
+        with self.lock:
+            self._sample_consumers = tuple(c for c in self._sample_consumers if c is not consumer)
+
+    def _close_gap(self, gaze_frame: GazeFrame, arrival: float):
+        """Yeniden bağlantıdan sonraki ilk frame ile açık boşluğu kapatır ve akışa işaret frame'i ekler"""
+        gap = self._open_gap
+        self._open_gap = None
+        gap.close(gaze_frame.timestamp, arrival, self.frame_interval)
+        # İşaret, boşluktan sonraki ilk gerçek frame'den hemen önce gelir (bkz. find_gap)
+        marker = GazeFrame.gap_marker(gap.end_time, arrival)
+        self.gaze_buffer.push(marker)
+        if self._sample_consumers:
+            self._notify_consumers(marker)
+        self.logger.warning("Veri boşluğu kapandı: {:.3f}s, ~{} örnek kaçırıldı ({} deneme, sebep: {})",
+                            gap.duration, gap.samples_lost, gap.attempts, gap.reason)
+
+    def find_gap(self, timestamp: float) -> Optional[GazeGap]:
+        """İşaret frame'inin (GazeFrame.is_gap) timestamp'ine karşılık gelen boşluğu döndürür"""
+        for gap in reversed(self.gaps):
+            if gap.end_time == timestamp:
+                return gap
+        return None
+
+    def to_host_time(self, device_time: float) -> Optional[float]:
+        """Cihaz zamanını (saniye) host perf_counter zamanına çevirir; henüz frame gelmediyse None"""
+        return self.clock_sync.to_host(device_time)
+
+    def clock_status(self) -> dict:
+        """Saat eşlemesinin özeti (offset, drift_ppm, min_rtt_ms, ...)"""
+        return self.clock_sync.status()
+
+    def _reset_health(self):
+        """health() sayaçlarını sıfırlar"""
+        self.heartbeat_rtt = LatencyHistogram()
+        self.heartbeats_sent = 0
+        self.heartbeats_missed = 0
+        self.heartbeats_missed_in_row = 0
+        self._health_frames = 0
+        self._health_dropped = 0
+        self._health_jitter = 0.0
+        self._health_since = time_module.perf_counter()
+
+    def _heartbeat_loop(self):
+        """heartbeat_interval'da bir heartbeat gönderir ve tur süresini ölçer (ayrı thread)"""
+        interval = self.heartbeat_interval
+        while not self._heartbeat_stop.wait(interval):
+            if self.connected:
+                self.send_heartbeat(timeout=min(1.0, interval))
+
+    def _start_heartbeat(self):
+        if not self.heartbeat_interval or (self.heartbeat_thread and self.heartbeat_thread.is_alive()):
+            return
+        self._heartbeat_stop.clear()
+        self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self.heartbeat_thread.start()
+
+    def _stop_heartbeat(self):
+        self._heartbeat_stop.set()
+        if self.heartbeat_thread and self.heartbeat_thread.is_alive():
+            self.heartbeat_thread.join(timeout=2.0)
+        self.heartbeat_thread = None
+
+    def health(self, reset: bool = False, max_drop_rate: float = 0.02, max_rtt_ms: float = 100.0,
+               max_sample_age: float = 0.5) -> dict:
+        """
+        Bağlantı sağlığının ucuz anlık görüntüsü (kilit almadan sayaçları okur).
+
+        Args:
+            reset: Görüntü alındıktan sonra sayaçları sıfırla (ör. her video arasında)
+            max_drop_rate, max_rtt_ms, max_sample_age: 'warnings' listesi için eşikler
+
+        Returns:
+            dict: heartbeat RTT yüzdelikleri, frame hızı, jitter, kayıp oranı, uyarılar ('ok' False ise)
+        """
+        frames = self._health_frames
+        dropped = self._health_dropped
+        expected = frames + dropped
+        rtt = self.heartbeat_rtt.snapshot()
+        age = self.sample_age()
+        interval = self.frame_interval
+        snapshot = {
+            'connected': self.connected,
+            'tracking': self.tracking,
+            'period_s': time_module.perf_counter() - self._health_since,
+            'sample_age_ms': age * 1000 if age is not None else None,
+            'heartbeats': self.heartbeats_sent,
+            'heartbeats_missed': self.heartbeats_missed,
+            'rtt_ms': rtt,
+            'frames': frames,
+            'frame_rate_hz': 1.0 / interval if interval else None,
+            'jitter_ms': self._health_jitter * 1000,
+            'frames_dropped': dropped,
+            'drop_rate': dropped / expected if expected else 0.0,
+            'reconnects': self.reconnect_count,
+            'gaps': len(self.gaps),
+        }
+
+        warnings = []
+        if not self.connected:
+            warnings.append("bağlantı yok")
+        if self.heartbeats_missed_in_row >= 2:
+            warnings.append("art arda {} heartbeat yanıtsız".format(self.heartbeats_missed_in_row))
+        if rtt['count'] and rtt['p99_ms'] > max_rtt_ms:
+            warnings.append("heartbeat RTT p99 {} ms".format(rtt['p99_ms']))
+        if self.tracking and (age is None or age > max_sample_age):
+            warnings.append("son örnek {}".format("yok" if age is None else "{:.1f}s önce".format(age)))
+        if snapshot['drop_rate'] > max_drop_rate:
+            warnings.append("frame kaybı %{:.1f}".format(snapshot['drop_rate'] * 100))
+        snapshot['warnings'] = warnings
+        snapshot['ok'] = not warnings
+
+        if reset:
+            self._reset_health()
+        return snapshot
+
+    def sample_age(self) -> Optional[float]:
+        """En yeni örneğin gelişinden bu yana geçen süre (saniye); hiç örnek yoksa None"""
+        with self.lock:
+            arrival = self.latest_frame_arrival
+        if arrival is None:
+            return None
+        return time_module.perf_counter() - arrival
+
+    def is_stale(self, max_age: float = 0.25) -> bool:
+        """Son örnek max_age saniyeden eskiyse (veya hiç yoksa) True"""
+        age = self.sample_age()
+        return age is None or age > max_age
+
+    def _put_diagnostic(self, message_json: dict):
+        """Mesajı sınırlı diagnostic queue'ya koyar; queue doluysa en eski mesajı atar"""
+        while True:
+            try:
+                self.diagnostic_queue.put_nowait(message_json)
+                self.message_counters['diagnostics'] += 1
+                return
+            except Full:
+                try:
+                    self.diagnostic_queue.get_nowait()
+                    self.message_counters['diagnostics_dropped'] += 1
+                except Empty:
+                    pass
+
+    def drain_diagnostics(self) -> List[dict]:
+        """Diagnostic queue'daki tüm mesajları (bildirimler, eşleşmeyen yanıtlar) döndürür"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.diagnostic_queue.get_nowait())
+            except Empty:
+                return messages
+
+    def metrics(self) -> dict:
+        """Mesaj yönlendirme sayaçlarının anlık kopyasını döndürür"""
+        snapshot = dict(self.message_counters)
+        snapshot['diagnostic_queue_size'] = self.diagnostic_queue.qsize()
+        snapshot['gaze_seq'] = self.gaze_buffer.seq
+        with self.pending_lock:
+            snapshot['pending_requests'] = sum(len(waiters) for waiters in self.pending_requests.values())
+        snapshot['reconnects'] = self.reconnect_count
+        snapshot['gaps'] = len(self.gaps)
+        snapshot['samples_lost'] = sum(gap.samples_lost or 0 for gap in self.gaps)
+        log_stats = self.logger.stats()
+        snapshot['log_dropped'] = log_stats['dropped']
+        snapshot['log_suppressed'] = log_stats['suppressed']
+        return snapshot
+
+    def _check_pending_requests(self, message_json: dict) -> bool:
+        """
+        Gelen mesajı aynı (category, request) anahtarındaki en eski bekleyen isteğe eşler.
+
+        Returns:
+            Mesaj bir request ile eşleştiyse True
+        """
+        key = (message_json.get('category', ''), message_json.get('request', None))
         
         with self.pending_lock:
-            pending_count = len(self.pending_requests)
-            if pending_count > 0:
-                self._log("Listener: Bekleyen request kontrol ediliyor: {} request, gelen: category={}, request={}".format(
-                    pending_count, msg_category, msg_request if msg_request is not None else "(yok)"))
-            
-            # Tüm bekleyen request'leri kontrol et
-            keys_to_remove = []
-            for (cat, req), (event, response_dict) in self.pending_requests.items():
-                if cat == msg_category:
-                    if req is None:
-                        # Heartbeat gibi request olmayan istekler
-                        if msg_request is None:
-                            # Yanıt bulundu!
-                            self._log("Listener: Yanıt eşleşti! category={}, request=(yok)".format(cat))
-                            response_dict['response'] = message_json
-                            event.set()
-                            keys_to_remove.append((cat, req))
-                    elif req == msg_request:
-                        # Request eşleşiyor - yanıt bulundu!
-                        self._log("Listener: Yanıt eşleşti! category={}, request={}".format(cat, req))
-                        response_dict['response'] = message_json
-                        event.set()
-                        keys_to_remove.append((cat, req))
-                    else:
-                        # Category eşleşiyor ama request eşleşmiyor
-                        if pending_count > 0:
-                            self._log("Listener: Category eşleşiyor ama request farklı: beklenen={}, gelen={}".format(
-                                req, msg_request))
-            
-            # Eşleşen request'leri temizle
-            for key in keys_to_remove:
+            waiters = self.pending_requests.get(key)
+            if not waiters:
+                return False
+            pending = waiters.popleft()
+            if not waiters:
                 del self.pending_requests[key]
-                self._log("Listener: Pending request temizlendi: {}".format(key))
+            if pending.sent_at is not None:
+                histogram = self.request_latency.get(key)
+                if histogram is None:
+                    histogram = self.request_latency[key] = LatencyHistogram()
+                histogram.record(time_module.perf_counter() - pending.sent_at)
+        
+        pending.response = message_json
+        pending.event.set()
+        self.logger.debug("Listener: Yanıt eşleşti! category={}, request={}, seq={}",
+                          key[0], key[1] if key[1] is not None else "(yok)", pending.seq)
+        return True
     
+    def _fail_pending_requests(self):
+        """Bağlantı koptuğunda bekleyen tüm istekleri yanıtsız (response=None) uyandırır"""
+        with self.pending_lock:
+            waiting = [pending for waiters in self.pending_requests.values() for pending in waiters]
+            self.pending_requests.clear()
+        for pending in waiting:
+            pending.event.set()
+
+    def _on_connection_lost(self, reason: str):
+        """Listener bağlantı kopmasını fark ettiğinde: durumu günceller ve boşluk kaydını açar"""
+        self.connected = False
+        with self.lock:
+            last_frame = self.latest_frame
+            last_arrival = self.latest_frame_arrival
+        if self._open_gap is None:
+            gap = GazeGap(last_frame.timestamp if last_frame is not None else None,
+                          last_arrival if last_arrival is not None else time_module.perf_counter(), reason)
+            self._open_gap = gap
+            self.gaps.append(gap)
+        self._fail_pending_requests()
+        self.logger.warning("Bağlantı koptu ({}), bekleyen istekler iptal edildi", reason)
+
+    def _open_socket(self, timeout: float) -> socket.socket:
+        """connect() ile aynı ayarlarla yeni bir socket açar (yeniden bağlanma için)"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(timeout)
+            sock.connect((self.host, self.port))
+            sock.settimeout(1.0)  # Listener thread ile aynı okuma timeout'u
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _reconnect(self) -> bool:
+        """
+        Üstel geri çekilme (exponential backoff) ile yeniden bağlanır (listener thread'de çalışır).
+        Takip açıksa push modu tekrar etkinleştirilir; boşluk ilk yeni frame ile kapanır.
+
+        Returns:
+            Bağlantı yeniden kurulduysa True (disconnect() çağrıldıysa veya denemeler bittiyse False)
+        """
+        if self.socket:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+        self.framer.reset()
+
+        delay = self.reconnect_initial_delay
+        attempts = 0
+        while self.listener_running:
+            if self.reconnect_max_attempts is not None and attempts >= self.reconnect_max_attempts:
+                self.logger.error("Yeniden bağlanma {} denemeden sonra bırakıldı", attempts)
+                return False
+            attempts += 1
+            if self._open_gap is not None:
+                self._open_gap.attempts = attempts
+            try:
+                sock = self._open_socket(timeout=min(5.0, max(1.0, delay)))
+            except OSError as e:
+                self.logger.warning("Yeniden bağlanma denemesi {} başarısız: {} ({:.1f}s sonra tekrar)",
+                                    attempts, e, delay)
+                # disconnect() beklemesin diye kısa adımlarla uyu
+                deadline = time_module.perf_counter() + delay
+                while self.listener_running and time_module.perf_counter() < deadline:
+                    time_module.sleep(min(0.1, delay))
+                delay = min(delay * 2, self.reconnect_max_delay)
+                continue
+
+            if not self.listener_running:
+                # Bağlanırken disconnect() çağrıldı
+                sock.close()
+                return False
+            self.socket = sock
+            self.connected = True
+            self.reconnect_count += 1
+            self._log("Yeniden bağlanıldı ({} deneme)", attempts)
+            if self.tracking:
+                self._resume_push()
+            return True
+        return False
+
+    def _resume_push(self):
+        """Push modunu yanıt beklemeden yeniden açar (yanıtı listener thread'in kendisi işleyecek)"""
+        message = json.dumps({"category": "tracker", "request": "set", "values": {"push": True, "version": 1}},
+                             separators=(',', ':')) + '\r\n'
+        pending = self._register_request('tracker', 'set')
+        try:
+            with self.send_lock:
+                pending.sent_at = time_module.perf_counter()
+                self.socket.sendall(message.encode('utf-8'))
+        except OSError as e:
+            self._discard_request(pending)
+            self.logger.error("Push modu yeniden açılamadı: {}", e)
+
     def _send_request(self, category: str, request_type: str = None, values=None, timeout: float = 5.0) -> dict:
         """
         TheEyeTribe sunucusuna JSON isteği gönderir ve yanıtı alır.
@@ -285,17 +1314,12 @@ class EyeTracker:
         Returns:
             Sunucudan gelen JSON yanıtı
         """
-        values_str = repr(values) if values else "None"
-        self._log("İstek hazırlanıyor: category={}, request={}, values={}, timeout={}s".format(
-            category, request_type, values_str, timeout))
-        
+        log = self.logger
         if not self.connected or not self.socket:
-            self._log("HATA: Bağlantı kontrolü başarısız - connected={}, socket={}".format(
-                self.connected, self.socket is not None))
+            self.logger.error("Bağlantı kontrolü başarısız - connected={}, socket={}",
+                self.connected, self.socket is not None)
             raise ConnectionError("TheEyeTribe sunucusuna bağlı değil!")
         
-        self._log("Bağlantı durumu: OK")
-        
         # Socket timeout'unu ayarlama - listener thread kullanıyoruz, timeout listener thread'de ayarlı
         # _send_request'te socket timeout'u değiştirmemeliyiz çünkü listener thread'i etkiler
         # Listener thread zaten 1.0s timeout kullanıyor
@@ -314,125 +1338,49 @@ class EyeTracker:
         if values is not None:
             request["values"] = values
         
-        # İstek detaylarını logla
         request_type_str = request_type if request_type else "(yok)"
-        self._log("JSON isteği oluşturuldu: category={}, request={}".format(category, request_type_str))
-        try:
-            request_preview = json.dumps(request, indent=2, ensure_ascii=False)
-            # İlk 300 karakteri göster
-            if len(request_preview) > 300:
-                request_preview = request_preview[:300] + "..."
-            # \n karakterlerini | ile değiştir (log için güvenli)
-            request_preview_safe = request_preview.replace('\n', ' | ')
-            self._log("İstek içeriği: {}".format(request_preview_safe))
-        except Exception as e:
-            self._log("UYARI: İstek preview oluşturulamadı: {}".format(e))
+        
+        # JSON isteğini gönder - TheEyeTribe API formatı:
+        # - Compact JSON (indent yok)
+        # - ensure_ascii=False (Unicode karakterleri koru)
+        # - \r\n ile bitir (TheEyeTribe protokolü gereksinimi)
+        message = json.dumps(request, ensure_ascii=False, separators=(',', ':')) + '\r\n'
+        message_bytes = message.encode('utf-8')
+        
+        # Log satırı sadece DEBUG açıksa ve yazıcı thread'de formatlanır (compact JSON tek satırdır)
+        if log.level <= DEBUG:
+            log.debug("İstek gönderiliyor ({} byte): {:.200}", len(message_bytes), message[:-2])
+        
+        # In-flight tablosuna ekle - SENDALL'DAN ÖNCE! (race condition önleme)
+        # Eğer sunucu çok hızlı yanıt verirse, listener thread yanıtı görmeden önce
+        # request'in pending listesine eklenmesi gerekir
+        pending = self._register_request(category, request_type)
         
         try:
-            # JSON isteğini gönder - TheEyeTribe API formatı:
-            # - Compact JSON (indent yok)
-            # - ensure_ascii=False (Unicode karakterleri koru)
-            # - \r\n ile bitir (TheEyeTribe protokolü gereksinimi)
-            message = json.dumps(request, ensure_ascii=False, separators=(',', ':')) + '\r\n'
-            message_bytes = message.encode('utf-8')
-            
-            # Log için güvenli gösterim
-            message_display = message.strip().replace('\n', '\\n').replace('\r', '\\r')
-            if len(message_display) > 200:
-                message_display = message_display[:200] + "..."
-            self._log("İstek gönderiliyor ({} byte): {}".format(len(message_bytes), message_display))
-            
-            # C# örneğine benzer: listener thread'den yanıt bekle
-            request_type_str = request_type if request_type is not None else "(yok)"
-            self._log("Yanıt bekleniyor... (category={}, request={})".format(category, request_type_str))
-            
-            # Event ve response dict oluştur
-            response_event = threading.Event()
-            response_dict = {'response': None}
-            
-            # Pending request'e ekle - SENDALL'DAN ÖNCE! (race condition önleme)
-            # Eğer sunucu çok hızlı yanıt verirse, listener thread yanıtı görmeden önce
-            # request'in pending listesine eklenmesi gerekir
-            request_key = (category, request_type)
-            with self.pending_lock:
-                self.pending_requests[request_key] = (response_event, response_dict)
-            self._log("Pending request eklendi: {}".format(request_key))
-            
-            try:
-                # İsteği gönder - sendall tüm byte'ları gönderir
+            with self.send_lock:
+                pending.sent_at = time_module.perf_counter()
                 self.socket.sendall(message_bytes)
-                self._log("İstek başarıyla gönderildi ({} byte)".format(len(message_bytes)))
-            except Exception as send_error:
-                # Gönderme başarısız oldu - pending request'i temizle
-                with self.pending_lock:
-                    if request_key in self.pending_requests:
-                        del self.pending_requests[request_key]
-                self._log("HATA: İstek gönderilemedi: {}".format(send_error))
-                raise ConnectionError("İstek gönderilemedi: {}".format(send_error))
-            
-            # Yanıtı bekle (listener thread'den gelecek)
-            start_time = time_module.time()
-            wait_count = 0
-            while True:
-                # Timeout kontrolü
-                elapsed = time_module.time() - start_time
-                if elapsed > timeout:
-                    # Timeout oldu - pending request'i temizle
-                    with self.pending_lock:
-                        pending_info = "{} pending request".format(len(self.pending_requests))
-                        if request_key in self.pending_requests:
-                            del self.pending_requests[request_key]
-                    self._log("TIMEOUT: {:.2f}s geçti, limit: {}s, {} bekleme döngüsü, {}".format(
-                        elapsed, timeout, wait_count, pending_info))
-                    raise ConnectionError("Sunucu yanıt vermiyor (timeout: {}s)".format(timeout))
-                
-                wait_count += 1
-                if wait_count % 10 == 0:
-                    with self.pending_lock:
-                        pending_count = len(self.pending_requests)
-                    self._log("Yanıt bekleniyor... ({} döngü, {:.2f}s geçti, {} pending request)".format(
-                        wait_count, elapsed, pending_count))
-                
-                # Event'in set edilip edilmediğini kontrol et (non-blocking)
-                if response_event.wait(timeout=0.1):  # 100ms timeout
-                    # Yanıt geldi!
-                    response = response_dict['response']
-                    if response:
-                        # Pending request'i temizle
-                        with self.pending_lock:
-                            if request_key in self.pending_requests:
-                                del self.pending_requests[request_key]
-                        
-                        statuscode = response.get('statuscode', 'yok')
-                        has_values = 'var' if 'values' in response else 'yok'
-                        self._log("Yanıt alındı: category={}, request={}, statuscode={}, values={} ({} döngü, {:.2f}s)".format(
-                            category, request_type_str, statuscode, has_values, wait_count, elapsed))
-                        return response
-                    else:
-                        # Event set edildi ama response yok - hata
-                        self._log("UYARI: Event set edildi ama response yok")
-                        continue
-                
-                # Event henüz set edilmedi, devam et
-            
-        except socket.timeout as e:
-            self._log("HATA: İstek timeout oldu: {}".format(e))
-            raise ConnectionError("İstek timeout oldu ({}s)".format(timeout))
-        except json.JSONDecodeError as e:
-            self._log("HATA: JSON parse hatası: {}".format(e))
-            if 'response_str' in locals():
-                response_display = response_str.replace('\n', '\\n').replace('\r', '\\r')
-                if len(response_display) > 200:
-                    response_display = response_display[:200] + "..."
-                self._log("Hatalı yanıt: {}".format(response_display))
-            raise ConnectionError("Sunucudan geçersiz JSON yanıtı: {}".format(e))
-        except Exception as e:
-            # Hata durumunda pending request'i temizle
-            with self.pending_lock:
-                if 'request_key' in locals() and request_key in self.pending_requests:
-                    del self.pending_requests[request_key]
-            self._log("HATA: Beklenmeyen hata: {}: {}".format(type(e).__name__, e))
-            raise ConnectionError("İstek gönderilirken hata: {}".format(e))
+        except Exception as send_error:
+            self._discard_request(pending)
+            log.error("İstek gönderilemedi: {}", send_error)
+            raise ConnectionError("İstek gönderilemedi: {}".format(send_error))
+        
+        # Yanıtı bekle (listener thread event'i set eder - polling yok)
+        if not pending.event.wait(timeout):
+            self._discard_request(pending)
+            log.warning("TIMEOUT: {}s içinde yanıt yok (category={}, request={}, seq={})",
+                        timeout, category, request_type_str, pending.seq)
+            raise ConnectionError("Sunucu yanıt vermiyor (timeout: {}s)".format(timeout))
+        
+        response = pending.response
+        if response is None:
+            raise ConnectionError("Yanıt beklenirken bağlantı koptu")
+        if log.level <= DEBUG:
+            log.debug("Yanıt alındı: category={}, request={}, statuscode={}, values={} (seq={}, {:.3f}s)",
+                      category, request_type_str, response.get('statuscode', 'yok'),
+                      'var' if 'values' in response else 'yok', pending.seq,
+                      time_module.perf_counter() - pending.sent_at)
+        return response
     
     def connect(self, test_connection: bool = True) -> bool:
         """
@@ -446,8 +1394,8 @@ class EyeTracker:
         """
         self._log("=" * 60)
         self._log("BAĞLANTI BAŞLATILIYOR")
-        self._log("Hedef: {}:{}".format(self.host, self.port))
-        self._log("Test modu: {}".format(test_connection))
+        self._log("Hedef: {}:{}", self.host, self.port)
+        self._log("Test modu: {}", test_connection)
         self._log("=" * 60)
         
         # Önceki bağlantıyı temizle
@@ -457,7 +1405,7 @@ class EyeTracker:
                 self.socket.close()
                 self._log("Önceki socket kapatıldı")
             except Exception as e:
-                self._log("UYARI: Önceki socket kapatılamadı: {}".format(e))
+                self.logger.warning("Önceki socket kapatılamadı: {}", e)
             self.socket = None
         self.connected = False
         
@@ -474,47 +1422,47 @@ class EyeTracker:
                 self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 self._log("SO_REUSEADDR ayarlandı: OK")
             except Exception as e:
-                self._log("UYARI: SO_REUSEADDR ayarlanamadı: {}".format(e))
+                self.logger.warning("SO_REUSEADDR ayarlanamadı: {}", e)
             
             try:
                 # TCP_NODELAY - Nagle algoritmasını devre dışı bırak (daha hızlı yanıt)
                 self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                 self._log("TCP_NODELAY ayarlandı: OK")
             except Exception as e:
-                self._log("UYARI: TCP_NODELAY ayarlanamadı: {}".format(e))
+                self.logger.warning("TCP_NODELAY ayarlanamadı: {}", e)
             
             # Timeout ayarla (bağlantı ve tüm işlemler için)
             connection_timeout = 5.0
-            self._log("Adım 3: Socket timeout ayarlanıyor: {}s".format(connection_timeout))
+            self._log("Adım 3: Socket timeout ayarlanıyor: {}s", connection_timeout)
             self.socket.settimeout(connection_timeout)
             self._log("Timeout ayarlandı: OK")
             
             # Bağlantıyı dene
-            self._log("Adım 4: Bağlantı deneniyor ({}:{})...".format(self.host, self.port))
+            self._log("Adım 4: Bağlantı deneniyor ({}:{})...", self.host, self.port)
             connect_start = time_module.time()
             
             try:
                 # Normal connect kullan (timeout zaten ayarlı)
                 self.socket.connect((self.host, self.port))
                 connect_elapsed = time_module.time() - connect_start
-                self._log("Bağlantı başarılı! (Süre: {:.3f}s)".format(connect_elapsed))
+                self._log("Bağlantı başarılı! (Süre: {:.3f}s)", connect_elapsed)
                 
                 # Socket'in gerçekten bağlı olduğunu kontrol et
                 try:
                     # getpeername() bağlantı varsa çalışır
                     peer = self.socket.getpeername()
-                    self._log("Socket bağlantısı doğrulandı: {}:{}".format(peer[0], peer[1]))
+                    self._log("Socket bağlantısı doğrulandı: {}:{}", peer[0], peer[1])
                 except Exception as e:
-                    self._log("UYARI: getpeername() başarısız: {}".format(e))
+                    self.logger.warning("getpeername() başarısız: {}", e)
                     # Yine de devam et, bağlantı olabilir
                 
             except socket.timeout:
                 connect_elapsed = time_module.time() - connect_start
-                self._log("HATA: Bağlantı timeout ({:.3f}s geçti, limit: {}s)".format(
-                    connect_elapsed, connection_timeout))
+                self.logger.error("Bağlantı timeout ({:.3f}s geçti, limit: {}s)",
+                    connect_elapsed, connection_timeout)
                 self._log("Sunucu yanıt vermiyor. Kontrol edin:")
                 self._log("  1. TheEyeTribe sunucusu çalışıyor mu?")
-                self._log("  2. Port {} açık mı?".format(self.port))
+                self._log("  2. Port {} açık mı?", self.port)
                 self._log("  3. Firewall engelliyor mu?")
                 if self.socket:
                     try:
@@ -525,10 +1473,10 @@ class EyeTracker:
                 return False
             except ConnectionRefusedError as e:
                 connect_elapsed = time_module.time() - connect_start
-                self._log("HATA: Bağlantı reddedildi ({:.3f}s): {}".format(connect_elapsed, e))
+                self.logger.error("Bağlantı reddedildi ({:.3f}s): {}", connect_elapsed, e)
                 self._log("Sunucu bağlantıyı reddetti. Muhtemelen:")
                 self._log("  - Sunucu çalışmıyor")
-                self._log("  - Port {} yanlış".format(self.port))
+                self._log("  - Port {} yanlış", self.port)
                 self._log("  - Sunucu 'local only' modunda ve başka bir IP'den bağlanıyorsunuz")
                 if self.socket:
                     try:
@@ -539,8 +1487,8 @@ class EyeTracker:
                 return False
             except (socket.error, OSError, ConnectionResetError) as e:
                 connect_elapsed = time_module.time() - connect_start
-                self._log("HATA: Bağlantı hatası ({:.3f}s): {}: {}".format(
-                    connect_elapsed, type(e).__name__, e))
+                self.logger.error("Bağlantı hatası ({:.3f}s): {}: {}",
+                    connect_elapsed, type(e).__name__, e)
                 if self.socket:
                     try:
                         self.socket.close()
@@ -556,24 +1504,25 @@ class EyeTracker:
             # C# örneğine benzer: ayrı thread'de sürekli okuma başlat
             self._log("Listener thread başlatılıyor...")
             self.listener_running = True
-            self.buffer = b''  # Buffer'ı temizle
+            self.framer.reset()  # Tamponu temizle
             # Socket timeout'unu listener thread için ayarla (1.0s)
             try:
                 self.socket.settimeout(1.0)
                 self._log("Socket timeout listener thread için ayarlandı: 1.0s")
             except Exception as e:
-                self._log("UYARI: Socket timeout ayarlanamadı: {}".format(e))
+                self.logger.warning("Socket timeout ayarlanamadı: {}", e)
             
             self.listener_thread = threading.Thread(target=self._listener_loop, daemon=True)
             self.listener_thread.start()
             self._log("Listener thread başlatıldı")
+            self._start_heartbeat()
             
             # Thread'in başlamasını bekle (kısa bir süre)
             time_module.sleep(0.1)
             if self.listener_thread.is_alive():
                 self._log("Listener thread çalışıyor")
             else:
-                self._log("UYARI: Listener thread başlamadı!")
+                self.logger.warning("Listener thread başlamadı!")
             
             # Bağlantıyı test et (opsiyonel - eğer test_connection=False ise atla)
             if test_connection:
@@ -585,7 +1534,7 @@ class EyeTracker:
                     # Socket'in durumunu kontrol et
                     self._log("Socket durumu kontrol ediliyor...")
                     peer = self.socket.getpeername()
-                    self._log("Socket bağlı: {}:{}".format(peer[0], peer[1]))
+                    self._log("Socket bağlı: {}:{}", peer[0], peer[1])
                     
                     # Şimdi basit bir istek gönder - TheEyeTribe API formatına göre
                     self._log("Basit test isteği gönderiliyor...")
@@ -597,40 +1546,40 @@ class EyeTracker:
                         values = response.get('values', {})
                         if 'version' in values:
                             version = values.get('version', 'bilinmiyor')
-                            self._log("BAĞLANTI BAŞARILI! Versiyon: {}".format(version))
+                            self._log("BAĞLANTI BAŞARILI! Versiyon: {}", version)
                             test_success = True
                         else:
-                            self._log("UYARI: Yanıtta 'version' yok, ancak statuscode=200")
-                            self._log("Yanıt values: {}".format(values))
+                            self.logger.warning("Yanıtta 'version' yok, ancak statuscode=200")
+                            self._log("Yanıt values: {}", values)
                             test_success = False
                     elif 'statuscode' in response:
                         statuscode = response.get('statuscode')
                         statusmessage = response.get('values', {}).get('statusmessage', 'bilinmiyor')
-                        self._log("UYARI: Sunucu hata döndürdü: statuscode={}, message={}".format(
-                            statuscode, statusmessage))
+                        self.logger.warning("Sunucu hata döndürdü: statuscode={}, message={}",
+                            statuscode, statusmessage)
                         self._log("Ancak bağlantı kuruldu, devam ediliyor...")
                         test_success = False
                     else:
                         # Geçersiz yanıt ama bağlantı var - devam et
-                        self._log("UYARI: Beklenmeyen yanıt formatı: {}".format(response))
+                        self.logger.warning("Beklenmeyen yanıt formatı: {}", response)
                         self._log("Ancak bağlantı kuruldu, devam ediliyor...")
                         test_success = False
                         
                 except ConnectionError as e:
                     # Test başarısız ama socket bağlı - bağlantıyı kabul et
-                    self._log("UYARI: Bağlantı testi başarısız (ConnectionError): {}".format(e))
+                    self.logger.warning("Bağlantı testi başarısız (ConnectionError): {}", e)
                     self._log("Ancak socket bağlantısı kuruldu, devam ediliyor...")
                     test_success = False
                 except socket.timeout as e:
                     # Timeout - ama socket bağlı
-                    self._log("UYARI: Bağlantı testi timeout oldu: {}".format(e))
+                    self.logger.warning("Bağlantı testi timeout oldu: {}", e)
                     self._log("Sunucu yanıt vermiyor ama socket bağlı, devam ediliyor...")
                     test_success = False
                 except Exception as e:
                     # Beklenmeyen hata - bağlantıyı kabul et ama uyar
-                    self._log("UYARI: Test sırasında beklenmeyen hata - {}: {}".format(type(e).__name__, e))
+                    self.logger.warning("Test sırasında beklenmeyen hata - {}: {}", type(e).__name__, e)
                     import traceback
-                    self._log("Detay: {}".format(str(e)))
+                    self._log("Detay: {}", str(e))
                     self._log("Ancak socket bağlantısı kuruldu, devam ediliyor...")
                     test_success = False
                 
@@ -640,7 +1589,7 @@ class EyeTracker:
                     self._log("BAĞLANTI VE TEST BAŞARILI!")
                 else:
                     self._log("=" * 60)
-                    self._log("UYARI: Test başarısız ama socket bağlantısı aktif")
+                    self.logger.warning("Test başarısız ama socket bağlantısı aktif")
                     self._log("Bağlantı kabul ediliyor, devam ediliyor...")
                 self._log("=" * 60)
                 return True
@@ -652,7 +1601,7 @@ class EyeTracker:
                 return True
                 
         except socket.timeout as e:
-            self._log("HATA: Socket timeout - {}".format(e))
+            self.logger.error("Socket timeout - {}", e)
             self._log("Sunucuya bağlanırken timeout oldu. Sunucunun çalıştığından emin olun.")
             self._log("=" * 60)
             self.connected = False
@@ -661,14 +1610,14 @@ class EyeTracker:
                     self.socket.close()
                     self._log("Socket kapatıldı")
                 except Exception as close_err:
-                    self._log("UYARI: Socket kapatılırken hata: {}".format(close_err))
+                    self.logger.warning("Socket kapatılırken hata: {}", close_err)
                 self.socket = None
             return False
         except (socket.error, OSError, ConnectionRefusedError, ConnectionResetError) as e:
-            self._log("HATA: Socket/Network hatası - {}: {}".format(type(e).__name__, e))
+            self.logger.error("Socket/Network hatası - {}: {}", type(e).__name__, e)
             self._log("Sunucuya bağlanılamadı. Kontrol edin:")
             self._log("  1. TheEyeTribe sunucusu çalışıyor mu?")
-            self._log("  2. Port {} açık mı?".format(self.port))
+            self._log("  2. Port {} açık mı?", self.port)
             self._log("  3. Firewall engelliyor mu?")
             self._log("=" * 60)
             self.connected = False
@@ -677,18 +1626,18 @@ class EyeTracker:
                     self.socket.close()
                     self._log("Socket kapatıldı")
                 except Exception as close_err:
-                    self._log("UYARI: Socket kapatılırken hata: {}".format(close_err))
+                    self.logger.warning("Socket kapatılırken hata: {}", close_err)
                 self.socket = None
             return False
         except Exception as e:
-            self._log("HATA: Beklenmeyen hata - {}: {}".format(type(e).__name__, e))
+            self.logger.error("Beklenmeyen hata - {}: {}", type(e).__name__, e)
             import traceback
             self._log("Detaylı hata bilgisi:")
             tb_str = traceback.format_exc()
             # Traceback'i satır satır logla
             for line in tb_str.split('\n'):
                 if line.strip():
-                    self._log("  {}".format(line))
+                    self._log("  {}", line)
             self._log("Lütfen TheEyeTribe sunucusunun çalıştığından emin olun.")
             self._log("=" * 60)
             self.connected = False
@@ -697,7 +1646,7 @@ class EyeTracker:
                     self.socket.close()
                     self._log("Socket kapatıldı")
                 except Exception as close_err:
-                    self._log("UYARI: Socket kapatılırken hata: {}".format(close_err))
+                    self.logger.warning("Socket kapatılırken hata: {}", close_err)
                 self.socket = None
             return False
     
@@ -708,6 +1657,8 @@ class EyeTracker:
             self._log("Takip durduruluyor...")
             self.stop_tracking()
         
+        self._stop_heartbeat()
+        
         # Listener thread'i durdur
         if self.listener_running:
             self._log("Listener thread durduruluyor...")
@@ -716,7 +1667,7 @@ class EyeTracker:
                 # Thread'in bitmesini bekle (max 2 saniye)
                 self.listener_thread.join(timeout=2.0)
                 if self.listener_thread.is_alive():
-                    self._log("UYARI: Listener thread zamanında bitmedi")
+                    self.logger.warning("Listener thread zamanında bitmedi")
                 else:
                     self._log("Listener thread durduruldu")
         
@@ -725,17 +1676,19 @@ class EyeTracker:
                 self.socket.close()
                 self._log("Socket kapatıldı")
             except Exception as e:
-                self._log("UYARI: Socket kapatılırken hata: {}".format(e))
+                self.logger.warning("Socket kapatılırken hata: {}", e)
         self.connected = False
+        self.tracking = False
         self.socket = None
-        self.buffer = b''  # Buffer'ı temizle
+        self.framer.reset()  # Tamponu temizle
         self._log("Bağlantı kesildi")
+        self.logger.flush()
     
     def start_tracking(self):
         """Göz takibini başlatır"""
         self._log("Göz takibi başlatılıyor...")
         if not self.connected:
-            self._log("HATA: Bağlantı yok!")
+            self.logger.error("Bağlantı yok!")
             raise ConnectionError("Önce bağlantı kurulmalı!")
         
         try:
@@ -753,12 +1706,12 @@ class EyeTracker:
             else:
                 statuscode = response.get('statuscode', 'bilinmiyor')
                 statusmessage = response.get('values', {}).get('statusmessage', 'bilinmiyor')
-                self._log("HATA: Takip başlatılamadı - statuscode: {}, message: {}".format(
-                    statuscode, statusmessage))
+                self.logger.error("Takip başlatılamadı - statuscode: {}, message: {}",
+                    statuscode, statusmessage)
                 raise Exception("Takip başlatılamadı")
                 
         except Exception as e:
-            self._log("HATA: Takip başlatma hatası: {}: {}".format(type(e).__name__, e))
+            self.logger.error("Takip başlatma hatası: {}: {}", type(e).__name__, e)
             raise
     
     def stop_tracking(self):
@@ -776,7 +1729,7 @@ class EyeTracker:
             self.tracking = False
             self._log("Göz takibi durduruldu: OK")
         except Exception as e:
-            self._log("HATA: Takip durdurma hatası: {}: {}".format(type(e).__name__, e))
+            self.logger.error("Takip durdurma hatası: {}: {}", type(e).__name__, e)
     
     def get_gaze_data(self) -> Optional[Tuple[float, float, float]]:
         """
@@ -799,18 +1752,15 @@ class EyeTracker:
                 values = response.get('values', {})
                 frame = values.get('frame', {})
                 if frame:
-                    # Gaze verilerini çıkar
-                    avg = frame.get('avg', {})
-                    x = avg.get('x', 0)
-                    y = avg.get('y', 0)
-                    # time milliseconds cinsinden, saniyeye çevir
-                    time_ms = frame.get('time', int(time_module.time() * 1000))
-                    timestamp = time_ms / 1000.0
+                    # Gaze verilerini çıkar (time milisaniyeden saniyeye çevrilir)
+                    gaze_frame = GazeFrame.from_frame(frame)
+                    gaze = (gaze_frame.avg_x, gaze_frame.avg_y, gaze_frame.timestamp)
                     
                     with self.lock:
-                        self.latest_gaze = (x, y, timestamp)
+                        self.latest_frame = gaze_frame
+                        self.latest_gaze = gaze
                     
-                    return (x, y, timestamp)
+                    return gaze
                 else:
                     # Frame boş - sessizce None döndür (çok sık çağrılıyor)
                     return None
@@ -820,13 +1770,39 @@ class EyeTracker:
             
         except Exception as e:
             # Sadece hata durumunda log (çok sık çağrılıyor olabilir)
-            self._log("UYARI: Gaze verisi alma hatası: {}: {}".format(type(e).__name__, e))
+            self.logger.warning("Gaze verisi alma hatası: {}: {}", type(e).__name__, e)
             return None
     
     def get_latest_gaze(self) -> Optional[Tuple[float, float, float]]:
         """Thread-safe olarak en son gaze verisini döndürür"""
         with self.lock:
             return self.latest_gaze
+
+    def gaze_seq(self) -> int:
+        """Halka tampondaki bir sonraki örneğin sıra numarası (drain_since başlangıcı için)"""
+        return self.gaze_buffer.seq
+
+    def get_latest_frame(self) -> Optional[GazeFrame]:
+        """Thread-safe olarak en son decode edilmiş GazeFrame'i döndürür"""
+        with self.lock:
+            return self.latest_frame
+
+    def drain_since(self, seq: int) -> Tuple[List[GazeFrame], int]:
+        """
+        seq'ten sonra push edilmiş tüm gaze frame'lerini tek çağrıda döndürür (kilitsiz).
+        main.py örnekleri add_sample_consumer ile listener thread'de alır; bu API listener'ı
+        meşgul etmeden toplu okumak isteyen okuyucular içindir (bkz. test_connection.py --offline).
+
+        Kullanım:
+            seq = tracker.gaze_seq()
+            while ...:
+                frames, seq = tracker.drain_since(seq)
+                for frame in frames: ...
+
+        Returns:
+            (frames, next_seq) - bkz. GazeRingBuffer.drain_since
+        """
+        return self.gaze_buffer.drain_since(seq)
     
     def calibration_prepare(self):
         """Yeni bir kalibrasyona başlamadan önce sunucuyu temiz duruma getirir."""
@@ -838,20 +1814,20 @@ class EyeTracker:
             try:
                 response = self._send_request('calibration', request_type, None, timeout=3.0)
             except ConnectionError as e:
-                self._log("UYARI: Calibration {} isteği başarısız: {}".format(request_type, e))
+                self.logger.warning("Calibration {} isteği başarısız: {}", request_type, e)
                 continue
 
             statuscode = response.get('statuscode', 'yok')
             statusmessage = response.get('values', {}).get('statusmessage', '')
 
             if statuscode == 200:
-                self._log("Calibration {} tamamlandı.".format(request_type))
+                self._log("Calibration {} tamamlandı.", request_type)
             elif isinstance(statuscode, int) and 800 <= statuscode <= 804:
-                self._log("Calibration {} gerekli değil (statuscode={}, message={}).".format(
-                    request_type, statuscode, statusmessage))
+                self._log("Calibration {} gerekli değil (statuscode={}, message={}).",
+                    request_type, statuscode, statusmessage)
             else:
-                self._log("UYARI: Calibration {} beklenmeyen yanıt: statuscode={}, message={}".format(
-                    request_type, statuscode, statusmessage))
+                self.logger.warning("Calibration {} beklenmeyen yanıt: statuscode={}, message={}",
+                    request_type, statuscode, statusmessage)
 
         # Sunucuya durum güncellemesi için kısa süre tanı
         time_module.sleep(0.1)
@@ -863,20 +1839,20 @@ class EyeTracker:
         
         # TheEyeTribe API formatı: category="calibration", request="start", values={"pointcount": integer}
         # Calibration sırasında push mode aktif olabilir, bu yüzden daha uzun timeout kullan
-        self._log("Calibration başlatılıyor: point_count={}".format(point_count))
+        self._log("Calibration başlatılıyor: point_count={}", point_count)
         response = self._send_request('calibration', 'start', {'pointcount': point_count}, timeout=10.0)
         statuscode = response.get('statuscode', 'yok')
         statusmessage = response.get('values', {}).get('statusmessage', '')
 
         if isinstance(statuscode, int) and statuscode in (800, 801, 802):
-            self._log("Calibration start yanıtı statuscode={} ({}). Durum sıfırlanıyor ve tekrar deneniyor...".format(
-                statuscode, statusmessage))
+            self._log("Calibration start yanıtı statuscode={} ({}). Durum sıfırlanıyor ve tekrar deneniyor...",
+                statuscode, statusmessage)
             self.calibration_prepare()
             response = self._send_request('calibration', 'start', {'pointcount': point_count}, timeout=10.0)
             statuscode = response.get('statuscode', 'yok')
             statusmessage = response.get('values', {}).get('statusmessage', '')
 
-        self._log("Calibration start yanıtı: statuscode={}, statusmessage={}".format(statuscode, statusmessage))
+        self._log("Calibration start yanıtı: statuscode={}, statusmessage={}", statuscode, statusmessage)
         return statuscode == 200
     
     def calibration_pointstart(self, x: float, y: float):
@@ -890,8 +1866,8 @@ class EyeTracker:
         statuscode = response.get('statuscode', 'yok')
         if statuscode != 200:
             statusmessage = response.get('values', {}).get('statusmessage', '')
-            self._log("UYARI: calibration_pointstart başarısız (x={}, y={}): statuscode={}, message={}".format(
-                int(x), int(y), statuscode, statusmessage))
+            self.logger.warning("calibration_pointstart başarısız (x={}, y={}): statuscode={}, message={}",
+                int(x), int(y), statuscode, statusmessage)
         return statuscode == 200
     
     def calibration_pointend(self, x: float = None, y: float = None):
@@ -904,8 +1880,8 @@ class EyeTracker:
         statuscode = response.get('statuscode', 'yok')
         if statuscode != 200:
             statusmessage = response.get('values', {}).get('statusmessage', '')
-            self._log("UYARI: calibration_pointend başarısız: statuscode={}, message={}".format(
-                statuscode, statusmessage))
+            self.logger.warning("calibration_pointend başarısız: statuscode={}, message={}",
+                statuscode, statusmessage)
         return statuscode == 200
     
     def calibration_abort(self):
@@ -918,8 +1894,8 @@ class EyeTracker:
         statuscode = response.get('statuscode', 'yok')
         if statuscode != 200:
             statusmessage = response.get('values', {}).get('statusmessage', '')
-            self._log("UYARI: calibration_abort yanıtı: statuscode={}, message={}".format(
-                statuscode, statusmessage))
+            self.logger.warning("calibration_abort yanıtı: statuscode={}, message={}",
+                statuscode, statusmessage)
         return statuscode == 200
     
     def calibration_result(self) -> dict:
@@ -943,23 +1919,45 @@ class EyeTracker:
         statuscode = response.get('statuscode', 'yok')
         if statuscode != 200:
             statusmessage = response.get('values', {}).get('statusmessage', '')
-            self._log("UYARI: calibration_clear yanıtı: statuscode={}, message={}".format(
-                statuscode, statusmessage))
+            self.logger.warning("calibration_clear yanıtı: statuscode={}, message={}",
+                statuscode, statusmessage)
         return statuscode == 200
     
-    def send_heartbeat(self):
-        """Sunucuya heartbeat gönderir (bağlantıyı canlı tutmak için)"""
-        if not self.connected:
+    def send_heartbeat(self, timeout: float = 1.0):
+        """
+        Sunucuya heartbeat gönderir (bağlantıyı canlı tutmak için) ve tur süresini kaydeder.
+        _send_request'in log/encode adımları atlanır: hazır byte'lar gönderilir, yanıt event ile beklenir.
+        """
+        if not self.connected or not self.socket:
             return False
         
+        # TheEyeTribe API formatı: category="heartbeat", request alanı yok (API guide)
+        pending = self._register_request('heartbeat', None)
+        self.heartbeats_sent += 1
         try:
-            # TheEyeTribe API formatı: category="heartbeat", request=null (C# örneğine göre)
-            # C# örneği: {"category":"heartbeat","request":null}
-            response = self._send_request('heartbeat', None, None, timeout=1.0)
-            return response.get('statuscode') == 200
-        except Exception as e:
-            self._log("UYARI: Heartbeat gönderilemedi: {}".format(e))
+            with self.send_lock:
+                pending.sent_at = time_module.perf_counter()
+                self.socket.sendall(_HEARTBEAT_BYTES)
+        except (OSError, AttributeError) as e:
+            self._discard_request(pending)
+            self.heartbeats_missed += 1
+            self.heartbeats_missed_in_row += 1
+            self.logger.warning("Heartbeat gönderilemedi: {}", e)
             return False
+        
+        if not pending.event.wait(timeout) or pending.response is None:
+            self._discard_request(pending)
+            self.heartbeats_missed += 1
+            self.heartbeats_missed_in_row += 1
+            self.logger.warning("Heartbeat yanıtsız kaldı ({}s, art arda {})", timeout, self.heartbeats_missed_in_row)
+            return False
+        
+        rtt = time_module.perf_counter() - pending.sent_at
+        self.heartbeats_missed_in_row = 0
+        self.heartbeat_rtt.record(rtt)
+        # Tur süresi saat eşlemesinde tek yön gecikme tahmini için de kullanılır
+        self.clock_sync.observe_rtt(rtt)
+        return pending.response.get('statuscode') == 200
     
     def is_connected(self) -> bool:
         """Bağlantı durumunu kontrol eder"""
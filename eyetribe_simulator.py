@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+TheEyeTribe sunucu simülatörü (donanımsız yük ve gecikme testi için).
+
+EyeTracker'ın kullandığı tracker / calibration / heartbeat kategorilerini uygular ve
+push modu açık istemcilere ayarlanabilir hızda (30/60/500 Hz ...) frame gönderir.
+Hata enjeksiyonu: zamanlama jitter'ı, burst (frame'leri biriktirip toplu gönderme),
+yarım satırlar (bir mesajı iki parçada gönderme) ve periyodik bağlantı kopması.
+--replay ile kaydedilmiş bir gaze_data.csv izi tekrar oynatılır.
+
+Frame 'time' alanı varsayılan olarak time.perf_counter() milisaniyesidir; aynı makinedeki
+istemci perf_counter() - frame.timestamp ile uçtan uca gecikmeyi doğrudan ölçebilir.
+
+Kullanım:
+    python eyetribe_simulator.py --rate 60                      # 6555 portunda sunucu
+    python eyetribe_simulator.py --rate 500 --jitter 2 --partial-lines 0.1
+    python eyetribe_simulator.py --replay results/gaze_data.csv --disconnect-after 30
+    python eyetribe_simulator.py --benchmark --rate 500 --duration 10   # istemci benchmark'ı
+"""
+
+import argparse
+import csv
+import json
+import math
+import random
+import socket
+import socketserver
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# TheEyeTribe durum kodları
+STATUS_OK = 200
+STATUS_BAD_REQUEST = 400
+STATUS_FORBIDDEN = 403
+STATUS_CALIBRATION_CHANGE = 800
+STATUS_DISPLAY_CHANGE = 801
+STATUS_TRACKER_STATE_CHANGE = 802
+
+
+def load_replay_trace(path: str) -> List[Tuple[float, float]]:
+    """gaze_data.csv'den (gaze_x, gaze_y) çiftlerini okur"""
+    points = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            try:
+                points.append((float(row['gaze_x']), float(row['gaze_y'])))
+            except (KeyError, TypeError, ValueError):
+                continue
+    if not points:
+        raise ValueError("Replay dosyasında gaze_x/gaze_y verisi yok: {}".format(path))
+    return points
+
+
+class SimulatorConfig:
+    """Simülatör ayarları (komut satırı argümanlarıyla aynı isimler)"""
+
+    def __init__(self, rate=60.0, jitter_ms=0.0, burst_every=0.0, burst_ms=100.0, partial_lines=0.0,
+                 disconnect_after=0.0, replay=None, screen=(1920, 1080), epoch_time=False, seed=None):
+        self.rate = rate
+        self.jitter_ms = jitter_ms
+        self.burst_every = burst_every
+        self.burst_ms = burst_ms
+        self.partial_lines = partial_lines
+        self.disconnect_after = disconnect_after
+        self.replay = replay
+        self.screen = screen
+        self.epoch_time = epoch_time
+        self.seed = seed
+
+
+class TrackerState:
+    """Tüm istemcilerin paylaştığı cihaz durumu (get/set ile okunan alanlar)"""
+
+    def __init__(self, config: SimulatorConfig):
+        self.lock = threading.Lock()
+        self.values = {
+            'version': 1,
+            'heartbeatinterval': 3000,
+            'trackerstate': 0,
+            'framerate': int(config.rate),
+            'iscalibrated': False,
+            'iscalibrating': False,
+            'screenindex': 0,
+            'screenresw': config.screen[0],
+            'screenresh': config.screen[1],
+            'screenpsyw': 0.52,
+            'screenpsyh': 0.29,
+        }
+        self.calibresult = None
+        self.calibration_points = 0
+        self.calibration_done = 0
+
+
+class _ClientHandler(socketserver.BaseRequestHandler):
+    """Tek bir istemci bağlantısı: istekleri yanıtlar, push açıksa frame gönderir"""
+
+    def setup(self):
+        self.sim: EyeTribeSimulator = self.server.simulator
+        self.config = self.sim.config
+        self.push = False
+        self.closed = False
+        self.send_lock = threading.Lock()
+        self.connected_at = time.perf_counter()
+        self.random = random.Random(self.config.seed)
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sim._register(self)
+
+    def finish(self):
+        self.closed = True
+        self.sim._unregister(self)
+
+    def handle(self):
+        pusher = threading.Thread(target=self._push_loop, daemon=True)
+        pusher.start()
+        buffer = b''
+        try:
+            while not self.closed:
+                try:
+                    chunk = self.request.recv(65536)
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                buffer += chunk
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    line = line.strip()
+                    if line:
+                        self._handle_line(line)
+        finally:
+            self.closed = True
+            pusher.join(timeout=1.0)
+
+    def send_message(self, message: dict):
+        self.send_bytes((json.dumps(message, separators=(',', ':')) + '\r\n').encode('utf-8'))
+
+    def send_bytes(self, data: bytes):
+        """Veriyi gönderir; partial_lines olasılığıyla satırı iki parçada yollar"""
+        if self.closed:
+            return
+        try:
+            with self.send_lock:
+                if self.config.partial_lines and len(data) > 2 and self.random.random() < self.config.partial_lines:
+                    split = self.random.randint(1, len(data) - 1)
+                    self.request.sendall(data[:split])
+                    time.sleep(0.001)
+                    self.request.sendall(data[split:])
+                else:
+                    self.request.sendall(data)
+        except OSError:
+            self.closed = True
+
+    def _handle_line(self, line: bytes):
+        try:
+            request = json.loads(line.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            self.send_message({'category': 'tracker', 'statuscode': STATUS_BAD_REQUEST,
+                               'values': {'statusmessage': 'Geçersiz JSON'}})
+            return
+        category = request.get('category')
+        request_type = request.get('request')
+        response = {'category': category, 'statuscode': STATUS_OK}
+        if request_type is not None:
+            response['request'] = request_type
+
+        if category == 'heartbeat':
+            pass
+        elif category == 'tracker' and request_type in ('get', 'set'):
+            values = self.sim._handle_tracker(self, request_type, request.get('values'))
+            if isinstance(values, int):
+                response['statuscode'] = values
+            elif values:
+                response['values'] = values
+        elif category == 'calibration':
+            statuscode, values = self.sim._handle_calibration(request_type, request.get('values'))
+            response['statuscode'] = statuscode
+            if values:
+                response['values'] = values
+        else:
+            response['statuscode'] = STATUS_BAD_REQUEST
+            response['values'] = {'statusmessage': 'Bilinmeyen istek: {}/{}'.format(category, request_type)}
+        self.send_message(response)
+
+    def _push_loop(self):
+        """Push açıkken sabit periyotla frame üretir; jitter, burst ve kopma burada uygulanır"""
+        config = self.config
+        period = 1.0 / config.rate
+        next_tick = time.perf_counter()
+        next_burst = next_tick + config.burst_every if config.burst_every else None
+        held: List[bytes] = []
+        hold_until = None
+        while not self.closed and self.sim.running:
+            now = time.perf_counter()
+            if config.disconnect_after and now - self.connected_at >= config.disconnect_after:
+                self.sim.disconnects += 1
+                self._drop()
+                return
+            if not self.push:
+                time.sleep(0.005)
+                next_tick = time.perf_counter()
+                continue
+
+            delay = next_tick - now
+            if config.jitter_ms:
+                delay += self.random.gauss(0.0, config.jitter_ms / 1000.0)
+            if delay > 0:
+                time.sleep(delay)
+            next_tick += period
+
+            data = self.sim._frame_bytes()
+            self.sim.frames_sent += 1
+            now = time.perf_counter()
+            if next_burst is not None and now >= next_burst:
+                # Burst: burst_ms boyunca frame'leri biriktir, sonra tek sendall ile gönder
+                hold_until = now + config.burst_ms / 1000.0
+                next_burst = now + config.burst_every
+            if hold_until is not None:
+                held.append(data)
+                if now < hold_until:
+                    continue
+                data = b''.join(held)
+                held = []
+                hold_until = None
+            self.send_bytes(data)
+            if now - next_tick > 1.0:
+                # Çok geride kaldık (ör. sistem uyudu) - yakalamaya çalışma
+                next_tick = now
+
+    def _drop(self):
+        self.closed = True
+        try:
+            self.request.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.request.close()
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class EyeTribeSimulator:
+    """
+    Yerel TheEyeTribe sunucu simülatörü.
+
+    Kullanım:
+        with EyeTribeSimulator(port=6555, config=SimulatorConfig(rate=500)) as sim:
+            tracker = EyeTracker(port=sim.port)
+            ...
+    """
+
+    def __init__(self, host='localhost', port=6555, config: Optional[SimulatorConfig] = None):
+        self.host = host
+        self.config = config or SimulatorConfig()
+        self.state = TrackerState(self.config)
+        self.replay = load_replay_trace(self.config.replay) if self.config.replay else None
+        self.replay_index = 0
+        self.frame_index = 0
+        self.frames_sent = 0
+        self.disconnects = 0
+        self.running = False
+        self.clients = []
+        self._clients_lock = threading.Lock()
+        self._frame_lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self.server = _ThreadingServer((host, port), _ClientHandler)
+        self.server.simulator = self
+        self.port = self.server.server_address[1]  # port=0 ile rastgele port
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self.server.shutdown()
+        self.server.server_close()
+        with self._clients_lock:
+            clients = list(self.clients)
+        for client in clients:
+            client._drop()
+
+    def _register(self, client):
+        with self._clients_lock:
+            self.clients.append(client)
+
+    def _unregister(self, client):
+        with self._clients_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def broadcast(self, message: dict):
+        """Tüm bağlı istemcilere bildirim gönderir (ör. 800 calibration change)"""
+        with self._clients_lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.send_message(message)
+
+    def _next_point(self) -> Tuple[float, float]:
+        if self.replay is not None:
+            point = self.replay[self.replay_index]
+            self.replay_index = (self.replay_index + 1) % len(self.replay)
+            return point
+        # Ekran merkezinde yavaş dönen bir nokta + küçük gürültü
+        width, height = self.config.screen
+        angle = self.frame_index * 0.02
+        return (width / 2 + width / 4 * math.cos(angle) + self._random.gauss(0, 3),
+                height / 2 + height / 4 * math.sin(angle) + self._random.gauss(0, 3))
+
+    def _make_frame(self) -> dict:
+        with self._frame_lock:
+            self.frame_index += 1
+            x, y = self._next_point()
+            index = self.frame_index
+        now_ms = time.time() * 1000.0 if self.config.epoch_time else time.perf_counter() * 1000.0
+        point = {'x': round(x, 3), 'y': round(y, 3)}
+        eye = {'raw': point, 'avg': point, 'psize': 21.5,
+               'pcenter': {'x': 0.45, 'y': 0.5}}
+        return {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'time': round(now_ms, 3),
+            'fix': index % 4 != 0,
+            'state': 7,
+            'raw': point,
+            'avg': point,
+            'lefteye': eye,
+            'righteye': eye,
+        }
+
+    def _frame_bytes(self) -> bytes:
+        message = {'category': 'tracker', 'statuscode': STATUS_OK, 'values': {'frame': self._make_frame()}}
+        return (json.dumps(message, separators=(',', ':')) + '\r\n').encode('utf-8')
+
+    def _handle_tracker(self, client: _ClientHandler, request_type: str, values):
+        """tracker get/set; yanıt values dict'i veya hata durum kodu döndürür"""
+        state = self.state
+        if request_type == 'get':
+            if not isinstance(values, list):
+                return STATUS_BAD_REQUEST
+            result = {}
+            with state.lock:
+                for key in values:
+                    if key == 'push':
+                        result['push'] = client.push
+                    elif key == 'frame':
+                        result['frame'] = self._make_frame()
+                    elif key == 'calibresult':
+                        if state.calibresult is not None:
+                            result['calibresult'] = state.calibresult
+                    elif key in state.values:
+                        result[key] = state.values[key]
+            return result
+
+        if not isinstance(values, dict):
+            return STATUS_BAD_REQUEST
+        if 'version' in values and values['version'] != 1:
+            return STATUS_BAD_REQUEST
+        if 'push' in values:
+            client.push = bool(values['push'])
+        with state.lock:
+            for key in ('screenindex', 'screenresw', 'screenresh', 'screenpsyw', 'screenpsyh'):
+                if key in values:
+                    state.values[key] = values[key]
+        return None
+
+    def _handle_calibration(self, request_type: str, values):
+        """Kalibrasyon durum makinesi: start -> (pointstart, pointend) x N -> calibresult"""
+        state = self.state
+        with state.lock:
+            calibrating = state.values['iscalibrating']
+            if request_type == 'start':
+                if calibrating:
+                    return STATUS_FORBIDDEN, {'statusmessage': 'Calibration already in progress'}
+                point_count = values.get('pointcount', 9) if isinstance(values, dict) else 9
+                state.values['iscalibrating'] = True
+                state.calibration_points = int(point_count)
+                state.calibration_done = 0
+                notify = True
+            elif request_type == 'pointstart':
+                if not calibrating:
+                    return STATUS_FORBIDDEN, {'statusmessage': 'Calibration not started'}
+                return STATUS_OK, None
+            elif request_type == 'pointend':
+                if not calibrating:
+                    return STATUS_FORBIDDEN, {'statusmessage': 'Calibration not started'}
+                state.calibration_done += 1
+                if state.calibration_done < state.calibration_points:
+                    return STATUS_OK, None
+                state.values['iscalibrating'] = False
+                state.values['iscalibrated'] = True
+                state.calibresult = self._make_calibresult(state.calibration_points)
+                result = {'calibresult': state.calibresult}
+                notify = True
+            elif request_type in ('abort', 'clear'):
+                state.values['iscalibrating'] = False
+                if request_type == 'clear':
+                    state.values['iscalibrated'] = False
+                    state.calibresult = None
+                notify = calibrating or request_type == 'clear'
+            else:
+                return STATUS_BAD_REQUEST, {'statusmessage': 'Bilinmeyen calibration isteği: {}'.format(request_type)}
+
+        if notify:
+            self.broadcast({'category': 'calibration', 'statuscode': STATUS_CALIBRATION_CHANGE})
+        if request_type == 'pointend':
+            return STATUS_OK, result
+        return STATUS_OK, None
+
+    def _make_calibresult(self, point_count: int) -> dict:
+        deg = round(self._random.uniform(0.4, 0.9), 3)
+        width, height = self.config.screen
+        points = []
+        for i in range(point_count):
+            x = width * (0.1 + 0.8 * (i % 3) / 2)
+            y = height * (0.1 + 0.8 * ((i // 3) % 3) / 2)
+            points.append({'state': 2, 'cp': {'x': x, 'y': y}, 'mecp': {'x': x + 3, 'y': y - 2},
+                           'acd': {'ad': deg, 'adl': deg, 'adr': deg},
+                           'mepix': {'mep': 12.0, 'mepl': 12.5, 'mepr': 11.5},
+                           'asdp': {'asd': 4.0, 'asdl': 4.1, 'asdr': 3.9}})
+        return {'result': True, 'deg': deg, 'degl': deg, 'degr': deg, 'calibpoints': points}
+
+
+def run_client_benchmark(config: SimulatorConfig, duration: float, json_backend: str = 'auto'):
+    """
+    Simülatörü başlatır, EyeTracker ile bağlanır ve duration saniye boyunca
+    alınan frame hızını ve uçtan uca gecikmeyi (simülatör gönderimi -> listener decode) ölçer.
+    """
+    from eye_tracker import EyeTracker, LatencyHistogram
+
+    latency = LatencyHistogram()
+
+    class _MeasuringTracker(EyeTracker):
+        def _on_gaze_frame(self, gaze_frame):
+            latency.record(time.perf_counter() - gaze_frame.timestamp)
+            EyeTracker._on_gaze_frame(self, gaze_frame)
+
+    config.epoch_time = False  # Gecikme ölçümü için frame saati perf_counter olmalı
+    with EyeTribeSimulator(port=0, config=config) as sim:
+        tracker = _MeasuringTracker(port=sim.port, json_backend=json_backend, log_level='warning')
+        if not tracker.connect(test_connection=False):
+            raise ConnectionError("Simülatöre bağlanılamadı")
+        tracker.start_tracking()
+        start = time.perf_counter()
+        start_sent = sim.frames_sent
+        time.sleep(duration)
+        elapsed = time.perf_counter() - start
+        sent = sim.frames_sent - start_sent
+        metrics = tracker.metrics()
+        tracker.disconnect()
+
+    stats = latency.snapshot()
+    print("=" * 60)
+    print("İSTEMCİ BENCHMARK SONUCU")
+    print("=" * 60)
+    print("Hedef hız: {} Hz, süre: {:.1f}s, JSON: {}".format(config.rate, elapsed, json_backend))
+    print("Gönderilen frame: {}, alınan frame: {} ({:.1f} frame/s)".format(
+        sent, metrics['frames'], metrics['frames'] / elapsed if elapsed else 0))
+    print("Gecikme (ms): ortalama={:.3f} p50<={} p90<={} p99<={} max={:.3f}".format(
+        stats['mean_ms'], stats['p50_ms'], stats['p90_ms'], stats['p99_ms'], stats['max_ms']))
+    print("Yeniden bağlanma: {}, boşluk: {}, kaçırılan örnek: {}, parse hatası: {}".format(
+        metrics['reconnects'], metrics['gaps'], metrics['samples_lost'], metrics['parse_errors']))
+    return stats, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TheEyeTribe sunucu simülatörü")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6555)
+    parser.add_argument("--rate", type=float, default=60.0, help="Push frame hızı (Hz), ör. 30, 60, 500")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Frame zamanlamasına eklenecek jitter (ms, std)")
+    parser.add_argument("--burst-every", type=float, default=0.0,
+                        help="Bu kadar saniyede bir frame'leri biriktirip toplu gönder (0: kapalı)")
+    parser.add_argument("--burst-ms", type=float, default=100.0, help="Burst sırasında biriktirme süresi (ms)")
+    parser.add_argument("--partial-lines", type=float, default=0.0,
+                        help="Bir mesajın iki parçada gönderilme olasılığı (0-1)")
+    parser.add_argument("--disconnect-after", type=float, default=0.0,
+                        help="Her bağlantıyı bu kadar saniye sonra kopar (0: kapalı)")
+    parser.add_argument("--replay", default=None, help="Tekrar oynatılacak gaze_data.csv dosyası")
+    parser.add_argument("--screen", type=int, nargs=2, default=[1920, 1080], metavar=("W", "H"))
+    parser.add_argument("--epoch-time", action="store_true",
+                        help="Frame 'time' alanı için gerçek cihaz gibi epoch milisaniyesi kullan")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--benchmark", action="store_true", help="Simülatöre EyeTracker ile bağlanıp ölçüm yap")
+    parser.add_argument("--duration", type=float, default=10.0, help="Benchmark süresi (saniye)")
+    parser.add_argument("--json-backend", default="auto", help="Benchmark için MessageDecoder backend'i")
+    args = parser.parse_args()
+
+    config = SimulatorConfig(rate=args.rate, jitter_ms=args.jitter, burst_every=args.burst_every,
+                             burst_ms=args.burst_ms, partial_lines=args.partial_lines,
+                             disconnect_after=args.disconnect_after, replay=args.replay,
+                             screen=tuple(args.screen), epoch_time=args.epoch_time, seed=args.seed)
+
+    if args.benchmark:
+        run_client_benchmark(config, args.duration, args.json_backend)
+        return
+
+    with EyeTribeSimulator(args.host, args.port, config) as sim:
+        print("TheEyeTribe simülatörü çalışıyor: {}:{} ({} Hz) - durdurmak için Ctrl+C".format(
+            args.host, sim.port, args.rate))
+        try:
+            while True:
+                time.sleep(5.0)
+                print("Bağlı istemci: {}, gönderilen frame: {}, kopartılan bağlantı: {}".format(
+                    len(sim.clients), sim.frames_sent, sim.disconnects))
+        except KeyboardInterrupt:
+            print("\nSimülatör durduruluyor...")
+
+
+if __name__ == "__main__":
+    main()
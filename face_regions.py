@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Yüz bölgeleri: MediaPipe Face Mesh landmark indeksleriyle tanımlı bölgeler ve bölge
+geometrisi (padding'li bounding box, merkez, dışbükey örtü).
+
+Sadece numpy gerektirir; extract_face_landmarks.py (çıkarım) ve landmark_cache.RawLandmarks
+(önbellekteki ham landmark'lardan sonradan hesaplama) aynı fonksiyonları kullanır.
+Yeni bir bölge tanımı için RegionSet({"ad": [indeksler], ...}) yeterlidir.
+"""
+
+import numpy as np
+
+# Yüz bölgeleri bounding box'larını biraz genişletmek için padding oranı
+REGION_PADDING_RATIO = 0.12  # Her bir kenara %12 padding ekle
+MIN_REGION_PADDING = 6       # Piksel cinsinden minimum padding
+
+# Yüz bölgeleri tanımlamaları (MediaPipe Face Mesh landmark indeksleri - 468 landmark)
+# MediaPipe Face Mesh: https://github.com/google/mediapipe/blob/master/mediapipe/modules/face_geometry/data/canonical_face_model_uv_visualization.png
+FACE_REGIONS = {
+    # Sol göz (left eye) - göz çevresi landmark'ları
+    "left_eye": [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246],
+    # Sağ göz (right eye) - göz çevresi landmark'ları
+    "right_eye": [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398],
+    # Burun (nose) - burun ve çevresi
+    "nose": [1, 2, 5, 4, 6, 19, 20, 94, 125, 141, 235, 236, 3, 51, 48, 115, 131, 134, 102, 49, 220, 305, 281, 363, 360],
+    # Ağız (mouth) - ağız ve dudaklar
+    "mouth": [61, 146, 91, 181, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318],
+    # Sol yanak (left cheek)
+    "left_cheek": [116, 117, 118, 119, 120, 121, 126, 142, 36, 205, 206, 207, 213, 192, 147],
+    # Sağ yanak (right cheek)
+    "right_cheek": [345, 346, 347, 348, 349, 350, 451, 452, 453, 464, 435, 416, 434, 432],
+    # Alın (forehead)
+    "forehead": [10, 151, 9, 107, 55, 65, 52, 53, 46, 124, 35, 31, 228, 229, 230, 231, 232, 233, 244, 245],
+    # Çene (chin)
+    "chin": [18, 200, 199, 175, 169, 170, 140, 136, 150, 176, 148, 152, 377, 400, 378, 379, 365, 397, 288, 361, 323],
+    # Sol kulak (katılımcının solu - ekranın sağ tarafı)
+    "left_ear": [234, 93, 132, 58, 172, 136, 150, 176, 377, 379, 397, 400, 356],
+    # Sağ kulak (katılımcının sağı - ekranın sol tarafı)
+    "right_ear": [454, 323, 361, 288, 397, 365, 379, 378, 400, 352, 330, 332, 284, 251, 389],
+    # Tüm yüz ovali - genel referans için
+    "face_outline": [10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288, 397, 365, 379, 378, 400,
+                     377, 152, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109]
+}
+
+def _get_landmark_list(landmarks):
+    """FaceMesh veya FaceLandmarker çıktısını tek tip listeye dönüştürür."""
+    if landmarks is None:
+        return []
+    if hasattr(landmarks, "landmark"):
+        return landmarks.landmark
+    return landmarks
+
+def _apply_padding(min_val, max_val, length, max_limit):
+    """Belirli bir eksende padding uygular ve sınırlar dahilinde kalır"""
+    padding = max(MIN_REGION_PADDING, int(length * REGION_PADDING_RATIO))
+    padded_min = max(0, min_val - padding)
+    padded_max = min(max_limit, max_val + padding)
+    return padded_min, padded_max
+
+def get_region_bounds(landmarks, region_indices, img_width, img_height):
+    """Belirli bir yüz bölgesinin bounding box'ını hesaplar"""
+    if not region_indices:
+        return None
+    
+    landmark_list = _get_landmark_list(landmarks)
+    if not landmark_list:
+        return None
+    
+    x_coords = []
+    y_coords = []
+    
+    for idx in region_indices:
+        if idx < len(landmark_list):
+            landmark = landmark_list[idx]
+            x = int(landmark.x * img_width)
+            y = int(landmark.y * img_height)
+            x_coords.append(x)
+            y_coords.append(y)
+    
+    if not x_coords or not y_coords:
+        return None
+    
+    min_x = min(x_coords)
+    max_x = max(x_coords)
+    min_y = min(y_coords)
+    max_y = max(y_coords)
+    width = max_x - min_x
+    height = max_y - min_y
+
+    # Padding uygula ve sınırları koru
+    padded_min_x, padded_max_x = _apply_padding(min_x, max_x, width, img_width - 1)
+    padded_min_y, padded_max_y = _apply_padding(min_y, max_y, height, img_height - 1)
+
+    padded_width = padded_max_x - padded_min_x
+    padded_height = padded_max_y - padded_min_y
+
+    return {
+        "min_x": padded_min_x,
+        "max_x": padded_max_x,
+        "min_y": padded_min_y,
+        "max_y": padded_max_y,
+        "center_x": (padded_min_x + padded_max_x) / 2,
+        "center_y": (padded_min_y + padded_max_y) / 2,
+        "width": padded_width,
+        "height": padded_height
+    }
+
+def get_region_center(landmarks, region_indices, img_width, img_height):
+    """Belirli bir yüz bölgesinin merkez noktasını hesaplar"""
+    if not region_indices:
+        return None
+    
+    landmark_list = _get_landmark_list(landmarks)
+    if not landmark_list:
+        return None
+    
+    x_sum = 0
+    y_sum = 0
+    count = 0
+    
+    for idx in region_indices:
+        if idx < len(landmark_list):
+            landmark = landmark_list[idx]
+            x_sum += landmark.x * img_width
+            y_sum += landmark.y * img_height
+            count += 1
+    
+    if count == 0:
+        return None
+    
+    return {
+        "center_x": x_sum / count,
+        "center_y": y_sum / count
+    }
+
+# Vektörel bölge hesabı: tüm bölgelerin landmark indeksleri tek dizide birleştirilir, her bölgenin
+# başlangıcı offset olarak tutulur; min/max/toplam np.*.reduceat ile tüm bölgeler için tek geçişte
+# hesaplanır (get_region_bounds / get_region_center ile aynı sonuçlar).
+REGION_NAMES = list(FACE_REGIONS.keys())
+
+REGION_BOUNDS_DTYPE = np.dtype([
+    ("min_x", np.int32), ("max_x", np.int32), ("min_y", np.int32), ("max_y", np.int32),
+    ("center_x", np.float64), ("center_y", np.float64), ("width", np.int32), ("height", np.int32),
+    ("valid", np.bool_),
+])
+REGION_CENTER_DTYPE = np.dtype([("center_x", np.float64), ("center_y", np.float64), ("valid", np.bool_)])
+
+def landmarks_to_array(landmarks, with_z=False):
+    """
+    Landmark listesini (N, 2) normalize (x, y) dizisine çevirir; kare başına bir kez çağrılır.
+    with_z=True ise (N, 3) (x, y, z) döner (önbelleğe yazılan ham landmark'lar).
+    """
+    landmark_list = _get_landmark_list(landmarks)
+    coords = np.empty((len(landmark_list), 3 if with_z else 2), dtype=np.float64)
+    # Sütun başına tek liste: (x, y) tuple'ları oluşturmaktan ~2.5 kat hızlı
+    coords[:, 0] = [landmark.x for landmark in landmark_list]
+    coords[:, 1] = [landmark.y for landmark in landmark_list]
+    if with_z:
+        coords[:, 2] = [landmark.z for landmark in landmark_list]
+    return coords
+
+def _cross(origin, a, b):
+    """(a - origin) x (b - origin) 2B vektörel çarpımı (> 0: saat yönünün tersine dönüş)"""
+    return (a[0] - origin[0]) * (b[1] - origin[1]) - (a[1] - origin[1]) * (b[0] - origin[0])
+
+def _convex_hull(points):
+    """(K, 2) noktaların dışbükey örtüsü (monotone chain), saat yönünün tersine köşeler"""
+    points = np.unique(points, axis=0)  # x, sonra y'ye göre sıralı
+    if len(points) < 3:
+        return points
+    
+    def half(sequence):
+        chain = []
+        for point in sequence:
+            while len(chain) >= 2 and _cross(chain[-2], chain[-1], point) <= 0:
+                chain.pop()
+            chain.append(point)
+        return chain[:-1]
+    
+    return np.array(half(points) + half(points[::-1]))
+
+class RegionSet:
+    """
+    Bir bölge tanımları kümesi (ad -> landmark indeksleri) için vektörel geometri.
+    padding_ratio / min_padding verilmezse modülün REGION_PADDING_RATIO / MIN_REGION_PADDING
+    değerleri çağrı anında kullanılır.
+    """
+
+    def __init__(self, regions, padding_ratio=None, min_padding=None):
+        self.regions = {name: list(indices) for name, indices in regions.items()}
+        self.names = list(self.regions)
+        self.padding_ratio = padding_ratio
+        self.min_padding = min_padding
+        self._flat_indices = np.concatenate([np.asarray(self.regions[name], dtype=np.intp) for name in self.names])
+        self._offsets = np.cumsum([0] + [len(self.regions[name]) for name in self.names[:-1]])
+        self._sizes = np.array([len(self.regions[name]) for name in self.names], dtype=np.float64)
+
+    def _points(self, coords, img_width, img_height):
+        """(..., N, 2) koordinatlardan bölge noktalarını piksel olarak ve geçerlilik maskesiyle döndürür"""
+        coords = np.asarray(coords, dtype=np.float64)[..., :2]
+        pixels = coords[..., self._flat_indices, :] * np.array([img_width, img_height], dtype=np.float64)
+        finite = np.isfinite(pixels).all(axis=-1)
+        valid = np.logical_and.reduceat(finite, self._offsets, axis=-1)
+        return np.where(finite[..., None], pixels, 0.0), valid
+
+    def bounds(self, coords, img_width, img_height):
+        """
+        Tüm bölgelerin padding'li bounding box'larını tek vektörel geçişte hesaplar.
+
+        Args:
+            coords: (N, 2) tek kare veya (B, N, 2) kare grubu normalize landmark koordinatları
+                    (yüz bulunmayan kareler NaN ile doldurulabilir; z sütunu varsa yok sayılır)
+        Returns:
+            (..., len(names)) REGION_BOUNDS_DTYPE yapılandırılmış dizi; valid=False olan
+            bölgelerin diğer alanları anlamsızdır
+        """
+        padding_ratio = REGION_PADDING_RATIO if self.padding_ratio is None else self.padding_ratio
+        min_padding = MIN_REGION_PADDING if self.min_padding is None else self.min_padding
+        pixels, valid = self._points(coords, img_width, img_height)
+        pixels = np.trunc(pixels)  # int() ile aynı: sıfıra doğru kesme
+        min_xy = np.minimum.reduceat(pixels, self._offsets, axis=-2)
+        max_xy = np.maximum.reduceat(pixels, self._offsets, axis=-2)
+
+        # Padding uygula ve sınırları koru (_apply_padding ile aynı)
+        padding = np.maximum(min_padding, np.trunc((max_xy - min_xy) * padding_ratio))
+        padded_min = np.maximum(0, min_xy - padding)
+        padded_max = np.minimum(np.array([img_width - 1, img_height - 1], dtype=np.float64), max_xy + padding)
+
+        bounds = np.empty(valid.shape, dtype=REGION_BOUNDS_DTYPE)
+        bounds["min_x"] = padded_min[..., 0]
+        bounds["max_x"] = padded_max[..., 0]
+        bounds["min_y"] = padded_min[..., 1]
+        bounds["max_y"] = padded_max[..., 1]
+        bounds["center_x"] = (padded_min[..., 0] + padded_max[..., 0]) / 2
+        bounds["center_y"] = (padded_min[..., 1] + padded_max[..., 1]) / 2
+        bounds["width"] = padded_max[..., 0] - padded_min[..., 0]
+        bounds["height"] = padded_max[..., 1] - padded_min[..., 1]
+        bounds["valid"] = valid
+        return bounds
+
+    def centers(self, coords, img_width, img_height):
+        """Tüm bölgelerin landmark ortalaması merkezlerini hesaplar (get_region_center'ın vektörel hali)"""
+        pixels, valid = self._points(coords, img_width, img_height)
+        sums = np.add.reduceat(pixels, self._offsets, axis=-2)
+        centers = np.empty(valid.shape, dtype=REGION_CENTER_DTYPE)
+        centers["center_x"] = sums[..., 0] / self._sizes
+        centers["center_y"] = sums[..., 1] / self._sizes
+        centers["valid"] = valid
+        return centers
+
+    def hulls(self, coords, img_width, img_height):
+        """
+        Bölgelerin piksel cinsinden dışbükey örtüleri (padding'siz).
+
+        Args:
+            coords: (B, N, 2) kare grubu
+        Returns:
+            Kare başına {bölge adı: (K, 2) köşe dizisi veya None} listesi
+        """
+        pixels, valid = self._points(coords, img_width, img_height)
+        bounds = list(self._offsets[1:]) + [len(self._flat_indices)]
+        hulls = []
+        for frame_pixels, frame_valid in zip(pixels, valid):
+            hulls.append({name: _convex_hull(frame_pixels[start:end]) if ok else None
+                          for name, start, end, ok in zip(self.names, self._offsets, bounds, frame_valid)})
+        return hulls
+
+FACE_REGION_SET = RegionSet(FACE_REGIONS)
+
+def compute_region_bounds(coords, img_width, img_height):
+    """FACE_REGIONS bölgelerinin bounding box'ları (bkz. RegionSet.bounds)"""
+    return FACE_REGION_SET.bounds(coords, img_width, img_height)
+
+def compute_region_centers(coords, img_width, img_height):
+    """FACE_REGIONS bölgelerinin merkezleri (bkz. RegionSet.centers)"""
+    return FACE_REGION_SET.centers(coords, img_width, img_height)
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Gaze örneklerini render thread'i dışında, oturum başına bir binary dosyaya yazan kaydedici.
+
+Örnekler sınırlı bir queue'ya konur (çağıran asla bloklanmaz); ayrı bir yazıcı thread
+kayıtları toplu halde sabit genişlikli binary formatta dosyaya ekler ve belirli aralıklarla
+fsync yapar. Disk takılsa bile video döngüsü ve listener thread beklemez; queue taşarsa
+atılan örnekler sayılır. Yazma hatası yazıcı thread'i durdurmaz: hata kaydedilir, sonraki
+örnekler atılmış sayılır ve hata close() tarafından yeniden fırlatılır.
+
+Dosya formatı (little-endian):
+    başlık:  MAGIC (8 byte) + uint32 uzunluk + JSON (participant_id, created, ...)
+    kayıt:   RECORD = <BBHffdd (28 byte)
+             kind, name_len, video_index, gaze_x, gaze_y, timestamp, video_time
+             kind=KIND_VIDEO ise kaydı name_len byte'lık UTF-8 video_id takip eder
+             (video_index bu oturumdaki numarasıdır, sonraki örnekler bu numarayı kullanır)
+    Yarım kalmış son kayıt (ör. çökme) okuma sırasında yok sayılır.
+
+Kullanım:
+    python gaze_recorder.py export results/gaze_*.gazebin -o results/gaze_data.csv
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import struct
+import threading
+import time
+from queue import Queue, Empty, Full
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'GAZEREC1'
+RECORD = struct.Struct('<BBHffdd')
+KIND_SAMPLE = 1
+KIND_VIDEO = 2
+CSV_HEADER = ["participant_id", "video_id", "gaze_x", "gaze_y", "timestamp", "video_time"]
+
+_STOP = object()
+
+
+class GazeRecorder:
+    """
+    Oturum başına binary gaze kaydedici.
+
+    Kullanım:
+        recorder = GazeRecorder("results/gaze_p01.gazebin", participant_id="p01")
+        recorder.record("video1", x, y, timestamp, video_time)   # herhangi bir thread'den
+        recorder.close()
+        export_csv([recorder.path], "results/gaze_data.csv", append=True)
+    """
+
+    def __init__(self, path: str, participant_id: str, queue_size: int = 16384,
+                 fsync_interval: float = 1.0, batch_size: int = 512, metadata: Optional[dict] = None):
+        """
+        Args:
+            path: Yazılacak .gazebin dosyası (varsa üzerine yazılmaz, sonuna eklenir)
+            participant_id: Başlığa yazılacak katılımcı kimliği
+            queue_size: Yazılmayı bekleyen en fazla örnek
+            fsync_interval: Diske zorla yazma aralığı (saniye)
+            batch_size: Yazıcı thread'in tek write() ile yazdığı en fazla kayıt
+            metadata: Başlığa eklenecek ek bilgiler
+        """
+        self.path = path
+        self.participant_id = participant_id
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.records_written = 0
+        self.dropped = 0
+        self.fsync_count = 0
+        self.max_write_ms = 0.0
+        self.error: Optional[BaseException] = None  # Yazıcı thread'in ilk hatası (close() fırlatır)
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._video_indexes: Dict[str, int] = {}
+        self._closed = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.isfile(path) or os.path.getsize(path) == 0
+        if not new_file:
+            # Var olan dosyaya devam: video numaralarını geri yükle, yarım kalmış son kaydı kes
+            names, valid_end = _scan_records(path)
+            self._video_indexes = {video_id: index for index, video_id in names.items()}
+            if valid_end < os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(valid_end)
+        self._file = open(path, 'ab')
+        if new_file:
+            header = {"participant_id": participant_id, "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+            header.update(metadata or {})
+            payload = json.dumps(header, ensure_ascii=False).encode('utf-8')
+            self._file.write(MAGIC + struct.pack('<I', len(payload)) + payload)
+
+        self._thread = threading.Thread(target=self._writer_loop, name='GazeRecorder', daemon=True)
+        self._thread.start()
+
+    def record(self, video_id: str, x: float, y: float, timestamp: float, video_time: float) -> bool:
+        """Örneği queue'ya koyar; queue doluysa veya yazma hatası olduysa örnek atılır ve False döner"""
+        if self._closed:
+            return False
+        if self.error is not None:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait((video_id, x, y, timestamp, video_time))
+            return True
+        except Full:
+            self.dropped += 1
+            return False
+
+    def _encode(self, item, out: bytearray):
+        video_id, x, y, timestamp, video_time = item
+        video_index = self._video_indexes.get(video_id)
+        if video_index is None:
+            video_index = self._video_indexes[video_id] = len(self._video_indexes)
+            name = str(video_id).encode('utf-8')[:255]
+            out += RECORD.pack(KIND_VIDEO, len(name), video_index, 0.0, 0.0, 0.0, 0.0)
+            out += name
+        out += RECORD.pack(KIND_SAMPLE, 0, video_index, x, y, timestamp, video_time)
+
+    def _writer_loop(self):
+        last_sync = time.monotonic()
+        dirty = False  # fsync edilmemiş veri var mı
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+            except Empty:
+                item = None
+            out = bytearray()
+            count = 0
+            while item is not None:
+                if item is _STOP:
+                    running = False
+                    break
+                self._encode(item, out)
+                count += 1
+                if count >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except Empty:
+                    item = None
+
+            if self.error is not None:
+                # Dosya yazılamıyor: queue boşaltılmaya devam eder (close() beklemesin), örnekler atılır
+                self.dropped += count
+                continue
+            unwritten = count
+            try:
+                if out:
+                    start = time.perf_counter()
+                    self._file.write(out)
+                    self.max_write_ms = max(self.max_write_ms, (time.perf_counter() - start) * 1000)
+                    self.records_written += count
+                    unwritten = 0
+                    dirty = True
+                now = time.monotonic()
+                if dirty and (now - last_sync >= self.fsync_interval or not running):
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self.fsync_count += 1
+                    last_sync = now
+                    dirty = False
+            except Exception as exc:
+                self.error = exc
+                self.dropped += unwritten
+
+    def close(self, timeout: float = 5.0):
+        """
+        Kalan örnekleri yazar, fsync yapar ve dosyayı kapatır.
+
+        Raises:
+            Yazıcı thread'de oluşan yazma hatası veya thread timeout içinde bitmediyse TimeoutError
+            (dosyada o ana kadar yazılmış kayıtlar okunabilir durumdadır)
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except Full:
+            timed_out = "queue {:.1f} sn içinde boşalmadı".format(timeout)
+        else:
+            self._thread.join(timeout=timeout)
+            timed_out = "yazıcı thread {:.1f} sn içinde bitmedi".format(timeout) if self._thread.is_alive() else None
+        if timed_out is None:
+            self._file.close()
+        if self.error is not None:
+            raise self.error
+        if timed_out is not None:
+            # Thread hâlâ dosyaya yazıyor olabilir; dosya daemon thread ile birlikte kapanır
+            raise TimeoutError("Gaze kaydı kapatılamadı: {} ({})".format(timed_out, self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def stats(self) -> dict:
+        return {
+            "records_written": self.records_written,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "fsyncs": self.fsync_count,
+            "max_write_ms": self.max_write_ms,
+            "error": None if self.error is None else "{}: {}".format(type(self.error).__name__, self.error),
+        }
+
+
+def read_header(path: str) -> Tuple[dict, int]:
+    """Dosya başlığını ve ilk kaydın offset'ini döndürür"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError("Geçersiz gaze kayıt dosyası: {}".format(path))
+        (length,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(length).decode('utf-8'))
+    return header, len(MAGIC) + 4 + length
+
+
+def _scan_records(path: str) -> Tuple[Dict[int, str], int]:
+    """Video numaralarını ve son tam kaydın bittiği offset'i döndürür"""
+    _, offset = read_header(path)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    names: Dict[int, str] = {}
+    size = RECORD.size
+    pos = 0
+    while pos + size <= len(data):
+        kind, name_len = data[pos], data[pos + 1]
+        if kind == KIND_VIDEO:
+            if pos + size + name_len > len(data):
+                break
+            (video_index,) = struct.unpack_from('<H', data, pos + 2)
+            names[video_index] = data[pos + size:pos + size + name_len].decode('utf-8')
+            pos += name_len
+        pos += size
+    return names, offset + pos
+
+
+def _iter_records(path: str) -> Iterator[tuple]:
+    """(kind, video_index, video_id, x, y, timestamp, video_time) kayıtlarını sırayla üretir"""
+    _, offset = read_header(path)
+    names: Dict[int, str] = {}
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    size = RECORD.size
+    pos = 0
+    end = len(data)
+    while pos + size <= end:
+        kind, name_len, video_index, x, y, timestamp, video_time = RECORD.unpack_from(data, pos)
+        pos += size
+        if kind == KIND_VIDEO:
+            if pos + name_len > end:
+                break
+            names[video_index] = data[pos:pos + name_len].decode('utf-8')
+            pos += name_len
+        yield kind, video_index, names.get(video_index), x, y, timestamp, video_time
+
+
+def read_samples(path: str) -> Tuple[dict, List[tuple]]:
+    """
+    Kayıt dosyasını okur.
+
+    Returns:
+        (header, samples) - samples: (video_id, gaze_x, gaze_y, timestamp, video_time) listesi
+    """
+    header, _ = read_header(path)
+    samples = [(video_id, x, y, timestamp, video_time)
+               for kind, _, video_id, x, y, timestamp, video_time in _iter_records(path)
+               if kind == KIND_SAMPLE]
+    return header, samples
+
+
+def _csv_row(participant_id, video_id, x, y, timestamp, video_time) -> list:
+    return [participant_id, video_id, round(x, 2), round(y, 2), round(timestamp, 3), round(video_time, 3)]
+
+
+def rows_by_video(path: str) -> Dict[str, List[list]]:
+    """Kayıt dosyasını video_id başına CSV_HEADER formatındaki satırlara ayırır (kayıt sırası korunur)"""
+    header, samples = read_samples(path)
+    participant_id = header.get("participant_id")
+    groups: Dict[str, List[list]] = {}
+    for video_id, x, y, timestamp, video_time in samples:
+        rows = groups.get(video_id)
+        if rows is None:
+            rows = groups[video_id] = []
+        rows.append(_csv_row(participant_id, video_id, x, y, timestamp, video_time))
+    return groups
+
+
+def export_csv(paths: List[str], csv_path: str, append: bool = True) -> int:
+    """
+    Binary kayıtları main.py'nin gaze_data.csv formatına dönüştürür (aynı yuvarlama).
+
+    Returns:
+        Yazılan satır sayısı
+    """
+    directory = os.path.dirname(csv_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_header = not append or not os.path.isfile(csv_path) or os.path.getsize(csv_path) == 0
+    rows = 0
+    with open(csv_path, 'a' if append else 'w', newline='', encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(CSV_HEADER)
+        for path in paths:
+            header, samples = read_samples(path)
+            participant_id = header.get("participant_id")
+            writer.writerows(_csv_row(participant_id, *sample) for sample in samples)
+            rows += len(samples)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary gaze kayıtlarını CSV'ye dönüştürür")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Kayıtları gaze_data.csv formatına aktar")
+    export_parser.add_argument("inputs", nargs="+", help=".gazebin dosyaları (glob kullanılabilir)")
+    export_parser.add_argument("-o", "--output", default="results/gaze_data.csv")
+    export_parser.add_argument("--overwrite", action="store_true", help="CSV'ye eklemek yerine baştan yaz")
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.inputs for p in (glob.glob(pattern) or [pattern])})
+    rows = export_csv(paths, args.output, append=not args.overwrite)
+    print("{} dosyadan {} satır yazıldı: {}".format(len(paths), rows, args.output))
+
+
+if __name__ == "__main__":
+    main()
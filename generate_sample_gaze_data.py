@@ -6,7 +6,8 @@ import pandas as pd
 import numpy as np
 import csv
 import os
-from pathlib import Path
+
+from landmark_io import list_landmark_files, load_landmarks
 
 GAZE_DATA_FILE = "results/gaze_data.csv"
 LANDMARKS_DIR = "results/face_landmarks"
@@ -14,12 +15,10 @@ SAMPLE_RATE = 30.0  # 30Hz (her 0.033 saniyede bir)
 
 def get_video_info():
     """Landmark dosyalarından video bilgilerini çıkarır"""
-    landmarks_dir = Path(LANDMARKS_DIR)
     video_info = {}
     
-    for landmark_file in sorted(landmarks_dir.glob("*_landmarks.csv")):
-        video_id = landmark_file.stem.replace("_landmarks", "")
-        df = pd.read_csv(landmark_file)
+    for video_id, landmark_file in list_landmark_files(LANDMARKS_DIR).items():
+        df = load_landmarks(landmark_file, columns=["frame_time"])
         
         total_frames = len(df)
         duration = df['frame_time'].max()
@@ -132,13 +131,11 @@ def generate_sample_gaze_data():
             print(f"  - {video_id} (süre: {info['duration']:.2f}s)")
             
             # Landmark dosyasını yükle
-            landmark_file = Path(LANDMARKS_DIR) / f"{video_id}_landmarks.csv"
-            if not landmark_file.exists():
+            landmarks_df = load_landmarks(video_id, LANDMARKS_DIR)
+            if landmarks_df is None:
                 print(f"    ⚠️  Landmark dosyası bulunamadı, atlanıyor...")
                 continue
             
-            landmarks_df = pd.read_csv(landmark_file)
-            
             # Gerçekçi gaze noktaları oluştur
             gaze_points = generate_realistic_gaze_points(
                 video_id, 
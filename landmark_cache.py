@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Landmark çıkarımı için içerik adresli (content-hash) önbellek.
+
+Önbellek anahtarı videonun içerik özeti (sha256), model dosyasının özeti ve çıkarım
+parametrelerinden (çalışma modu, güven eşikleri, ...) oluşur; video adı anahtara girmez.
+Aynı adla değiştirilen / yeniden kodlanan bir video yeni anahtar üretir, model veya
+parametre değişince de eski kayıt kullanılmaz.
+
+Her kayıt MediaPipe'ın ham çıktısını saklar, bölge kutularını değil:
+
+    results/landmark_cache/<anahtar[:24]>/
+        manifest.json      # video/model özeti, parametreler, fps, boyut, kare sayısı
+        landmarks.npy      # float16 (kare, 478, 3) normalize x, y, z; yüz yoksa NaN
+        frames.npy         # int32 frame_number (landmarks.npy satırlarıyla aynı sıra)
+        outputs.json       # bu kayıttan türetilmiş landmark tabloları -> bölge parametre özeti
+    results/landmark_cache/file_hashes.json   # video yolu -> boyut, mtime, sha256 (değişmeyen
+                                              # videolar her çalıştırmada yeniden okunmaz)
+
+.npy dosyaları np.load(..., mmap_mode='r') ile belleğe alınmadan açılır; kare başına 2.8 KB
+(float16 normalize koordinatta 1280 piksellik karede en fazla ~0.31 piksel yuvarlama).
+Çıkarım sırasında yazılan tablolar tam hassasiyetli landmark'lardan hesaplanır; önbellekten
+türetilen tablolarda bu yuvarlama yüzünden bazı kutu kenarları birkaç piksel kayabilir.
+
+Bölge tanımları veya padding değiştiğinde tablolar ham landmark'lardan birkaç saniyede yeniden
+hesaplanır (extract_face_landmarks.derive_from_cache); MediaPipe tekrar çalıştırılmaz. Analizde
+RawLandmarks herhangi bir kare aralığı için bölge kutularını, merkezlerini veya dışbükey
+örtülerini istenen bölge tanımlarıyla hesaplar:
+
+    raw = find_raw("kisi1video1")
+    frame_numbers, bounds = raw.region_bounds(100, 200)      # FACE_REGIONS, (100 kare, 11 bölge)
+    hulls = raw.region_hulls(100, 200, {"iris": [468, 469, 470, 471, 472]})[1]
+
+Kullanım:
+    python landmark_cache.py list
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from face_regions import FACE_REGION_SET, RegionSet
+
+CACHE_DIR = os.environ.get("LANDMARK_CACHE_DIR", "results/landmark_cache")
+CACHE_VERSION = 2  # 2: float16 .npy (1: float32 ham dosya)
+NUM_LANDMARKS = 478
+RAW_DTYPE = np.dtype("<f2")
+FRAME_DTYPE = np.dtype("<i4")
+RAW_SUFFIX = ".npy"
+FRAMES_SUFFIX = ".frames.npy"
+RAW_NAME = "landmarks"
+NPY_HEADER_SIZE = 128  # Sabit: kare sayısı sonradan başlığa yerinde yazılır
+MANIFEST_NAME = "manifest.json"
+OUTPUTS_NAME = "outputs.json"
+HASH_INDEX_NAME = "file_hashes.json"  # Önbellek dizininde: yol -> (boyut, mtime, sha256)
+HASH_CHUNK_SIZE = 1 << 20
+
+_file_hashes: Dict[tuple, str] = {}
+_hash_indexes: Dict[str, dict] = {}
+
+
+def file_sha256(path, cache_dir: Optional[str] = None) -> str:
+    """
+    Dosyanın sha256 özeti; aynı süreçte boyut/mtime değişmediyse tekrar okunmaz.
+    cache_dir verilirse özet oradaki file_hashes.json'a (yol, boyut, mtime_ns) ile yazılır ve
+    sonraki çalıştırmalarda da dosya boyutu ve mtime'ı aynıysa okunmadan kullanılır.
+    """
+    stat = os.stat(path)
+    abspath = os.path.abspath(path)
+    memo_key = (abspath, stat.st_size, stat.st_mtime_ns)
+    digest = _file_hashes.get(memo_key)
+    if digest is not None:
+        return digest
+
+    index = None
+    if cache_dir is not None:
+        index_path = os.path.join(cache_dir, HASH_INDEX_NAME)
+        index = _hash_indexes.get(index_path)
+        if index is None:
+            index = _hash_indexes[index_path] = _read_json(index_path, {})
+        record = index.get(abspath)
+        if record and record.get("size") == stat.st_size and record.get("mtime_ns") == stat.st_mtime_ns:
+            digest = record.get("sha256")
+
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        if index is not None:
+            index[abspath] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+            os.makedirs(cache_dir, exist_ok=True)
+            _write_json(index_path, index)
+    _file_hashes[memo_key] = digest
+    return digest
+
+
+def params_hash(params: dict) -> str:
+    """JSON'a çevrilebilir parametrelerin sıra bağımsız özeti"""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cache_key(video_sha256: str, model_sha256: str, params: dict) -> str:
+    return params_hash({"version": CACHE_VERSION, "video": video_sha256, "model": model_sha256,
+                        "params": params})
+
+
+def _write_json(path: str, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str, default=None):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _npy_header(dtype: np.dtype, shape: tuple) -> bytes:
+    """NPY_HEADER_SIZE byte'lık .npy (v1.0) başlığı; veri hep aynı offset'ten başlar"""
+    header = repr({"descr": dtype.str, "fortran_order": False, "shape": tuple(shape)}).encode('latin1')
+    header_len = NPY_HEADER_SIZE - 10
+    if len(header) + 1 > header_len:
+        raise ValueError(f"npy başlığı sığmıyor: {shape}")
+    return b"\x93NUMPY\x01\x00" + struct.pack('<H', header_len) + header.ljust(header_len - 1) + b"\n"
+
+
+def quantize_landmarks(coords: np.ndarray) -> np.ndarray:
+    """Koordinatları önbellekte saklandıkları hassasiyete yuvarlar (RAW_DTYPE dizi döner)"""
+    return np.ascontiguousarray(coords, dtype=RAW_DTYPE)
+
+
+class RawLandmarkWriter:
+    """
+    Ham landmark dizilerini '<base>.npy.partial' / '<base>.frames.npy.partial' dosyalarına ekler;
+    close() ile kare sayısı .npy başlıklarına yazılır ve '.partial' eki kaldırılır.
+    resume_rows verilirse yarım dosyalar o kadar kareye kesilip devam edilir; yarım dosyalar
+    daha kısaysa (ör. önceki çalışmada önbellek kapalıydı) yazıcı devre dışı kalır (valid=False).
+    """
+
+    def __init__(self, base_path: str, resume_rows: int = 0):
+        self.raw_file = base_path + RAW_SUFFIX
+        self.frames_file = base_path + FRAMES_SUFFIX
+        self.rows_written = 0
+        self.valid = True
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        row_bytes = NUM_LANDMARKS * 3 * RAW_DTYPE.itemsize
+        if resume_rows:
+            try:
+                available = min((os.path.getsize(self.raw_file + ".partial") - NPY_HEADER_SIZE) // row_bytes,
+                                (os.path.getsize(self.frames_file + ".partial") - NPY_HEADER_SIZE)
+                                // FRAME_DTYPE.itemsize)
+            except OSError:
+                available = 0
+            if available < resume_rows:
+                self.valid = False
+                self._raw = self._frames = None
+                return
+            self._raw = open(self.raw_file + ".partial", 'r+b')
+            self._raw.truncate(NPY_HEADER_SIZE + resume_rows * row_bytes)
+            self._raw.seek(0, os.SEEK_END)
+            self._frames = open(self.frames_file + ".partial", 'r+b')
+            self._frames.truncate(NPY_HEADER_SIZE + resume_rows * FRAME_DTYPE.itemsize)
+            self._frames.seek(0, os.SEEK_END)
+            self.rows_written = resume_rows
+        else:
+            self._raw = open(self.raw_file + ".partial", 'wb')
+            self._raw.write(_npy_header(RAW_DTYPE, (0, NUM_LANDMARKS, 3)))
+            self._frames = open(self.frames_file + ".partial", 'wb')
+            self._frames.write(_npy_header(FRAME_DTYPE, (0,)))
+
+    def write(self, frame_numbers: Sequence[int], coords: np.ndarray):
+        """coords: (B, NUM_LANDMARKS, 3) normalize koordinatlar (yüz olmayan kareler NaN)"""
+        if not self.valid:
+            return
+        self._raw.write(np.ascontiguousarray(coords, dtype=RAW_DTYPE).tobytes())
+        self._frames.write(np.asarray(frame_numbers, dtype=FRAME_DTYPE).tobytes())
+        self.rows_written += len(frame_numbers)
+
+    def close(self, complete: bool = True):
+        if self._raw is None:
+            return
+        if complete and self.valid:
+            self._raw.seek(0)
+            self._raw.write(_npy_header(RAW_DTYPE, (self.rows_written, NUM_LANDMARKS, 3)))
+            self._frames.seek(0)
+            self._frames.write(_npy_header(FRAME_DTYPE, (self.rows_written,)))
+        self._raw.close()
+        self._frames.close()
+        self._raw = self._frames = None
+        if complete and self.valid:
+            os.replace(self.raw_file + ".partial", self.raw_file)
+            os.replace(self.frames_file + ".partial", self.frames_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+
+def read_raw(base_path: str):
+    """
+    Ham landmark dosyalarını açar.
+
+    Returns:
+        (frame_numbers (F,) int32, coords (F, NUM_LANDMARKS, 3) float16 memmap)
+    """
+    frame_numbers = np.load(base_path + FRAMES_SUFFIX)
+    if len(frame_numbers) == 0:
+        return frame_numbers, np.empty((0, NUM_LANDMARKS, 3), dtype=RAW_DTYPE)
+    return frame_numbers, np.load(base_path + RAW_SUFFIX, mmap_mode='r')
+
+
+class CacheEntry:
+    """
+    Tek bir (video içeriği, model, parametreler) anahtarının önbellek kaydı.
+    manifest.json en son yazılır; manifest varsa kayıt tamamdır.
+    """
+
+    def __init__(self, key: str, cache_dir: str = CACHE_DIR, metadata: Optional[dict] = None):
+        self.key = key
+        self.cache_dir = cache_dir
+        self.metadata = dict(metadata or {})  # finalize() ile manifest'e yazılır
+        self.path = os.path.join(cache_dir, key[:24])
+        self.raw_base = os.path.join(self.path, RAW_NAME)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_NAME)
+
+    def manifest(self) -> Optional[dict]:
+        manifest = _read_json(self.manifest_path)
+        if manifest is None or manifest.get("key") != self.key:
+            return None
+        return manifest
+
+    def is_complete(self) -> bool:
+        return self.manifest() is not None
+
+    def raw_writer(self, resume_rows: int = 0) -> RawLandmarkWriter:
+        return RawLandmarkWriter(self.raw_base, resume_rows)
+
+    def part_base(self, start_frame: int) -> str:
+        """Parçalı işlemede bir parçanın ham landmark dosyalarının ortak yolu"""
+        return os.path.join(self.path, "part_{:09d}".format(start_frame))
+
+    def assemble_parts(self, start_frames: Sequence[int]) -> int:
+        """
+        Parça dosyalarını frame_number sırasıyla tek ham kayda birleştirir (çakışan kareler
+        tekilleştirilir, stitch_chunks ile aynı kural) ve parça dosyalarını siler.
+
+        Returns:
+            Birleştirilen kare sayısı
+        """
+        seen = set()
+        bases = [self.part_base(start) for start in sorted(start_frames)]
+        with RawLandmarkWriter(self.raw_base) as writer:
+            for base in bases:
+                frame_numbers, coords = read_raw(base)
+                keep = [i for i, n in enumerate(frame_numbers.tolist()) if n not in seen]
+                seen.update(frame_numbers[keep].tolist())
+                writer.write(frame_numbers[keep], coords[keep])
+                del coords
+        self.discard_parts(start_frames)
+        return writer.rows_written
+
+    def discard_parts(self, start_frames: Sequence[int]):
+        """Parçaların ham landmark dosyalarını (yarım kalmışlar dahil) siler"""
+        for start in start_frames:
+            base = self.part_base(start)
+            for suffix in (RAW_SUFFIX, FRAMES_SUFFIX):
+                for path in (base + suffix, base + suffix + ".partial"):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def finalize(self, **metadata):
+        """Ham landmark dosyaları yazıldıktan sonra kaydı tamamlar (ör. fps, width, height)"""
+        frame_numbers, _ = read_raw(self.raw_base)
+        manifest = {"key": self.key, "version": CACHE_VERSION, "frames": int(len(frame_numbers)),
+                    "landmarks": NUM_LANDMARKS, "dtype": RAW_DTYPE.str,
+                    "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+        manifest.update(self.metadata)
+        manifest.update(metadata)
+        _write_json(self.manifest_path, manifest)
+
+    def read_raw(self):
+        return read_raw(self.raw_base)
+
+    def record_output(self, output_file, derive_hash: str):
+        """Landmark tablosunun bu kayıttan verilen bölge parametreleriyle türetildiğini kaydeder"""
+        outputs_path = os.path.join(self.path, OUTPUTS_NAME)
+        outputs = _read_json(outputs_path, {})
+        outputs[os.path.abspath(output_file)] = derive_hash
+        _write_json(outputs_path, outputs)
+
+    def output_is_current(self, output_file, derive_hash: str) -> bool:
+        """Tablo var ve bu kayıttan aynı bölge parametreleriyle türetildi mi"""
+        if not os.path.isfile(output_file) or not self.is_complete():
+            return False
+        outputs = _read_json(os.path.join(self.path, OUTPUTS_NAME), {})
+        return outputs.get(os.path.abspath(output_file)) == derive_hash
+
+
+def open_entry(video_path, model_sha256: str, params: dict, cache_dir: str = CACHE_DIR,
+               video_id: Optional[str] = None) -> CacheEntry:
+    """Videonun içerik özetini hesaplayıp önbellek kaydını verir (kayıt henüz olmayabilir)"""
+    video_sha256 = file_sha256(video_path, cache_dir)
+    metadata = {"video_id": video_id or os.path.splitext(os.path.basename(str(video_path)))[0],
+                "video_sha256": video_sha256, "model_sha256": model_sha256, "params": params}
+    return CacheEntry(cache_key(video_sha256, model_sha256, params), cache_dir, metadata)
+
+
+class RawLandmarks:
+    """
+    Önbellek kaydındaki ham landmark'lara tembel (lazy) erişim: dosyalar ilk erişimde memmap
+    ile açılır, hesaplar sadece istenen kare aralığı için yapılır.
+    Kare aralıkları frame_number cinsindendir: [start_frame, end_frame), None = baştan / sona kadar.
+    regions verilmezse FACE_REGIONS kullanılır; dict (ad -> indeksler) veya face_regions.RegionSet olabilir.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest = _read_json(os.path.join(path, MANIFEST_NAME))
+        if self.manifest is None:
+            raise FileNotFoundError(f"Önbellek kaydı bulunamadı: {path}")
+        self.video_id = self.manifest.get("video_id")
+        self.fps = self.manifest["fps"]
+        self.width = self.manifest["width"]
+        self.height = self.manifest["height"]
+        self._frame_numbers = None
+        self._coords = None
+
+    def _load(self):
+        if self._frame_numbers is None:
+            self._frame_numbers, self._coords = read_raw(os.path.join(self.path, RAW_NAME))
+
+    @property
+    def frame_numbers(self) -> np.ndarray:
+        self._load()
+        return self._frame_numbers
+
+    @property
+    def coords(self) -> np.ndarray:
+        """(F, 478, 3) float16 memmap"""
+        self._load()
+        return self._coords
+
+    def __len__(self):
+        return len(self.frame_numbers)
+
+    def _rows(self, start_frame=None, end_frame=None) -> slice:
+        frame_numbers = self.frame_numbers
+        start = 0 if start_frame is None else int(np.searchsorted(frame_numbers, start_frame, side='left'))
+        end = len(frame_numbers) if end_frame is None else int(np.searchsorted(frame_numbers, end_frame, side='left'))
+        return slice(start, end)
+
+    def landmarks(self, start_frame=None, end_frame=None, pixels=False):
+        """
+        Returns:
+            (frame_numbers, (B, 478, 3) float64 koordinatlar) - pixels=True ise x, y piksel cinsinden
+        """
+        rows = self._rows(start_frame, end_frame)
+        coords = np.asarray(self.coords[rows], dtype=np.float64)
+        if pixels:
+            coords[..., 0] *= self.width
+            coords[..., 1] *= self.height
+        return self.frame_numbers[rows], coords
+
+    def has_face(self, start_frame=None, end_frame=None):
+        """Karelerde yüz bulundu mu (frame_numbers, (B,) bool)"""
+        rows = self._rows(start_frame, end_frame)
+        return self.frame_numbers[rows], np.isfinite(self.coords[rows, 0, 0])
+
+    @staticmethod
+    def _region_set(regions) -> RegionSet:
+        if regions is None:
+            return FACE_REGION_SET
+        return regions if isinstance(regions, RegionSet) else RegionSet(regions)
+
+    def region_bounds(self, start_frame=None, end_frame=None, regions=None):
+        """(frame_numbers, (B, bölge) REGION_BOUNDS_DTYPE) - padding'li bounding box'lar"""
+        frame_numbers, coords = self.landmarks(start_frame, end_frame)
+        return frame_numbers, self._region_set(regions).bounds(coords, self.width, self.height)
+
+    def region_centers(self, start_frame=None, end_frame=None, regions=None):
+        """(frame_numbers, (B, bölge) REGION_CENTER_DTYPE) - landmark ortalaması merkezler"""
+        frame_numbers, coords = self.landmarks(start_frame, end_frame)
+        return frame_numbers, self._region_set(regions).centers(coords, self.width, self.height)
+
+    def region_hulls(self, start_frame=None, end_frame=None, regions=None):
+        """(frame_numbers, kare başına {bölge: (K, 2) piksel köşeler veya None}) - dışbükey örtüler"""
+        frame_numbers, coords = self.landmarks(start_frame, end_frame)
+        return frame_numbers, self._region_set(regions).hulls(coords, self.width, self.height)
+
+
+def find_raw(video_id: str, cache_dir: str = CACHE_DIR, running_mode: Optional[str] = None) -> Optional[RawLandmarks]:
+    """Video için önbellekteki en yeni kaydın ham landmark'ları (yoksa None)"""
+    entries = [e for e in list_entries(cache_dir) if e.get("video_id") == video_id
+               and e.get("version") == CACHE_VERSION
+               and (running_mode is None or e.get("params", {}).get("running_mode") == running_mode)]
+    if not entries:
+        return None
+    return RawLandmarks(max(entries, key=lambda e: e["created"])["path"])
+
+
+def list_entries(cache_dir: str = CACHE_DIR) -> List[dict]:
+    """Tamamlanmış kayıtların manifest'leri (+ 'path', 'size')"""
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for name in sorted(os.listdir(cache_dir)):
+        path = os.path.join(cache_dir, name)
+        manifest = _read_json(os.path.join(path, MANIFEST_NAME))
+        if manifest is None:
+            continue
+        manifest["path"] = path
+        manifest["size"] = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        entries.append(manifest)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark çıkarım önbelleği")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Önbellek dizini")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="Önbellekteki kayıtları listele")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        entries = list_entries(args.cache_dir)
+        for entry in sorted(entries, key=lambda e: e.get("video_id", "")):
+            print("{:<16} {:>7} kare {:>8.1f} MB  {:<8} {}  {}".format(
+                entry.get("video_id", "?"), entry["frames"], entry["size"] / 1e6,
+                entry.get("params", {}).get("running_mode", "?"), entry["created"], entry["path"]))
+        print("{} kayıt, {:.1f} MB".format(len(entries), sum(e["size"] for e in entries) / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Yüz landmark tablolarının ortak okuma/yazma katmanı.
+
+extract_face_landmarks.py her video için kare başına bir satır üretir (video bilgisi + her
+yüz bölgesi için 8 sütun). Tablo üç formatta saklanabilir:
+
+    csv      <video_id>_landmarks.csv      metin (varsayılan, her yerde açılır)
+    parquet  <video_id>_landmarks.parquet  sütunlu, zstd sıkıştırmalı
+    arrow    <video_id>_landmarks.arrow    Arrow IPC dosyası, zstd sıkıştırmalı (en hızlı okuma)
+
+Sütunlu formatlarda sınır koordinatları int16, merkezler float32 olarak yazılır; yüz
+bulunamayan karelerdeki eksik değerler null bitmap ile tutulur. Sütunlu formatlar için
+pyarrow gerekir (opsiyonel). Okurken aynı video için birden fazla dosya varsa en son yazılan
+seçilir (ör. yeniden CSV'ye çıkarılan video için eski .arrow okunmaz); değiştirilme zamanları
+eşitse en hızlı format (arrow > parquet > csv). pyarrow yoksa CSV'ye düşülür.
+
+Yazım LandmarkWriter ile parça parça yapılır: tamamlanana kadar veri '<dosya>.partial'
+dosyasındadır, '<dosya>.checkpoint' son yazılan kareyi tutar (extract_face_landmarks.py --resume).
+
+Kullanım:
+    python landmark_io.py convert --format parquet          # mevcut CSV'leri dönüştür
+    python landmark_io.py convert --format arrow --videos kisi1video1
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_ipc = None
+    pq = None
+
+LANDMARKS_DIR = "results/face_landmarks"
+
+# extract_face_landmarks.FACE_REGIONS ile aynı sıra
+REGION_NAMES = [
+    "left_eye", "right_eye", "nose", "mouth",
+    "left_cheek", "right_cheek", "forehead", "chin",
+    "left_ear", "right_ear", "face_outline"
+]
+BASE_COLUMNS = ["video_id", "frame_number", "frame_time", "video_width", "video_height"]
+INT_REGION_FIELDS = ["min_x", "max_x", "min_y", "max_y", "width", "height"]
+FLOAT_REGION_FIELDS = ["center_x", "center_y"]
+REGION_FIELDS = ["min_x", "max_x", "min_y", "max_y", "center_x", "center_y", "width", "height"]
+
+FORMATS = ["csv", "parquet", "arrow"]
+FILE_SUFFIXES = {"csv": "_landmarks.csv", "parquet": "_landmarks.parquet", "arrow": "_landmarks.arrow"}
+# Aynı yaşta dosyalar arasında okuma tercihi: en hızlı format önce
+READ_PREFERENCE = ["arrow", "parquet", "csv"]
+# Yazım sırasındaki yarım dosya ve devam için kontrol noktası
+PARTIAL_SUFFIX = ".partial"
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+def landmark_columns(region_names: Sequence[str] = REGION_NAMES) -> List[str]:
+    """Tablonun sütun sırası"""
+    columns = list(BASE_COLUMNS)
+    for region_name in region_names:
+        columns.extend(f"{region_name}_{field}" for field in REGION_FIELDS)
+    return columns
+
+
+def has_columnar_support() -> bool:
+    return pa is not None
+
+
+def available_formats() -> List[str]:
+    """Bu ortamda yazılabilen formatlar"""
+    return FORMATS if pa is not None else ["csv"]
+
+
+def landmark_path(output_dir, video_id: str, fmt: str = "csv") -> Path:
+    """Bir videonun verilen formattaki landmark dosyası yolu"""
+    if fmt not in FILE_SUFFIXES:
+        raise ValueError(f"Bilinmeyen landmark formatı: {fmt} (seçenekler: {', '.join(FORMATS)})")
+    return Path(output_dir) / f"{video_id}{FILE_SUFFIXES[fmt]}"
+
+
+def video_id_from_path(path) -> str:
+    name = Path(path).name
+    for suffix in FILE_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
+
+
+def _format_of(path) -> str:
+    name = str(path)
+    for fmt, suffix in FILE_SUFFIXES.items():
+        if name.endswith(suffix):
+            return fmt
+    raise ValueError(f"Landmark dosyası formatı anlaşılamadı: {path}")
+
+
+def _readable_formats() -> List[str]:
+    return READ_PREFERENCE if pa is not None else ["csv"]
+
+
+def find_landmark_file(video_id: str, landmarks_dir=LANDMARKS_DIR) -> Optional[Path]:
+    """Video için okunabilecek en yeni landmark dosyası; eşitse en hızlı format (yoksa None)"""
+    candidates = []
+    for rank, fmt in enumerate(_readable_formats()):
+        path = landmark_path(landmarks_dir, video_id, fmt)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            continue
+        candidates.append((-mtime_ns, rank, path))
+    return min(candidates)[2] if candidates else None
+
+
+def list_landmark_files(landmarks_dir=LANDMARKS_DIR) -> Dict[str, Path]:
+    """video_id -> okunacak landmark dosyası (video_id'ye göre sıralı)"""
+    landmarks_dir = Path(landmarks_dir)
+    if not landmarks_dir.exists():
+        return {}
+    video_ids = set()
+    for fmt in _readable_formats():
+        video_ids.update(video_id_from_path(p) for p in landmarks_dir.glob(f"*{FILE_SUFFIXES[fmt]}"))
+    return {video_id: find_landmark_file(video_id, landmarks_dir) for video_id in sorted(video_ids)}
+
+
+def _arrow_schema(region_names: Sequence[str]):
+    fields = [
+        pa.field("video_id", pa.dictionary(pa.int32(), pa.string())),
+        pa.field("frame_number", pa.int32()),
+        pa.field("frame_time", pa.float64()),
+        pa.field("video_width", pa.int16()),
+        pa.field("video_height", pa.int16()),
+    ]
+    for region_name in region_names:
+        for field in REGION_FIELDS:
+            arrow_type = pa.float32() if field in FLOAT_REGION_FIELDS else pa.int16()
+            fields.append(pa.field(f"{region_name}_{field}", arrow_type))
+    return pa.schema(fields)
+
+
+def _to_arrow_table(rows: List[dict], region_names: Sequence[str]):
+    schema = _arrow_schema(region_names)
+    arrays = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def checkpoint_path(output_file) -> str:
+    """Yarım kalan çıkarımın kontrol noktası (sidecar) dosyası"""
+    return str(output_file) + CHECKPOINT_SUFFIX
+
+
+def read_checkpoint(output_file) -> Optional[dict]:
+    """
+    Kontrol noktasını okur. Dosya yoksa, bozuksa veya yarım veri dosyası kaybolmuşsa None.
+    """
+    try:
+        with open(checkpoint_path(output_file), encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isfile(str(output_file) + PARTIAL_SUFFIX):
+        return None
+    return state
+
+
+class LandmarkWriter:
+    """
+    Landmark tablosunu parça parça yazar; bellek kullanımı video uzunluğundan bağımsızdır.
+    Veri önce '<dosya>.partial' dosyasına eklenir (csv satırları; parquet/arrow için zstd
+    sıkıştırmalı Arrow IPC stream), close() ile tamamlanınca asıl dosyaya taşınır (sütunlu
+    formatlarda batch batch dönüştürülür), böylece yarıda kalan bir çıkarım tamamlanmış dosya
+    gibi görünmez. Hiç satır yazılmazsa dosya oluşmaz.
+
+    checkpoint verilirse her write_rows çağrısından sonra yarım dosya diske zorla yazılır ve
+    '<dosya>.checkpoint' içine son tamamlanan kare kaydedilir. resume=True ise ve kontrol
+    noktasının checkpoint bilgileri (ör. fps, çalışma modu) aynıysa yarım dosya son kontrol
+    noktasına geri alınıp devam edilir; kaldığı yer last_frame'dedir.
+
+    Kullanım:
+        with LandmarkWriter("results/face_landmarks/v1_landmarks.parquet") as writer:
+            writer.write_rows(rows)
+    """
+
+    def __init__(self, output_file, fmt: Optional[str] = None, region_names: Sequence[str] = REGION_NAMES,
+                 checkpoint: Optional[dict] = None, resume: bool = False):
+        self.output_file = str(output_file)
+        self.fmt = fmt or _format_of(output_file)
+        if self.fmt not in FILE_SUFFIXES:
+            raise ValueError(f"Bilinmeyen landmark formatı: {self.fmt}")
+        if self.fmt != "csv" and pa is None:
+            raise RuntimeError(f"{self.fmt} formatı için pyarrow gerekli (pip install pyarrow)")
+        self.region_names = list(region_names)
+        self.partial_file = self.output_file + PARTIAL_SUFFIX
+        self.checkpoint_file = checkpoint_path(self.output_file)
+        self.checkpoint = checkpoint
+        self.rows_written = 0
+        self.resumed_rows = 0
+        self.last_frame = 0  # Yazılan son kare (frame_number)
+        self._file = None
+        self._writer = None
+        if resume and checkpoint is not None:
+            self._resume()
+        if self._writer is None and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)  # Eski kontrol noktası yeni yarım dosyaya uymaz
+
+    def _open(self):
+        directory = os.path.dirname(self.output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.fmt == "csv":
+            self._file = open(self.partial_file, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=landmark_columns(self.region_names))
+            self._writer.writeheader()
+        else:
+            self._file = open(self.partial_file, 'wb')
+            options = pa_ipc.IpcWriteOptions(compression="zstd")
+            self._writer = pa_ipc.new_stream(self._file, _arrow_schema(self.region_names), options=options)
+
+    def _resume(self):
+        state = read_checkpoint(self.output_file)
+        if state is None or state.get("format") != self.fmt or state.get("params") != self.checkpoint:
+            return
+        if self.fmt == "csv":
+            with open(self.partial_file, 'r+b') as f:
+                f.truncate(state["offset"])
+            self._file = open(self.partial_file, 'a', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=landmark_columns(self.region_names))
+        else:
+            # Stream'e şema tekrar yazılmadan eklenemez: kontrol noktasına kadarki batch'ler yeni
+            # yarım dosyaya kopyalanır (çökmede yarım kalan son batch atlanır)
+            old_file = self.partial_file + ".old"
+            os.replace(self.partial_file, old_file)
+            self._open()
+            copied = 0
+            with pa.memory_map(old_file) as source:
+                reader = pa_ipc.open_stream(source)
+                while copied < state["rows"]:
+                    try:
+                        batch = reader.read_next_batch()
+                    except (StopIteration, pa.ArrowInvalid):
+                        break
+                    batch = batch.slice(0, state["rows"] - copied)
+                    self._writer.write_batch(batch)
+                    copied += batch.num_rows
+            os.remove(old_file)
+            if copied != state["rows"]:
+                raise ValueError(f"Yarım dosya kontrol noktasıyla uyuşmuyor: {self.partial_file}")
+        self.rows_written = self.resumed_rows = state["rows"]
+        self.last_frame = state["last_frame"]
+
+    def write_rows(self, rows: List[dict]):
+        """Kare satırlarını dosyaya ekler (checkpoint varsa ardından kontrol noktasını günceller)"""
+        if not rows:
+            return
+        if self._writer is None:
+            self._open()
+        if self.fmt == "csv":
+            self._writer.writerows(rows)
+        else:
+            self._writer.write_table(_to_arrow_table(rows, self.region_names))
+        self.rows_written += len(rows)
+        self.last_frame = rows[-1]["frame_number"]
+        if self.checkpoint is not None:
+            self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        state = {
+            "format": self.fmt,
+            "params": self.checkpoint,
+            "rows": self.rows_written,
+            "last_frame": self.last_frame,
+            "offset": self._file.tell(),
+            "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        tmp_file = self.checkpoint_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def _finish_columnar(self):
+        """Yarım stream'i batch batch parquet / Arrow IPC dosyasına dönüştürür"""
+        tmp_file = self.output_file + ".tmp"
+        schema = _arrow_schema(self.region_names)
+        with pa.memory_map(self.partial_file) as source:
+            reader = pa_ipc.open_stream(source)
+            if self.fmt == "parquet":
+                with pq.ParquetWriter(tmp_file, schema, compression="zstd") as writer:
+                    for batch in reader:
+                        writer.write_batch(batch)
+            else:
+                options = pa_ipc.IpcWriteOptions(compression="zstd")
+                with pa.OSFile(tmp_file, 'wb') as sink, pa_ipc.new_file(sink, schema, options=options) as writer:
+                    for batch in reader:
+                        writer.write_batch(batch)
+        os.replace(tmp_file, self.output_file)
+        os.remove(self.partial_file)
+
+    def close(self, complete: bool = True):
+        """
+        Dosyayı kapatır. complete=True ise .partial dosya asıl dosyaya dönüşür ve kontrol noktası
+        silinir; False ise (hata, kesinti) yarım dosya ve kontrol noktası devam için bırakılır.
+        """
+        if self._writer is None:
+            return
+        if self.fmt != "csv":
+            self._writer.close()
+        self._file.close()
+        self._writer = None
+        self._file = None
+        if complete:
+            if self.fmt == "csv":
+                os.replace(self.partial_file, self.output_file)
+            else:
+                self._finish_columnar()
+            if os.path.exists(self.checkpoint_file):
+                os.remove(self.checkpoint_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+
+def write_landmarks(rows: List[dict], output_file, fmt: Optional[str] = None,
+                    region_names: Sequence[str] = REGION_NAMES):
+    """
+    Kare satırlarını (process_video'nun ürettiği dict'ler) verilen formatta tek seferde yazar.
+    fmt verilmezse dosya uzantısından anlaşılır.
+    """
+    with LandmarkWriter(output_file, fmt, region_names) as writer:
+        writer.write_rows(rows)
+
+
+def load_landmarks(source, landmarks_dir=LANDMARKS_DIR, columns: Optional[Iterable[str]] = None):
+    """
+    Landmark tablosunu pandas DataFrame olarak yükler.
+
+    Args:
+        source: Dosya yolu veya video_id (video_id ise en hızlı format seçilir)
+        landmarks_dir: video_id verildiğinde aranacak dizin
+        columns: Sadece bu sütunları oku (sütunlu formatlarda diğer sütunlar hiç okunmaz)
+
+    Returns:
+        DataFrame; dosya bulunamazsa None. Null içeren tamsayı sütunları CSV'de olduğu
+        gibi float (NaN) olarak döner.
+    """
+    import pandas as pd
+
+    path = Path(source)
+    if not path.suffix:
+        path = find_landmark_file(str(source), landmarks_dir)
+        if path is None:
+            return None
+    elif not path.exists():
+        return None
+
+    columns = list(columns) if columns is not None else None
+    fmt = _format_of(path)
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns)
+    if pa is None:
+        raise RuntimeError(f"{path} okumak için pyarrow gerekli (pip install pyarrow)")
+    if fmt == "parquet":
+        table = pq.read_table(str(path), columns=columns)
+    else:
+        with pa.memory_map(str(path), 'r') as source_file:
+            table = pa_ipc.open_file(source_file).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    df = table.to_pandas()
+    if "video_id" in df.columns:
+        df["video_id"] = df["video_id"].astype(str)
+    return df
+
+
+def convert_landmarks(landmarks_dir=LANDMARKS_DIR, fmt: str = "parquet", video_ids: Optional[Iterable[str]] = None,
+                      overwrite: bool = False, remove_csv: bool = False) -> List[dict]:
+    """Mevcut CSV landmark dosyalarını sütunlu formata dönüştürür; dosya başına istatistik döndürür"""
+    import pandas as pd
+
+    if fmt == "csv":
+        raise ValueError("Hedef format csv olamaz")
+    if pa is None:
+        raise RuntimeError(f"{fmt} formatı için pyarrow gerekli (pip install pyarrow)")
+    video_ids = set(video_ids) if video_ids else None
+    stats = []
+    for csv_path in sorted(Path(landmarks_dir).glob(f"*{FILE_SUFFIXES['csv']}")):
+        video_id = video_id_from_path(csv_path)
+        if video_ids is not None and video_id not in video_ids:
+            continue
+        target = landmark_path(landmarks_dir, video_id, fmt)
+        if target.exists() and not overwrite:
+            print(f"Atlanıyor (zaten var): {target}")
+            continue
+        df = pd.read_csv(csv_path)
+        region_names = [name for name in REGION_NAMES if f"{name}_min_x" in df.columns]
+        rows = df.astype(object).where(df.notna(), None).to_dict("records")
+        write_landmarks(rows, target, fmt, region_names)
+
+        start = time.perf_counter()
+        pd.read_csv(csv_path)
+        csv_load = time.perf_counter() - start
+        start = time.perf_counter()
+        load_landmarks(target)
+        new_load = time.perf_counter() - start
+        stats.append({
+            "video_id": video_id,
+            "csv_bytes": csv_path.stat().st_size,
+            "bytes": target.stat().st_size,
+            "csv_load_ms": csv_load * 1000,
+            "load_ms": new_load * 1000,
+        })
+        if remove_csv:
+            csv_path.unlink()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yüz landmark tabloları için format araçları")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert_parser = subparsers.add_parser("convert", help="CSV landmark dosyalarını sütunlu formata dönüştür")
+    convert_parser.add_argument("--landmarks-dir", default=LANDMARKS_DIR)
+    convert_parser.add_argument("--format", choices=[f for f in FORMATS if f != "csv"], default="parquet")
+    convert_parser.add_argument("--videos", nargs="+", help="Sadece bu video_id'ler")
+    convert_parser.add_argument("--overwrite", action="store_true", help="Var olan hedef dosyaları yeniden yaz")
+    convert_parser.add_argument("--remove-csv", action="store_true", help="Dönüştürülen CSV dosyalarını sil")
+    args = parser.parse_args()
+
+    stats = convert_landmarks(args.landmarks_dir, args.format, args.videos, args.overwrite, args.remove_csv)
+    if not stats:
+        print("Dönüştürülecek dosya bulunamadı.")
+        return
+    print("{:<16} {:>12} {:>12} {:>8} {:>12} {:>12}".format(
+        "video", "csv (KB)", args.format + " (KB)", "oran", "csv (ms)", args.format + " (ms)"))
+    print("-" * 78)
+    for s in stats:
+        print("{:<16} {:>12.1f} {:>12.1f} {:>7.1f}x {:>12.2f} {:>12.2f}".format(
+            s["video_id"], s["csv_bytes"] / 1024, s["bytes"] / 1024, s["csv_bytes"] / max(1, s["bytes"]),
+            s["csv_load_ms"], s["load_ms"]))
+    csv_total = sum(s["csv_bytes"] for s in stats)
+    new_total = sum(s["bytes"] for s in stats)
+    print("-" * 78)
+    print("{:<16} {:>12.1f} {:>12.1f} {:>7.1f}x {:>12.2f} {:>12.2f}".format(
+        "toplam", csv_total / 1024, new_total / 1024, csv_total / max(1, new_total),
+        sum(s["csv_load_ms"] for s in stats), sum(s["load_ms"] for s in stats)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,23 @@
 from psychopy import visual, event, core, gui, monitors
 import os
 import json
-import csv
 import time
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from eye_tracker import EyeTracker
+from gaze_recorder import GazeRecorder, CSV_HEADER as GAZE_CSV_HEADER, rows_by_video
+from session_storage import SessionStore
 
 # === Global Ayarlar === #
 VIDEO_DIR = "videos"
-RESULTS_FILE = "results/answers.csv"
-GAZE_DATA_FILE = "results/gaze_data.csv"
 QUESTIONS_FILE = "questions.json"
-SURVEY_FILE = "results/survey_answers.csv"
-DEMOGRAPHIC_FILE = "results/demographic_data.csv"
+
+# Sonuçlar oturum başına ayrı dizinlere yazılır: results/sessions/participant=<id>/session=<zaman>/
+# (bkz. session_storage.py). Veri kümesi adları:
+RESULTS_DATASET = "answers"
+GAZE_DATASET = "gaze"            # video_id başına ayrı bölüm
+GAZE_GAPS_DATASET = "gaze_gaps"
+SURVEY_DATASET = "survey_answers"
+DEMOGRAPHIC_DATASET = "demographic_data"
 
 # Video boyutları: 720p (1280x720) 30fps
 VIDEO_WIDTH = 1280
@@ -38,6 +43,10 @@ video_display_geometry = {
     "scale_y": 1.0,
 }
 
+# Gaze eşlemesi: ScreenToVideoMapper tanımlandıktan sonra oluşturulur,
+# update_video_display_geometry her çağrıldığında güncellenir
+gaze_mapper = None
+
 # Monitor tanımlaması
 def setup_monitor(width, height):
     """Monitor spesifikasyonunu oluşturur"""
@@ -85,6 +94,8 @@ def update_video_display_geometry(window_width, window_height):
             "scale_x": 1.0,
             "scale_y": 1.0,
         }
+        if gaze_mapper is not None:
+            gaze_mapper.update(video_display_geometry, SCREEN_WIDTH, SCREEN_HEIGHT)
         return video_display_geometry
 
     window_width = float(window_width)
@@ -116,6 +127,8 @@ def update_video_display_geometry(window_width, window_height):
         "scale_x": scale_x,
         "scale_y": scale_y,
     }
+    if gaze_mapper is not None:
+        gaze_mapper.update(video_display_geometry, SCREEN_WIDTH, SCREEN_HEIGHT)
     return video_display_geometry
 
 
@@ -143,26 +156,68 @@ def screen_to_video_coordinates(x_screen, y_screen):
 
     return video_x, video_y, inside
 
+
+class ScreenToVideoMapper:
+    """
+    TheEyeTribe bakış koordinatını video koordinatına çeviren, geometri değişiminde bir kez
+    hesaplanan eşleme. Listener thread'de örnek başına çağrılır; parametreler tek bir tuple
+    olarak tutulur, böylece update() ile map() arasında kilit gerekmez.
+    normalize -> ekrana kırp -> video alanına kırp -> ölçekle adımları screen_to_video_coordinates ile aynıdır.
+    """
+
+    def __init__(self):
+        self._params = None
+        self.update(video_display_geometry, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def update(self, geometry, screen_width, screen_height):
+        left = max(0.0, float(geometry.get("left", 0.0)))
+        top = max(0.0, float(geometry.get("top", 0.0)))
+        right = min(float(screen_width), float(geometry.get("right", VIDEO_WIDTH)))
+        bottom = min(float(screen_height), float(geometry.get("bottom", VIDEO_HEIGHT)))
+        self._params = (float(screen_width), float(screen_height), left, top, right, bottom,
+                        float(geometry.get("scale_x", 1.0)), float(geometry.get("scale_y", 1.0)))
+
+    def map(self, x, y):
+        """Ekran (veya 0-1 normalize) bakış koordinatını video koordinatına çevirir"""
+        screen_w, screen_h, left, top, right, bottom, scale_x, scale_y = self._params
+        # TheEyeTribe 'avg' koordinatları normalize (0-1 arası) olabiliyor - ekran pikseline ölçekle
+        if -0.5 <= x <= 1.5 and -0.5 <= y <= 1.5:
+            x *= screen_w
+            y *= screen_h
+        x = left if x < left else right if x > right else x
+        y = top if y < top else bottom if y > bottom else y
+        return (x - left) * scale_x, (y - top) * scale_y
+
+
+gaze_mapper = ScreenToVideoMapper()
+
 # Window'u başlangıçta None olarak tanımla (login'den sonra oluşturulacak)
 win = None
 
 # Eye tracker global değişkeni
 eye_tracker = None
 
+# Bu çalıştırmanın oturum deposu (ilk kayıtta oluşturulur)
+session_store = None
+
+def get_session_store(participant_id):
+    """Katılımcının bu çalıştırmadaki oturum dizinini döndürür (ilk çağrıda oluşturur)"""
+    global session_store
+    if session_store is None or session_store.participant_id != participant_id:
+        session_store = SessionStore(participant_id)
+        print(f"Oturum dizini: {session_store.path}")
+    return session_store
+
 def save_demographic_data(participant_id, demographic_data):
-    """Demografik verileri CSV dosyasına kaydeder"""
-    os.makedirs(os.path.dirname(DEMOGRAPHIC_FILE), exist_ok=True)
-    file_exists = os.path.isfile(DEMOGRAPHIC_FILE)
-    
-    with open(DEMOGRAPHIC_FILE, 'a', newline='', encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow([
-                "participant_id", "cinsiyet", "yas", "egitim_durumu", "meslek",
-                "nöromodülasyon_aldı_mı", "nöromodülasyon_kaç_kez", "nöromodülasyon_ne_zaman",
-                "görme_bozukluğu_var_mı", "görme_bozukluğu_detay", "onam_durumu"
-            ])
-        writer.writerow([
+    """Demografik verileri oturumun CSV dosyasına kaydeder"""
+    get_session_store(participant_id).append_row(
+        DEMOGRAPHIC_DATASET,
+        [
+            "participant_id", "cinsiyet", "yas", "egitim_durumu", "meslek",
+            "nöromodülasyon_aldı_mı", "nöromodülasyon_kaç_kez", "nöromodülasyon_ne_zaman",
+            "görme_bozukluğu_var_mı", "görme_bozukluğu_detay", "onam_durumu"
+        ],
+        [
             participant_id,
             demographic_data.get("cinsiyet", ""),
             demographic_data.get("yas", ""),
@@ -305,51 +360,65 @@ def run_demographic_form():
     
     return participant_id, demographic_data
 
-# Gaze verilerini toplu kaydetmek için buffer
-gaze_buffer = []
-GAZE_BUFFER_SIZE = 50  # 50 veri toplandığında dosyaya yaz
+# Gaze kaydedici: örnekler ayrı bir yazıcı thread ile oturum dizinindeki binary dosyaya yazılır,
+# çıkışta video_id başına CSV bölümlerine aktarılır (bkz. gaze_recorder.py, session_storage.py)
+gaze_recorder = None
 
-def save_gaze_data(participant_id, video_id, x, y, timestamp, video_time, flush=False):
-    """Gaze verilerini buffer'a ekler, buffer dolduğunda veya flush=True olduğunda CSV'ye kaydeder"""
-    global gaze_buffer
-    
-    # Eğer flush isteniyorsa sadece buffer'ı kaydet, yeni veri ekleme
-    if flush:
-        if len(gaze_buffer) > 0:
-            os.makedirs(os.path.dirname(GAZE_DATA_FILE), exist_ok=True)
-            file_exists = os.path.isfile(GAZE_DATA_FILE)
-            
-            with open(GAZE_DATA_FILE, 'a', newline='', encoding="utf-8") as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    writer.writerow(["participant_id", "video_id", "gaze_x", "gaze_y", "timestamp", "video_time"])
-                writer.writerows(gaze_buffer)
-            
-            gaze_buffer = []  # Buffer'ı temizle
+def start_gaze_recording(participant_id):
+    """Katılımcının oturum dizininde binary gaze kayıt dosyası açar"""
+    global gaze_recorder
+    path = get_session_store(participant_id).file_path("gaze.gazebin")
+    gaze_recorder = GazeRecorder(path, participant_id)
+    return gaze_recorder
+
+def finish_gaze_recording():
+    """Kaydediciyi kapatır (kalan örnekler yazılır) ve örnekleri video başına bölümlere aktarır"""
+    global gaze_recorder
+    if gaze_recorder is None:
         return
-    
-    # Normal durumda veriyi buffer'a ekle
-    gaze_buffer.append([
-        participant_id,
-        video_id,
-        round(x, 2),
-        round(y, 2),
-        round(timestamp, 3),
-        round(video_time, 3)
-    ])
-    
-    # Buffer dolduğunda dosyaya yaz
-    if len(gaze_buffer) >= GAZE_BUFFER_SIZE:
-        os.makedirs(os.path.dirname(GAZE_DATA_FILE), exist_ok=True)
-        file_exists = os.path.isfile(GAZE_DATA_FILE)
-        
-        with open(GAZE_DATA_FILE, 'a', newline='', encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(["participant_id", "video_id", "gaze_x", "gaze_y", "timestamp", "video_time"])
-            writer.writerows(gaze_buffer)
-        
-        gaze_buffer = []  # Buffer'ı temizle
+    recorder = gaze_recorder
+    gaze_recorder = None
+    try:
+        recorder.close()
+    except Exception as e:
+        # Dosyadaki tamamlanmış kayıtlar yine de aktarılır (yarım son kayıt okurken atlanır)
+        print(f"Gaze kaydı yazılırken hata: {type(e).__name__}: {e}")
+    stats = recorder.stats()
+    store = get_session_store(recorder.participant_id)
+    rows = 0
+    for video_id, video_rows in rows_by_video(recorder.path).items():
+        rows += store.append_rows(GAZE_DATASET, GAZE_CSV_HEADER, video_rows, video_id=video_id)
+    print(f"Gaze kaydı: {rows} örnek video bölümlerine aktarıldı ({store.path}), atılan: {stats['dropped']}, "
+          f"en uzun yazma: {stats['max_write_ms']:.1f} ms")
+
+# Listener thread'de bulunan veri boşlukları: (participant_id, video_id, gap, video_time).
+# Listener sadece ekler; dosyaya yazma ve print ana thread'de flush_gaze_gaps ile yapılır
+pending_gaze_gaps = deque()
+
+def flush_gaze_gaps():
+    """Biriken veri boşluklarını oturumun gaze_gaps CSV'sine yazar"""
+    while pending_gaze_gaps:
+        participant_id, video_id, gap, video_time = pending_gaze_gaps.popleft()
+        print(f"Gaze veri boşluğu ({video_id}): {gap.duration:.2f}s, ~{gap.samples_lost} örnek kaçırıldı")
+        save_gaze_gap(participant_id, video_id, gap, video_time)
+
+def save_gaze_gap(participant_id, video_id, gap, video_time):
+    """Bağlantı kopması nedeniyle oluşan veri boşluğunu oturumun ayrı bir CSV'sine kaydeder"""
+    get_session_store(participant_id).append_row(
+        GAZE_GAPS_DATASET,
+        ["participant_id", "video_id", "gap_start", "gap_end", "duration",
+         "samples_lost", "attempts", "reason", "video_time"],
+        [
+            participant_id,
+            video_id,
+            round(gap.start_time, 3) if gap.start_time is not None else "",
+            round(gap.end_time, 3),
+            round(gap.duration, 3),
+            gap.samples_lost if gap.samples_lost is not None else "",
+            gap.attempts,
+            gap.reason,
+            round(video_time, 3)
+        ])
 
 def play_video_with_controls(video_path, video_index=None, participant_id=None, video_id=None):
     # Pencere boyutuna göre video yerleşimini güncelle
@@ -435,12 +504,31 @@ def play_video_with_controls(video_path, video_index=None, participant_id=None,
     # Zamana dayalı oynatma kontrolü - optimizasyon: sadece video duration kontrolü
     clock = core.Clock()
     clock.reset()
+    # Videonun başladığı an, host monotonik saatinde (GazeFrame.host_time ile aynı saat)
+    video_start_host = time.perf_counter()
     
-    # Gaze verisi kaydetme optimizasyonu - zaman bazlı örnekleme
-    last_gaze_time = 0
-    gaze_sample_rate = 1.0 / 30.0  # 30Hz (her 33ms'de bir)
-    # Floating point precision için küçük bir tolerans ekle
-    min_sample_interval = gaze_sample_rate - 0.001  # 1ms tolerans
+    # Gaze verileri: her örnek listener thread'de eşlenip kaydedilir; render döngüsü örnek başına iş yapmaz
+    gaze_consumer = None
+    if eye_tracker and participant_id and video_id:
+        video_duration = video.duration
+
+        def gaze_consumer(frame):
+            # video_time örneğin gerçek zamanından hesaplanır (host_time, ClockSync)
+            video_time = frame.host_time - video_start_host
+            if video_time < 0 or video_time > video_duration:
+                return  # Video dışındaki örnek
+            if frame.is_gap:
+                # Bağlantı koptu ve geri geldi - boşluğu örnek olarak yazma, ayrıca kaydet
+                gap = eye_tracker.find_gap(frame.timestamp)
+                if gap is not None:
+                    pending_gaze_gaps.append((participant_id, video_id, gap, video_time))
+                return
+            video_x, video_y = gaze_mapper.map(frame.avg_x, frame.avg_y)
+            recorder = gaze_recorder
+            if recorder is not None:
+                recorder.record(video_id, video_x, video_y, frame.timestamp, video_time)
+
+        eye_tracker.add_sample_consumer(gaze_consumer)
     
     # Video oynatma loop'u - optimize edilmiş
     # Video oynatma için PsychoPy'nin kendi timing'ini kullan
@@ -454,47 +542,17 @@ def play_video_with_controls(video_path, video_index=None, participant_id=None,
         if int(current_time * 5) % 5 == 0:  # Her 0.2 saniyede bir kontrol et
             keys = event.getKeys(keyList=['escape'], timeStamped=False)
             if 'escape' in keys:
+                if gaze_consumer is not None:
+                    eye_tracker.remove_sample_consumer(gaze_consumer)
+                    flush_gaze_gaps()
                 video.stop()
                 win.setMouseVisible(True)  # Mouse'u tekrar göster
                 safe_exit()
                 return
-        
-        # Eye tracking verilerini kaydet (optimize edilmiş - zaman bazlı)
-        # Gaze verileri video ekran koordinatlarına göre normalize edilir
-        # Daha sıkı zamanlama kontrolü: >= yerine > kullan ve tolerans ekle
-        time_since_last_gaze = current_time - last_gaze_time
-        if time_since_last_gaze >= min_sample_interval:
-            # last_gaze_time'i güncelle (örnekleme yapılsa da yapılmasa da)
-            last_gaze_time = current_time
-            
-            if eye_tracker and eye_tracker.is_tracking():
-                # get_latest_gaze() kullan - bu listener thread'den direkt veri alır, istek yapmaz
-                # Bu çok daha verimli ve gerçek zamanlı veri sağlar
-                gaze_data = eye_tracker.get_latest_gaze()
-                if gaze_data and participant_id and video_id:
-                    x, y, timestamp = gaze_data
-
-                    # TheEyeTribe 'avg' koordinatları normalize (0-1 arası) olabiliyor.
-                    # Eğer gelen değerler bu aralıktaysa ekran pikseline ölçekle.
-                    if -0.5 <= x <= 1.5 and -0.5 <= y <= 1.5:
-                        x *= SCREEN_WIDTH
-                        y *= SCREEN_HEIGHT
-
-                    # Ekran sınırlarını aşmasını engelle ve video koordinatlarına eşle
-                    x_screen = max(0.0, min(float(SCREEN_WIDTH), float(x)))
-                    y_screen = max(0.0, min(float(SCREEN_HEIGHT), float(y)))
-
-                    video_x, video_y, _ = screen_to_video_coordinates(x_screen, y_screen)
-                    video_x = max(0.0, min(float(VIDEO_WIDTH), float(video_x)))
-                    video_y = max(0.0, min(float(VIDEO_HEIGHT), float(video_y)))
-
-                    video_time = current_time
-                    save_gaze_data(participant_id, video_id, video_x, video_y, timestamp, video_time, flush=False)
     
-    # Video bittiğinde kalan gaze verilerini kaydet
-    global gaze_buffer
-    if gaze_buffer:
-        save_gaze_data(participant_id, video_id, 0, 0, 0, 0, flush=True)
+    if gaze_consumer is not None:
+        eye_tracker.remove_sample_consumer(gaze_consumer)
+        flush_gaze_gaps()
     
     video.stop()
     # Mouse'u tekrar göster (video bittiğinde)
@@ -502,6 +560,37 @@ def play_video_with_controls(video_path, video_index=None, participant_id=None,
     # Video objesini temizle (memory optimizasyonu)
     del video
             
+def show_tracker_health(tracker, win, video_id=None):
+    """
+    Videodan önce göz takip bağlantısının sağlığını (önceki videodan bu yana) gösterir.
+    Sorun varsa deneyi yürütenin fark etmesi için ekranda kısa bir uyarı çıkarılır.
+    """
+    if not tracker:
+        return
+    health = tracker.health(reset=True)
+    rtt = health['rtt_ms']
+    rate = health['frame_rate_hz']
+    print("[Tracker sağlığı] {}: {} frame, {} Hz, kayıp %{:.1f}, jitter {:.1f} ms, RTT p50/p99 {}/{} ms, "
+          "heartbeat yanıtsız {}, yeniden bağlanma {}".format(
+              video_id or "-", health['frames'], f"{rate:.0f}" if rate else "?",
+              health['drop_rate'] * 100, health['jitter_ms'],
+              rtt['p50_ms'], rtt['p99_ms'], health['heartbeats_missed'], health['reconnects']))
+    if health['ok']:
+        return
+
+    print("[Tracker sağlığı] UYARI: " + ", ".join(health['warnings']))
+    if win:
+        warning_text = visual.TextStim(
+            win,
+            text="Göz takip cihazı uyarısı:\n" + "\n".join(health['warnings']),
+            height=SCREEN_HEIGHT * 0.03,
+            color='yellow',
+            wrapWidth=SCREEN_WIDTH * 0.8
+        )
+        warning_text.draw()
+        win.flip()
+        core.wait(2.0)
+
 def load_questions(video_id):
     with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
         data = json.load(f)
@@ -685,14 +774,11 @@ SURVEY_QUESTIONS = [
 ]
 
 def save_survey_answer(participant_id, question_index, question_text, answer_index, answer_text, response_time):
-    """Anket cevaplarını CSV dosyasına kaydeder"""
-    os.makedirs(os.path.dirname(SURVEY_FILE), exist_ok=True)
-    file_exists = os.path.isfile(SURVEY_FILE)
-    with open(SURVEY_FILE, 'a', newline='', encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["participant_id", "question_index", "question", "answer_index", "answer", "response_time"])
-        writer.writerow([
+    """Anket cevaplarını oturumun CSV dosyasına kaydeder"""
+    get_session_store(participant_id).append_row(
+        SURVEY_DATASET,
+        ["participant_id", "question_index", "question", "answer_index", "answer", "response_time"],
+        [
             participant_id,
             question_index,
             question_text,
@@ -916,17 +1002,13 @@ def run_survey(participant_id):
 
 def save_result(video_id, question_index, question_data, selected, response_time, participant_id):
     """Video sorularının cevaplarını kaydeder - soru numarası ve cevap numarası olarak"""
-    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
-    file_exists = os.path.isfile(RESULTS_FILE)
-    
     # Harf cevabını numaraya çevir (A=1, B=2, C=3, D=4, E=5, F=6)
     selected_index = ord(selected.upper()) - 64 if selected and selected.upper() in ['A', 'B', 'C', 'D', 'E', 'F'] else ""
     
-    with open(RESULTS_FILE, 'a', newline='', encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["participant_id", "video_id", "question_index", "selected_index", "response_time"])
-        writer.writerow([
+    get_session_store(participant_id).append_row(
+        RESULTS_DATASET,
+        ["participant_id", "video_id", "question_index", "selected_index", "response_time"],
+        [
             participant_id,
             video_id,
             question_index,
@@ -1194,6 +1276,7 @@ def safe_exit():
                 eye_tracker.disconnect()
             except:
                 pass
+            eye_tracker.logger.close()  # Bekleyen log satırlarını yaz, yazıcı thread'i durdur
         
         # Window temizliği
         if win:
@@ -1202,9 +1285,10 @@ def safe_exit():
             except:
                 pass
 
-        # Kalan gaze verilerini kaydet
+        # Kalan gaze verilerini yaz ve oturum bölümlerine aktar
         try:
-            save_gaze_data(None, None, 0, 0, 0, 0, flush=True)
+            flush_gaze_gaps()
+            finish_gaze_recording()
         except Exception as flush_error:
             print(f"Gaze verileri kaydedilirken hata: {flush_error}")
     except Exception as e:
@@ -1270,8 +1354,8 @@ def main():
             safe_exit()
             return
         
-        # Eye tracker bağlantısı
-        eye_tracker = EyeTracker()
+        # Eye tracker bağlantısı (log seviyesi: EYETRACKER_LOG_LEVEL=debug|info|warning|error)
+        eye_tracker = EyeTracker(log_level=os.environ.get('EYETRACKER_LOG_LEVEL', 'info'))
         
         # Bağlantı ekranı - animasyonlu (UI donmasını önlemek için)
         connecting_text = visual.TextStim(
@@ -1360,16 +1444,21 @@ def main():
                     video_sequence.append(person_videos[person][video_index])
         
         # Video sırasını göster
+        start_gaze_recording(participant_id)
         for idx, video_file in enumerate(video_sequence, start=1):
             video_id = os.path.splitext(video_file)[0]
             video_path = os.path.join(VIDEO_DIR, video_file)
 
+            show_tracker_health(eye_tracker, win, video_id)
             play_video_with_controls(video_path, idx, participant_id, video_id)
 
             questions = load_questions(video_id)
             for idx_q, q in enumerate(questions):
                 ask_question(q, video_id, idx_q, participant_id)
 
+        # Videolar bitti - gaze kaydını kapat ve video bölümlerine aktar
+        finish_gaze_recording()
+
         # Anketi çalıştır
         run_survey(participant_id)
 
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Deney sonuçları için oturum bazlı, sadece-ekleme (append-only) depolama.
+
+Her oturum kendi dizinine yazar; hiçbir oturum başka bir oturumun dosyasına dokunmaz:
+
+    results/sessions/
+        catalog.csv                                  # bölüm (partition) indeksi
+        participant=<id>/session=<YYYYmmdd_HHMMSS>/
+            session.json                             # oturum bilgisi
+            answers.csv, survey_answers.csv, demographic_data.csv, gaze_gaps.csv
+            gaze.gazebin                             # ham binary gaze kaydı (gaze_recorder.py)
+            gaze/video_id=<video_id>/part.csv        # video başına gaze bölümü
+
+catalog.csv'ye her bölüm ilk oluşturulduğunda tek satır eklenir
+(participant_id, session_id, dataset, video_id, path, created). Analiz scriptleri önce
+katalogdan gereken bölümleri seçer ve sadece o dosyaları okur; tüm geçmişi yükleyip
+filtrelemeye gerek kalmaz. Katalog kaybolursa dizinlerden yeniden oluşturulabilir.
+
+Kullanım:
+    python session_storage.py list --dataset gaze --videos kisi1video1
+    python session_storage.py rebuild-catalog
+    python session_storage.py import-legacy    # eski paylaşımlı CSV'leri bölümlere ayırır
+"""
+
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+SESSIONS_DIR = os.environ.get("SESSIONS_DIR", "results/sessions")
+CATALOG_NAME = "catalog.csv"
+CATALOG_HEADER = ["participant_id", "session_id", "dataset", "video_id", "path", "created"]
+PARTITION_NAME = "part.csv"
+
+# import-legacy için eski paylaşımlı dosyalar: dataset -> (dosya, video_id ile bölümlensin mi)
+LEGACY_FILES = {
+    "answers": ("results/answers.csv", False),
+    "gaze": ("results/gaze_data.csv", True),
+    "gaze_gaps": ("results/gaze_gaps.csv", False),
+    "survey_answers": ("results/survey_answers.csv", False),
+    "demographic_data": ("results/demographic_data.csv", False),
+}
+LEGACY_SESSION_ID = "legacy"
+
+
+def safe_name(value) -> str:
+    """Dizin adında kullanılabilecek hale getirir (harf, rakam, '-', '_', '.')"""
+    name = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(value)).strip(".")
+    return name or "_"
+
+
+def _catalog_path(root: str) -> str:
+    return os.path.join(root, CATALOG_NAME)
+
+
+def _append_catalog(root: str, entries: List[dict]):
+    """Katalog satırlarını tek write() ile ekler (küçük satırlar, eşzamanlı oturumlarda bölünmez)"""
+    if not entries:
+        return
+    os.makedirs(root, exist_ok=True)
+    path = _catalog_path(root)
+    write_header = not os.path.isfile(path) or os.path.getsize(path) == 0
+    lines = []
+    if write_header:
+        lines.append(",".join(CATALOG_HEADER))
+    for entry in entries:
+        lines.append(_csv_line([entry.get(column, "") for column in CATALOG_HEADER]))
+    with open(path, 'a', newline='', encoding="utf-8") as f:
+        f.write("\r\n".join(lines) + "\r\n")
+
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().rstrip("\r\n")
+
+
+class SessionStore:
+    """
+    Tek bir katılımcı oturumunun yazıcısı.
+
+    Kullanım:
+        store = SessionStore("p01")
+        store.append_rows("answers", header, [row])
+        store.append_rows("gaze", header, rows, video_id="kisi1video1")
+    """
+
+    def __init__(self, participant_id, session_id: Optional[str] = None, root: str = SESSIONS_DIR,
+                 metadata: Optional[dict] = None):
+        """
+        Args:
+            participant_id: Katılımcı kimliği (rumuz)
+            session_id: Oturum adı (varsayılan: başlangıç zamanı, çakışırsa _2, _3 ... eklenir)
+            root: Tüm oturumların kök dizini
+            metadata: session.json'a eklenecek ek bilgiler
+        """
+        self.participant_id = participant_id
+        self.root = root
+        participant_dir = os.path.join(root, "participant={}".format(safe_name(participant_id)))
+        os.makedirs(participant_dir, exist_ok=True)
+
+        base = safe_name(session_id) if session_id else time.strftime("%Y%m%d_%H%M%S")
+        candidate, suffix = base, 1
+        while True:
+            path = os.path.join(participant_dir, "session={}".format(candidate))
+            try:
+                os.makedirs(path, exist_ok=session_id is not None)
+                break
+            except FileExistsError:
+                suffix += 1
+                candidate = "{}_{}".format(base, suffix)
+        self.session_id = candidate
+        self.path = path
+        self._partitions: Dict[str, str] = {}
+        for entry in _scan_session(root, path):
+            self._partitions[entry["path"]] = entry["dataset"]
+
+        info_path = os.path.join(path, "session.json")
+        if not os.path.isfile(info_path):
+            info = {"participant_id": participant_id, "session_id": self.session_id,
+                    "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+            info.update(metadata or {})
+            with open(info_path, 'w', encoding="utf-8") as f:
+                json.dump(info, f, ensure_ascii=False, indent=2)
+
+    def partition_path(self, dataset: str, video_id=None) -> str:
+        """Bölüm dosyasının yolu (video_id verilirse video başına ayrı dosya)"""
+        if video_id is None:
+            return os.path.join(self.path, "{}.csv".format(dataset))
+        return os.path.join(self.path, dataset, "video_id={}".format(safe_name(video_id)), PARTITION_NAME)
+
+    def file_path(self, name: str) -> str:
+        """Oturum dizinindeki yardımcı bir dosyanın yolu (ör. gaze.gazebin)"""
+        return os.path.join(self.path, name)
+
+    def append_rows(self, dataset: str, header: Sequence[str], rows: Iterable[Sequence], video_id=None) -> int:
+        """
+        Satırları bölüm dosyasının sonuna ekler; dosya yeni oluşuyorsa başlığı yazar ve
+        bölümü kataloğa kaydeder.
+
+        Returns:
+            Yazılan satır sayısı
+        """
+        path = self.partition_path(dataset, video_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        new_file = not os.path.isfile(path) or os.path.getsize(path) == 0
+        count = 0
+        with open(path, 'a', newline='', encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(header)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+        if relative not in self._partitions:
+            self._partitions[relative] = dataset
+            _append_catalog(self.root, [{
+                "participant_id": self.participant_id,
+                "session_id": self.session_id,
+                "dataset": dataset,
+                "video_id": "" if video_id is None else video_id,
+                "path": relative,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }])
+        return count
+
+    def append_row(self, dataset: str, header: Sequence[str], row: Sequence, video_id=None):
+        self.append_rows(dataset, header, [row], video_id=video_id)
+
+
+def _scan_session(root: str, session_dir: str) -> List[dict]:
+    """Bir oturum dizinindeki bölümleri katalog satırı olarak döndürür"""
+    participant_dir = os.path.dirname(session_dir)
+    participant_id = os.path.basename(participant_dir).split("=", 1)[-1]
+    session_id = os.path.basename(session_dir).split("=", 1)[-1]
+    info_path = os.path.join(session_dir, "session.json")
+    if os.path.isfile(info_path):
+        try:
+            with open(info_path, encoding="utf-8") as f:
+                participant_id = json.load(f).get("participant_id", participant_id)
+        except (OSError, ValueError):
+            pass
+
+    entries = []
+    for path in sorted(glob.glob(os.path.join(session_dir, "*.csv"))):
+        entries.append((os.path.splitext(os.path.basename(path))[0], "", path))
+    for path in sorted(glob.glob(os.path.join(session_dir, "*", "video_id=*", PARTITION_NAME))):
+        video_dir = os.path.dirname(path)
+        dataset = os.path.basename(os.path.dirname(video_dir))
+        entries.append((dataset, os.path.basename(video_dir).split("=", 1)[1], path))
+
+    return [{
+        "participant_id": participant_id,
+        "session_id": session_id,
+        "dataset": dataset,
+        "video_id": video_id,
+        "path": os.path.relpath(path, root).replace(os.sep, "/"),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(os.path.getmtime(path))),
+    } for dataset, video_id, path in entries]
+
+
+def scan_partitions(root: str = SESSIONS_DIR) -> List[dict]:
+    """Katalog kullanmadan tüm oturum dizinlerini tarar"""
+    entries = []
+    for session_dir in sorted(glob.glob(os.path.join(root, "participant=*", "session=*"))):
+        entries.extend(_scan_session(root, session_dir))
+    return entries
+
+
+def rebuild_catalog(root: str = SESSIONS_DIR) -> int:
+    """Kataloğu dizinlerden yeniden yazar; bölüm sayısını döndürür"""
+    entries = scan_partitions(root)
+    path = _catalog_path(root)
+    os.makedirs(root, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', newline='', encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_HEADER)
+        writer.writeheader()
+        writer.writerows(entries)
+    os.replace(temp_path, path)
+    return len(entries)
+
+
+def read_catalog(root: str = SESSIONS_DIR) -> List[dict]:
+    """Katalog satırlarını okur; katalog yoksa dizinleri tarar"""
+    path = _catalog_path(root)
+    if not os.path.isfile(path):
+        return scan_partitions(root)
+    with open(path, newline='', encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def find_partitions(dataset: str, video_ids: Optional[Iterable] = None,
+                    participant_ids: Optional[Iterable] = None, root: str = SESSIONS_DIR) -> List[dict]:
+    """
+    Filtrelere uyan bölümleri döndürür (katalog satırı + mutlak 'file' yolu).
+    Kataloğa kaydedilmiş ama diskte olmayan bölümler atlanır.
+    """
+    video_ids = None if video_ids is None else {str(v) for v in video_ids}
+    participant_ids = None if participant_ids is None else {str(p) for p in participant_ids}
+    partitions = []
+    for entry in read_catalog(root):
+        if entry.get("dataset") != dataset:
+            continue
+        if video_ids is not None and entry.get("video_id") not in video_ids:
+            continue
+        if participant_ids is not None and entry.get("participant_id") not in participant_ids:
+            continue
+        file_path = os.path.join(root, entry["path"])
+        if os.path.isfile(file_path):
+            partitions.append(dict(entry, file=file_path))
+    return partitions
+
+
+def list_video_ids(dataset: str = "gaze", root: str = SESSIONS_DIR) -> List[str]:
+    """Veri kümesinde bölümü bulunan video_id'ler (sıralı)"""
+    return sorted({entry["video_id"] for entry in read_catalog(root)
+                   if entry.get("dataset") == dataset and entry.get("video_id")})
+
+
+def load_dataset(dataset: str, video_ids: Optional[Iterable] = None,
+                 participant_ids: Optional[Iterable] = None, root: str = SESSIONS_DIR,
+                 legacy_file: Optional[str] = None):
+    """
+    Seçilen bölümleri tek bir pandas DataFrame olarak yükler.
+
+    Hiç bölüm yoksa ve legacy_file verilmişse eski paylaşımlı CSV okunur ve aynı
+    filtreler uygulanır. Hiç veri yoksa None döner.
+    """
+    import pandas as pd
+
+    partitions = find_partitions(dataset, video_ids, participant_ids, root)
+    if partitions:
+        frames = [pd.read_csv(partition["file"]) for partition in partitions]
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    if legacy_file and os.path.isfile(legacy_file):
+        df = pd.read_csv(legacy_file)
+        if video_ids is not None and "video_id" in df.columns:
+            df = df[df["video_id"].astype(str).isin({str(v) for v in video_ids})]
+        if participant_ids is not None and "participant_id" in df.columns:
+            df = df[df["participant_id"].astype(str).isin({str(p) for p in participant_ids})]
+        return df
+    return None
+
+
+def import_legacy(root: str = SESSIONS_DIR, files: Optional[Dict[str, tuple]] = None) -> Dict[str, int]:
+    """
+    Eski paylaşımlı CSV'leri katılımcı başına 'session=legacy' oturumlarına böler.
+    Dosyalar değiştirilmez; aynı oturum zaten varsa o veri kümesi atlanır.
+
+    Returns:
+        dataset -> aktarılan satır sayısı
+    """
+    files = LEGACY_FILES if files is None else files
+    stores: Dict[str, SessionStore] = {}
+    imported = {}
+    for dataset, (path, by_video) in files.items():
+        if not os.path.isfile(path):
+            continue
+        with open(path, newline='', encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header or "participant_id" not in header:
+                continue
+            participant_column = header.index("participant_id")
+            video_column = header.index("video_id") if by_video and "video_id" in header else None
+            groups: Dict[tuple, List[list]] = {}
+            for row in reader:
+                if not row:
+                    continue
+                key = (row[participant_column], row[video_column] if video_column is not None else None)
+                groups.setdefault(key, []).append(row)
+
+        rows = 0
+        for (participant_id, video_id), group in groups.items():
+            store = stores.get(participant_id)
+            if store is None:
+                store = stores[participant_id] = SessionStore(
+                    participant_id, session_id=LEGACY_SESSION_ID, root=root, metadata={"source": "legacy"})
+            if os.path.isfile(store.partition_path(dataset, video_id)):
+                continue
+            rows += store.append_rows(dataset, header, group, video_id=video_id)
+        imported[dataset] = rows
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oturum bazlı sonuç deposu")
+    parser.add_argument("--root", default=SESSIONS_DIR, help="Oturumların kök dizini")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="Katalogdaki bölümleri listele")
+    list_parser.add_argument("--dataset", help="Sadece bu veri kümesi (ör. gaze, answers)")
+    list_parser.add_argument("--videos", nargs="+", help="Sadece bu video_id'ler")
+    list_parser.add_argument("--participants", nargs="+", help="Sadece bu katılımcılar")
+    subparsers.add_parser("rebuild-catalog", help="Kataloğu dizinlerden yeniden oluştur")
+    subparsers.add_parser("import-legacy", help="Eski paylaşımlı CSV'leri oturumlara aktar")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        datasets = [args.dataset] if args.dataset else sorted({e["dataset"] for e in read_catalog(args.root)})
+        for dataset in datasets:
+            for entry in find_partitions(dataset, args.videos, args.participants, args.root):
+                print("{:<16} {:<20} {:<18} {:<16} {}".format(
+                    entry["dataset"], entry["participant_id"], entry["session_id"],
+                    entry["video_id"] or "-", entry["path"]))
+    elif args.command == "rebuild-catalog":
+        count = rebuild_catalog(args.root)
+        print("Katalog yeniden oluşturuldu: {} bölüm ({})".format(count, _catalog_path(args.root)))
+    elif args.command == "import-legacy":
+        for dataset, rows in import_legacy(args.root).items():
+            print("{}: {} satır aktarıldı".format(dataset, rows))
+        print("Katalog: {}".format(_catalog_path(args.root)))
+
+
+if __name__ == "__main__":
+    main()
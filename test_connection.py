@@ -2,6 +2,8 @@
 """
 TheEyeTribe bağlantı test scripti
 Sunucu durumunu ve bağlantıyı test eder
+Donanım yoksa yerel simülatör kullanılabilir: python eyetribe_simulator.py --rate 60
+Sunucu gerektirmeyen istemci testleri: python test_connection.py --offline (veya pytest test_connection.py -k offline)
 """
 
 import socket
@@ -164,7 +166,179 @@ def test_with_eye_tracker():
         traceback.print_exc()
         return False
 
+def test_with_async_eye_tracker(host='localhost', port=6555, connections=4):
+    """AsyncEyeTracker ile tek event loop'ta birden çok eşzamanlı bağlantı testi"""
+    print()
+    print("=" * 60)
+    print("ASYNC EYETRACKER İLE TEST ({} eşzamanlı bağlantı)".format(connections))
+    print("=" * 60)
+    
+    try:
+        import asyncio
+        from async_eye_tracker import AsyncEyeTracker
+        
+        async def one(index):
+            tracker = AsyncEyeTracker(host, port)
+            if not await tracker.connect(timeout=5.0):
+                return index, None
+            try:
+                return index, await tracker.get_version(timeout=5.0)
+            finally:
+                await tracker.close()
+        
+        async def run_all():
+            return await asyncio.gather(*(one(i) for i in range(connections)))
+        
+        start_time = time.time()
+        results = asyncio.run(run_all())
+        elapsed = time.time() - start_time
+        
+        ok = True
+        for index, version in results:
+            if version is not None:
+                print("✓ Bağlantı {}: versiyon {}".format(index, version))
+            else:
+                print("✗ Bağlantı {}: yanıt alınamadı".format(index))
+                ok = False
+        print("  Toplam süre: {:.3f}s".format(elapsed))
+        return ok
+        
+    except Exception as e:
+        print("✗ Hata: {}: {}".format(type(e).__name__, e))
+        import traceback
+        traceback.print_exc()
+        return False
+
+# === Çevrimdışı testler (sunucu gerekmez) === #
+
+def _sample_frame(x):
+    return {"timestamp": "2024-01-01 00:00:00.000", "time": 1000 + int(x), "fix": False, "state": 7,
+            "raw": {"x": x, "y": x}, "avg": {"x": x, "y": x},
+            "lefteye": {"avg": {"x": x, "y": x}, "psize": 20.0, "raw": {"x": x, "y": x},
+                        "pcenter": {"x": 0.4, "y": 0.5}},
+            "righteye": {"avg": {"x": x, "y": x}, "psize": 20.0, "raw": {"x": x, "y": x},
+                         "pcenter": {"x": 0.6, "y": 0.5}}}
+
+def test_offline_async_get_frame_reply():
+    """'get frame' yanıtı bekleyen isteğe döner, frame queue'ya eklenmez; push frame eklenir"""
+    import asyncio
+    from async_eye_tracker import AsyncEyeTracker
+
+    async def handle(reader, writer):
+        await reader.readline()
+        reply = {"category": "tracker", "request": "get", "statuscode": 200, "values": {"frame": _sample_frame(111)}}
+        push = {"category": "tracker", "statuscode": 200, "values": {"frame": _sample_frame(222)}}
+        writer.write((json.dumps(reply) + "\r\n" + json.dumps(push) + "\r\n").encode())
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            tracker = AsyncEyeTracker("127.0.0.1", port)
+            assert await tracker.connect(timeout=5.0)
+            try:
+                response = await tracker.send_request("tracker", "get", ["frame"], timeout=5.0)
+                assert response["values"]["frame"]["raw"]["x"] == 111
+                pushed = await asyncio.wait_for(tracker._frame_queue.get(), timeout=5.0)
+                assert pushed.raw_x == 222
+                assert tracker._frame_queue.empty()
+                assert tracker.latest_frame.raw_x == 222
+                assert not tracker._pending
+            finally:
+                await tracker.close()
+
+    asyncio.run(run())
+
+def _seq_frame(value):
+    """Bütün alanları value olan GazeFrame (yırtık okuma, alanların farklı olmasıyla görülür)"""
+    from eye_tracker import GazeFrame
+    return GazeFrame(float(value), value, False, *([float(value)] * 10), host_time=float(value))
+
+def _assert_consistent(frames, first_seq):
+    for offset, frame in enumerate(frames):
+        values = set(frame.as_tuple()[3:]) | {frame.timestamp}
+        assert values == {float(first_seq + offset)}, "sıra {}: yırtık frame {}".format(first_seq + offset, values)
+
+def test_offline_ring_buffer_wraparound_during_copy():
+    """drain_since kopyası sırasında yazar halkayı dolaşıp bir slotu yarım yazmışsa o slot dönmez"""
+    from eye_tracker import GazeRingBuffer
+    capacity = 8
+    buffer = GazeRingBuffer(capacity)
+    for value in range(20):
+        buffer.push(_seq_frame(value))
+
+    original_slice = buffer._slice
+
+    def slice_with_writer(start, end):
+        # drain_since end'i okuduktan sonra yazar 3 frame ekler ve bir sonrakini yarıya kadar yazar
+        # (seq henüz ilerlemedi); kopya bu durumu görür
+        for value in range(20, 23):
+            buffer.push(_seq_frame(value))
+        torn = _seq_frame(23).as_tuple()
+        slot = buffer.seq % capacity
+        for column, value in list(zip(buffer._columns, torn))[:len(torn) // 2]:
+            column[slot] = value
+        return original_slice(start, end)
+
+    buffer._slice = slice_with_writer
+    frames, next_seq = buffer.drain_since(12)
+    assert next_seq == 20
+    # Kopya anındaki seq=23: güvenli ilk sıra 23 - 8 + 1 = 16
+    assert len(frames) == 4, len(frames)
+    _assert_consistent(frames, 16)
+
+def test_offline_ring_buffer_concurrent_writer():
+    """Yazar thread sürekli push ederken drain_since sadece tam ve ardışık frame'ler döndürür"""
+    import threading
+    from eye_tracker import GazeRingBuffer
+    buffer = GazeRingBuffer(16)
+    stop = threading.Event()
+
+    def writer():
+        value = 0
+        while not stop.is_set():
+            buffer.push(_seq_frame(value))
+            value += 1
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    seq = 0
+    received = lost = 0
+    deadline = time.time() + 0.5
+    try:
+        while time.time() < deadline:
+            frames, next_seq = buffer.drain_since(seq)
+            _assert_consistent(frames, next_seq - len(frames))
+            received += len(frames)
+            lost += next_seq - seq - len(frames)
+            seq = next_seq
+    finally:
+        stop.set()
+        thread.join()
+    assert received > 0
+    assert received + lost == seq
+
+def run_offline_tests():
+    """test_offline_* fonksiyonlarını çalıştırır; hepsi geçerse True"""
+    ok = True
+    for name, test in sorted(globals().items()):
+        if not name.startswith("test_offline_"):
+            continue
+        try:
+            test()
+            print("✓ {}".format(name))
+        except Exception as e:
+            print("✗ {}: {}: {}".format(name, type(e).__name__, e))
+            ok = False
+    return ok
+
 if __name__ == "__main__":
+    if "--offline" in sys.argv:
+        sys.exit(0 if run_offline_tests() else 1)
+
     print("\nTheEyeTribe Bağlantı Test Aracı\n")
     
     # Sunucu testi
@@ -197,4 +371,15 @@ if __name__ == "__main__":
         print("SONUÇ: EyeTracker sınıfı ile sorun var ✗")
         print("  → Kodda bir sorun olabilir")
     print("=" * 60)
+    
+    # AsyncEyeTracker testi
+    async_ok = test_with_async_eye_tracker()
+    
+    print()
+    print("=" * 60)
+    if async_ok:
+        print("SONUÇ: AsyncEyeTracker eşzamanlı bağlantıları çalışıyor ✓")
+    else:
+        print("SONUÇ: AsyncEyeTracker ile sorun var ✗")
+    print("=" * 60)
 
@@ -0,0 +1,235 @@
+"""
+EyeTracker için seviyeli, tembel (lazy) formatlı ve asenkron log yazıcı.
+
+Çağıran thread (listener veya video döngüsü) sadece kaydı sınırlı bir queue'ya koyar;
+zaman damgası, formatlama ve print arka plandaki yazıcı thread'de yapılır.
+Seviyesi kapalı bir mesajın maliyeti tek bir karşılaştırmadır.
+
+Hız sınırı mesaj şablonu (veya rate_key) başına uygulanır; bu yüzden değişken içerik
+şablona gömülmemeli, argüman olarak verilmelidir.
+
+Kullanım:
+    log = TrackerLogger('EyeTracker', level=DEBUG)
+    log.debug("Veri alındı ({} byte)", received)   # format sadece yazılırken uygulanır
+"""
+
+import atexit
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime
+from queue import Queue, Full
+from typing import Dict, Optional
+
+# Seviyeler (logging modülü ile aynı değerler)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'UYARI', ERROR: 'HATA'}
+_LEVELS_BY_NAME = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'uyari': WARNING, 'error': ERROR, 'hata': ERROR}
+
+
+_STOP = object()
+
+# Çıkışta yazılmayı bekleyen kayıtlar için tek atexit kancası; logger'ları canlı tutmaz
+_loggers = weakref.WeakSet()
+
+
+def _flush_all():
+    for logger in list(_loggers):
+        logger.flush()
+
+
+atexit.register(_flush_all)
+
+
+def parse_level(level) -> int:
+    """'debug', 'INFO' veya sayısal seviyeyi sayıya çevirir"""
+    if isinstance(level, int):
+        return level
+    try:
+        return _LEVELS_BY_NAME[str(level).strip().lower()]
+    except KeyError:
+        raise ValueError("Bilinmeyen log seviyesi: {}".format(level))
+
+
+class _RateLimit:
+    """Mesaj tipi başına token bucket (saniyede rate mesaj, en fazla burst birikme)"""
+
+    __slots__ = ('tokens', 'updated', 'suppressed')
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+        self.suppressed = 0
+
+
+class TrackerLogger:
+    """
+    Arka plan thread'li log yazıcı.
+
+    - Seviye filtresi çağıran thread'de, formatlama ve yazma yazıcı thread'de yapılır
+    - Queue doluysa kayıt atılır (çağıran asla bloklanmaz), atılan sayısı raporlanır
+    - Aynı mesaj şablonu (rate_key verilmezse şablonun kendisi) saniyede en fazla
+      rate_limit kez yazılır; bastırılan mesaj sayısı bir sonraki kayda eklenir
+    """
+
+    def __init__(self, name: str = 'EyeTracker', level=INFO, queue_size: int = 1024,
+                 rate_limit: Optional[float] = 20.0, burst: Optional[float] = None, stream=None):
+        """
+        Args:
+            name: Log satırlarında görünecek kaynak adı
+            level: En düşük yazılacak seviye (DEBUG, INFO, WARNING, ERROR veya adı)
+            queue_size: Yazılmayı bekleyen en fazla kayıt sayısı
+            rate_limit: Mesaj tipi başına saniyedeki en fazla kayıt (None: sınırsız)
+            burst: Token bucket kapasitesi (varsayılan: rate_limit)
+            stream: Çıkış akışı (varsayılan: sys.stdout)
+        """
+        self.name = name
+        self.level = parse_level(level)
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else rate_limit
+        self.stream = stream
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._limits: Dict[object, _RateLimit] = {}
+        self._limits_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        _loggers.add(self)
+
+    def is_enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def set_level(self, level):
+        self.level = parse_level(level)
+
+    def log(self, level: int, message: str, *args, rate_key=None):
+        """Kaydı queue'ya koyar; args verilirse message.format(*args) yazıcı thread'de uygulanır"""
+        if level < self.level:
+            return
+        suppressed = 0
+        if self.rate_limit is not None and level < ERROR:
+            allowed, suppressed = self._allow(message if rate_key is None else rate_key)
+            if not allowed:
+                return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((time.time(), level, message, args, suppressed))
+        except Full:
+            self.dropped += 1
+
+    def debug(self, message: str, *args, **kwargs):
+        self.log(DEBUG, message, *args, **kwargs)
+
+    def info(self, message: str, *args, **kwargs):
+        self.log(INFO, message, *args, **kwargs)
+
+    def warning(self, message: str, *args, **kwargs):
+        self.log(WARNING, message, *args, **kwargs)
+
+    def error(self, message: str, *args, **kwargs):
+        self.log(ERROR, message, *args, **kwargs)
+
+    def _allow(self, key):
+        """Token bucket kontrolü: (yazılabilir mi, o ana kadar bastırılan sayı)"""
+        now = time.monotonic()
+        with self._limits_lock:
+            limit = self._limits.get(key)
+            if limit is None:
+                limit = self._limits[key] = _RateLimit(self.burst, now)
+            else:
+                limit.tokens = min(self.burst, limit.tokens + (now - limit.updated) * self.rate_limit)
+                limit.updated = now
+            if limit.tokens < 1.0:
+                limit.suppressed += 1
+                return False, 0
+            limit.tokens -= 1.0
+            suppressed, limit.suppressed = limit.suppressed, 0
+            return True, suppressed
+
+    def _start(self):
+        with self._thread_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._writer_loop, name='{}-log'.format(self.name), daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _format(self, record) -> str:
+        created, level, message, args, suppressed = record
+        timestamp = datetime.fromtimestamp(created).strftime("%H:%M:%S.%f")[:-3]
+        if args:
+            try:
+                message = message.format(*args)
+            except Exception as e:
+                message = "{} {!r} (format hatası: {})".format(message, args, e)
+        prefix = "[{}] [{}]".format(timestamp, self.name)
+        if level != INFO:
+            prefix += " [{}]".format(LEVEL_NAMES.get(level, level))
+        line = "{} {}".format(prefix, message)
+        if suppressed:
+            line += " (+{} benzer mesaj bastırıldı)".format(suppressed)
+        return line
+
+    def _write(self, line: str):
+        stream = self.stream if self.stream is not None else sys.stdout
+        try:
+            stream.write(line + '\n')
+        except Exception:
+            pass
+
+    def _writer_loop(self):
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                self._queue.task_done()
+                return
+            try:
+                self._write(self._format(record))
+                if self.dropped != self._reported_dropped:
+                    lost = self.dropped - self._reported_dropped
+                    self._reported_dropped = self.dropped
+                    self._write("[{}] [UYARI] Log queue dolu: {} kayıt atıldı".format(self.name, lost))
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 1.0):
+        """Queue'daki kayıtların yazılmasını en fazla timeout saniye bekler"""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+        stream = self.stream if self.stream is not None else sys.stdout
+        try:
+            stream.flush()
+        except Exception:
+            pass
+
+    def close(self, timeout: float = 1.0):
+        """Kalan kayıtları yazar ve yazıcı thread'i durdurur (sonraki log çağrısı yeniden başlatır)"""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except Full:
+            return
+        thread.join(timeout)
+        stream = self.stream if self.stream is not None else sys.stdout
+        try:
+            stream.flush()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        """Atılan ve bastırılan kayıt sayıları"""
+        with self._limits_lock:
+            suppressed = sum(limit.suppressed for limit in self._limits.values())
+        return {"queued": self._queue.qsize(), "dropped": self.dropped, "suppressed": suppressed}